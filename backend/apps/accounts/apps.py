@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
+
+    def ready(self):
+        # Register signals once, mirroring StoresConfig.ready().
+        import apps.accounts.signals  # noqa: F401
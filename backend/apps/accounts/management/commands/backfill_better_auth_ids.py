@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    One-time backfill of accounts.User.better_auth_id from the Better Auth
+    "user" table, so existing users hit the single-statement upsert path in
+    BetterAuthMiddleware instead of the legacy email/phone lookup.
+
+    Matches on email first, then on phone number. When several Django users
+    share an email or phone, only the oldest one is linked.
+
+    Usage: python manage.py backfill_better_auth_ids [--dry-run]
+    """
+    help = 'Link existing Django users to their Better Auth ids (by email, then phone).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report counts without writing.')
+
+    def handle(self, *args, **options):
+        table = connection.ops.quote_name(User._meta.db_table)
+        total = 0
+
+        with transaction.atomic():
+            for column in ('email', 'phone_number'):
+                sql = f"""
+                    UPDATE {table} du
+                    SET better_auth_id = bu.id
+                    FROM "user" bu
+                    WHERE du.better_auth_id IS NULL
+                      AND du.{column} IS NOT NULL AND du.{column} <> ''
+                      AND du.{column} = bu.{column}
+                      AND NOT EXISTS (
+                          SELECT 1 FROM {table} linked WHERE linked.better_auth_id = bu.id
+                      )
+                      AND du.id = (
+                          SELECT oldest.id FROM {table} oldest
+                          WHERE oldest.{column} = bu.{column}
+                          ORDER BY oldest.date_joined
+                          LIMIT 1
+                      )
+                """
+                with connection.cursor() as cursor:
+                    cursor.execute(sql)
+                    count = cursor.rowcount
+                total += count
+                self.stdout.write(f'Linked {count} users by {column}.')
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+                self.stdout.write(self.style.WARNING(f'Dry run: {total} users would be linked.'))
+                return
+
+        remaining = User.objects.filter(better_auth_id__isnull=True).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Backfill complete: {total} users linked, {remaining} still unlinked.'
+        ))
@@ -1,8 +1,18 @@
+from django.conf import settings
 from django.db import connection
 from django.contrib.auth import get_user_model
+from django.contrib.auth import get_user as get_session_user
 from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+import base64
+import hashlib
+import hmac
 import logging
 import os
+from urllib.parse import unquote
+
+from . import session_cache
+from .services import BetterAuthUserService
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -13,6 +23,12 @@ class BetterAuthMiddleware:
     
     Queries the better-auth tables in the shared Postgres database directly.
     - Zero-latency session verification (no HTTP round-trips).
+    - Resolved sessions are cached (see session_cache) so repeat requests
+      cost no auth queries until the session or cache entry expires.
+    - Lazy: request.user is only resolved when something reads it, so
+      public AllowAny endpoints never query the session table.
+    - Cookie signatures are verified locally and failed lookups are
+      negatively cached, so forged/expired cookies cost no DB queries.
     - Phone-only users (no email required).
     - JIT user synchronization.
 
@@ -41,41 +57,74 @@ class BetterAuthMiddleware:
         if not raw_cookie:
             return self.get_response(request)
 
-        # 2. Extract the raw token — strip any HMAC signature suffix if present.
-        # Better Auth appends '.{signature}' to cookie values but stores only
-        # the raw token in the DB. We try HMAC first; on mismatch we fall
-        # through to a direct DB lookup so valid sessions always work.
+        # 2. Extract the raw token and verify the '.{signature}' suffix locally.
+        # Better Auth appends an HMAC-SHA256 of the token (keyed with
+        # BETTER_AUTH_SECRET) to the cookie but stores only the raw token in
+        # the DB. Forged cookies are rejected here, before any DB access.
         session_token = self._extract_token(raw_cookie)
 
-        # 3. Direct DB query: validate session and fetch BA user data.
+        if not session_token:
+            return self.get_response(request)
+
+        # 3. Defer resolution until something actually reads request.user
+        # (BetterAuthAuthentication, a permission check or the view itself).
+        # Public AllowAny endpoints never do, so they pay no auth queries.
+        request.user = SimpleLazyObject(
+            lambda: self._resolve_user(request, session_token)
+        )
+
+        return self.get_response(request)
+
+    def _resolve_user(self, request, session_token: str):
+        """
+        Resolve the Django user for a session token.
+        Falls back to the Django-session user (normally anonymous), exactly as
+        AuthenticationMiddleware would, when the token has no active session.
+        """
+        # Session cache: a hit resolves the Django user with zero DB queries.
+        cached = session_cache.get_session(session_token)
+        if cached:
+            return cached['user']
+
+        # Negative cache: tokens that recently failed lookup (expired, revoked
+        # or guessed) are rejected without touching the session table.
+        if session_cache.is_rejected(session_token):
+            return get_session_user(request)
+
+        # Direct DB query: validate session and fetch BA user data.
         auth_data = self._get_auth_data(session_token)
 
         if auth_data:
             user = self._sync_user(auth_data)
             if user:
                 user.backend = 'django.contrib.auth.backends.ModelBackend'
-                request.user = user
+                session_cache.set_session(session_token, user, auth_data.get('expires_at'))
                 logger.debug(f"[BetterAuth] Authenticated: {user.email or user.username} (role={user.role})")
-            else:
-                logger.error(f"[BetterAuth] _sync_user returned None for BA data: {auth_data.get('email')}")
+                return user
+            logger.error(f"[BetterAuth] _sync_user returned None for BA data: {auth_data.get('email')}")
         else:
             logger.debug("[BetterAuth] No active session found in DB for provided token.")
 
-        return self.get_response(request)
+        return get_session_user(request)
 
     def _extract_token(self, raw_cookie: str) -> str:
         """
         Extract the raw session token from the cookie value.
 
         Better Auth stores only the token in the DB, but appends a '.{hmac}'
-        suffix to the cookie for extra tamper-resistance. Because our DB lookup
-        already validates the token (expired check + existence check), we can
-        safely strip the suffix here and let the DB be the security gate.
+        suffix to the cookie: base64(HMAC-SHA256(BETTER_AUTH_SECRET, token)),
+        URL-encoded. When BETTER_AUTH_SECRET is configured the signature is
+        verified here in constant time, so forged cookies never reach the DB.
 
         We also validate the token format to reject obviously malformed or
         oversized cookies before they reach the database.
         """
-        token = raw_cookie[:raw_cookie.rfind('.')] if '.' in raw_cookie else raw_cookie
+        raw_cookie = unquote(raw_cookie)
+        if '.' in raw_cookie:
+            split_at = raw_cookie.rfind('.')
+            token, signature = raw_cookie[:split_at], raw_cookie[split_at + 1:]
+        else:
+            token, signature = raw_cookie, ''
 
         # Defence-in-depth: reject tokens that are clearly malformed before DB hit.
         # Valid Better Auth tokens are alphanumeric + hyphens, max 256 chars.
@@ -85,8 +134,20 @@ class BetterAuthMiddleware:
             logger.warning("[BetterAuth] Rejected malformed session token (invalid characters).")
             return ''
 
+        if getattr(settings, 'BETTER_AUTH_VERIFY_SIGNATURE', False) and not self._verify_signature(token, signature):
+            logger.debug("[BetterAuth] Rejected session cookie with invalid signature.")
+            return ''
+
         return token
 
+    def _verify_signature(self, token: str, signature: str) -> bool:
+        """Check the cookie signature the way better-call's getSignedCookie does."""
+        if len(signature) != 44 or not signature.endswith('='):
+            return False
+        expected = base64.b64encode(
+            hmac.new(settings.BETTER_AUTH_SECRET.encode(), token.encode(), hashlib.sha256).digest()
+        ).decode()
+        return hmac.compare_digest(expected, signature)
 
     def _get_auth_data(self, token: str) -> dict | None:
         """Query the better-auth 'session' and 'user' tables via raw SQL."""
@@ -104,76 +165,35 @@ class BetterAuthMiddleware:
             with connection.cursor() as cursor:
                 cursor.execute(query, [token])
                 row = cursor.fetchone()
-                if row:
-                    return {
-                        'id': row[0],
-                        'email': row[1],
-                        'name': row[2],
-                        'role': row[3],
-                        'phone_number': row[4],
-                        'image': row[5],
-                        'expires_at': row[6]
-                    }
+                if not row:
+                    session_cache.reject(token)
+                    return None
+                return {
+                    'id': row[0],
+                    'email': row[1],
+                    'name': row[2],
+                    'role': row[3],
+                    'phone_number': row[4],
+                    'image': row[5],
+                    'expires_at': row[6]
+                }
         except Exception as e:
             logger.error(f"BetterAuth Direct-DB query failed: {e}")
         return None
 
     def _sync_user(self, data: dict):
-        """Map Better-Auth user data to Django User model (JIT sync)."""
-        email = data.get('email')
-        phone = data.get('phone_number')
-        better_id = data.get('id')
-
-        # Use email as username if available; otherwise derive from the BA ID.
-        username = email if email else f"user_{better_id[:12]}"
+        """
+        Map Better-Auth user data to Django User model (JIT sync).
 
+        A single INSERT ... ON CONFLICT (better_auth_id) DO UPDATE ... RETURNING
+        resolves or creates the user, including concurrent first logins from
+        several tabs. Role sync only promotes CUSTOMER → SELLER, never demotes,
+        and leaves staff accounts untouched.
+        """
         try:
-            user = None
-            if email:
-                user = User.objects.filter(email=email).first()
-            if not user and phone:
-                user = User.objects.filter(phone_number=phone).first()
-            if not user:
-                user = User.objects.filter(username=username).first()
-
-            if not user:
-                # JIT creation — new BA user hitting an API endpoint for the first time.
-                name_parts = data.get('name', '').split(' ', 1)
-                try:
-                    user = User.objects.create(
-                        username=username,
-                        email=email or '',
-                        first_name=name_parts[0] if len(name_parts) > 0 else '',
-                        last_name=name_parts[1] if len(name_parts) > 1 else '',
-                        role=data.get('role', 'CUSTOMER'),
-                        phone_number=phone
-                    )
-                    user.set_unusable_password()
-                    user.save()
-                except Exception as integrity_exc:
-                    # ✅ FIX (Issue #9): Guard against concurrent first-login race condition.
-                    # Two simultaneous requests (e.g. user opens two tabs) both pass the
-                    # `if not user` check before either commits. The second create() raises
-                    # IntegrityError on the unique email/username constraint.
-                    # Re-query to retrieve the user that the winning request already created.
-                    logger.warning(
-                        f"[BetterAuth] JIT user creation conflict for {username} — "
-                        f"likely a concurrent login. Re-querying. ({integrity_exc})"
-                    )
-                    user = (
-                        User.objects.filter(email=email).first()
-                        if email else
-                        User.objects.filter(username=username).first()
-                    )
-
-            else:
-                # Role sync: only promote, never demote. Protect staff/admin roles.
-                new_role = data.get('role', 'CUSTOMER')
-                if user.role != new_role and not user.is_staff:
-                    if user.role == 'CUSTOMER' and new_role == 'SELLER':
-                        user.role = 'SELLER'
-                        user.save(update_fields=['role'])
-
+            user, created = BetterAuthUserService.upsert(data, promote_role=True)
+            if created:
+                logger.info(f"[BetterAuth] JIT-created Django user {user.username}")
             return user
         except Exception as e:
             logger.error(f"BetterAuth User Sync failed: {e}")
@@ -19,6 +19,10 @@ class User(AbstractUser):
     # Ethiopian Market specifics (OTP login support)
     phone_number = models.CharField(max_length=20, unique=True, null=True, blank=True)
     is_phone_verified = models.BooleanField(default=False)
+
+    # Better Auth identity: the "user".id from the auth server's table.
+    # Unique so JIT sync can upsert on it in a single statement.
+    better_auth_id = models.CharField(max_length=64, unique=True, null=True, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
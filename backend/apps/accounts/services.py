@@ -0,0 +1,132 @@
+import logging
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+def _split_name(name):
+    name_parts = (name or '').split(' ', 1)
+    first_name = name_parts[0] if len(name_parts) > 0 else ''
+    last_name = name_parts[1] if len(name_parts) > 1 else ''
+    return first_name, last_name
+
+
+class BetterAuthUserService:
+    """
+    Resolve-or-create Django users from Better Auth identities.
+
+    The fast path is a single INSERT ... ON CONFLICT (better_auth_id)
+    DO UPDATE ... RETURNING statement, so first logins and concurrent
+    multi-tab logins cost one round-trip. Rows created before better_auth_id
+    existed (and not yet backfilled) fall back to the legacy email / phone /
+    username lookup once, and are linked to their Better Auth id on the way.
+    """
+
+    @staticmethod
+    def upsert(data: dict, promote_role: bool = True):
+        """
+        Return (user, created) for Better Auth user data.
+
+        `data` uses the keys produced by BetterAuthMiddleware._get_auth_data:
+        id, email, name, role, phone_number.
+
+        With promote_role=True an existing CUSTOMER is promoted to SELLER when
+        Better Auth says so. Roles are never demoted and staff are untouched.
+        """
+        try:
+            with transaction.atomic():
+                return BetterAuthUserService._upsert_by_id(data, promote_role)
+        except IntegrityError as e:
+            # Conflict on email/username/phone: a legacy row without a
+            # better_auth_id, or a concurrent legacy-path create.
+            logger.info(f"[BetterAuth] Upsert conflict for {data.get('id')}, linking legacy user. ({e})")
+            return BetterAuthUserService._link_legacy_user(data, promote_role)
+
+    @staticmethod
+    def _new_user(data: dict):
+        email = data.get('email')
+        better_id = data['id']
+        first_name, last_name = _split_name(data.get('name'))
+        user = User(
+            username=email if email else f"user_{better_id[:12]}",
+            email=email or '',
+            first_name=first_name,
+            last_name=last_name,
+            role=data.get('role') or 'CUSTOMER',
+            phone_number=data.get('phone_number') or None,
+            better_auth_id=better_id,
+        )
+        user.set_unusable_password()
+        return user
+
+    @staticmethod
+    def _upsert_by_id(data: dict, promote_role: bool):
+        user = BetterAuthUserService._new_user(data)
+        fields = User._meta.concrete_fields
+        qn = connection.ops.quote_name
+        table = qn(User._meta.db_table)
+
+        columns = ', '.join(qn(f.column) for f in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        params = [
+            f.get_db_prep_save(f.pre_save(user, add=True), connection)
+            for f in fields
+        ]
+
+        if promote_role:
+            role_sql = (
+                f"CASE WHEN {table}.role = 'CUSTOMER' AND EXCLUDED.role = 'SELLER' "
+                f"AND NOT {table}.is_staff THEN EXCLUDED.role ELSE {table}.role END"
+            )
+        else:
+            role_sql = f"{table}.role"
+
+        # (xmax = 0) is true only for freshly inserted rows.
+        sql = (
+            f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({qn('better_auth_id')}) DO UPDATE SET role = {role_sql} "
+            f"RETURNING {columns}, (xmax = 0) AS created"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        created = row[-1]
+        user = User.from_db(connection.alias, [f.attname for f in fields], row[:-1])
+        return user, created
+
+    @staticmethod
+    def _link_legacy_user(data: dict, promote_role: bool):
+        email = data.get('email')
+        phone = data.get('phone_number')
+        better_id = data['id']
+        username = email if email else f"user_{better_id[:12]}"
+
+        user = None
+        if email:
+            user = User.objects.filter(email=email).first()
+        if not user and phone:
+            user = User.objects.filter(phone_number=phone).first()
+        if not user:
+            user = User.objects.filter(username=username).first()
+        if not user:
+            # The conflicting row may have been our own id committed by a
+            # concurrent request between the upsert and this lookup.
+            user = User.objects.filter(better_auth_id=better_id).first()
+        if not user:
+            raise IntegrityError(f"Could not resolve a Django user for Better Auth id {better_id}")
+
+        update_fields = []
+        if not user.better_auth_id:
+            user.better_auth_id = better_id
+            update_fields.append('better_auth_id')
+        if (promote_role and not user.is_staff and user.role == 'CUSTOMER'
+                and data.get('role') == 'SELLER'):
+            user.role = 'SELLER'
+            update_fields.append('role')
+        if update_fields:
+            user.save(update_fields=update_fields)
+        return user, False
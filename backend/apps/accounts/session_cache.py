@@ -0,0 +1,211 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Redis key namespaces. The raw session token is never used as a key — only
+# its SHA-256 digest — so a leaked cache dump cannot be replayed as a cookie.
+#
+# Resolved sessions ('ba_session:' keys) are also kept in the two-tier
+# cache's per-process LRU (LOCAL_PREFIXES, core/cache.py), whose deletes are
+# broadcast to every worker: a logout or role change drops the session
+# everywhere at once, not just in the worker that handled it.
+SESSION_KEY_PREFIX = 'ba_session'
+USER_INDEX_KEY_PREFIX = 'ba_session_user'
+REJECTED_KEY_PREFIX = 'ba_session_rejected'
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class _LocalLRU:
+    """
+    Small thread-safe, TTL-bounded LRU kept in front of Redis, per worker.
+
+    Only used for rejected tokens, which can never become valid again, so
+    it needs no invalidation.
+    """
+
+    def __init__(self):
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, maxsize):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_rejected_local = _LocalLRU()
+
+
+def _lru_size() -> int:
+    return getattr(settings, 'BETTER_AUTH_SESSION_LRU_SIZE', 0)
+
+
+def _session_ttl(expires_at) -> int:
+    """Seconds until the entry must expire: session expiry or the max TTL, whichever is sooner."""
+    max_ttl = getattr(settings, 'BETTER_AUTH_SESSION_CACHE_TTL', 300)
+    if not expires_at:
+        return max_ttl
+    if timezone.is_naive(expires_at):
+        # Better Auth writes "expiresAt" as a TIMESTAMP without time zone (UTC).
+        expires_at = timezone.make_aware(expires_at, dt_timezone.utc)
+    remaining = int((expires_at - timezone.now()).total_seconds())
+    return max(0, min(max_ttl, remaining))
+
+
+def get_session(token: str):
+    """
+    Return the cached entry for a session token, or None on a miss.
+
+    The entry is a dict: {'user_id', 'role', 'user', 'expires_at'} where
+    'user' is the resolved Django User instance, so a hit costs no DB query.
+    """
+    try:
+        return cache.get(f'{SESSION_KEY_PREFIX}:{hash_token(token)}')
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache read failed: {e}")
+        return None
+
+
+def set_session(token: str, user, expires_at) -> None:
+    """Cache the resolved user for a session token until it (or the max TTL) expires."""
+    ttl = _session_ttl(expires_at)
+    if ttl <= 0:
+        return
+
+    key = hash_token(token)
+    user_id = str(user.pk)
+    entry = {
+        'user_id': user_id,
+        'role': user.role,
+        'user': user,
+        'expires_at': expires_at,
+    }
+    try:
+        cache.set(f'{SESSION_KEY_PREFIX}:{key}', entry, ttl)
+        # Track token hashes per user so role changes can drop every session.
+        _index_add(user_id, key)
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache write failed: {e}")
+
+
+def invalidate_session(token: str) -> None:
+    """Drop a single session (called on logout)."""
+    try:
+        cache.delete(f'{SESSION_KEY_PREFIX}:{hash_token(token)}')
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache delete failed: {e}")
+
+
+def invalidate_user(user_id) -> None:
+    """Drop every cached session for a user (called on role or profile changes)."""
+    try:
+        hashes = _index_pop(user_id)
+        if hashes:
+            cache.delete_many([f'{SESSION_KEY_PREFIX}:{key}' for key in hashes])
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache delete failed: {e}")
+
+
+# ── Per-user index ────────────────────────────────────────────────────────────
+# A Redis set per user (SADD is atomic, so concurrent logins can't drop each
+# other's hashes). Other cache backends are per-process anyway and keep a
+# plain set under the same key.
+
+def _index_add(user_id, key):
+    index_key = f'{USER_INDEX_KEY_PREFIX}:{user_id}'
+    ttl = getattr(settings, 'BETTER_AUTH_SESSION_CACHE_TTL', 300)
+    client = redis_client()
+    if client is None:
+        hashes = set(cache.get(index_key) or ())
+        hashes.add(key)
+        cache.set(index_key, hashes, ttl)
+        return
+    index_key = cache.make_key(index_key)
+    with client.pipeline() as pipe:
+        pipe.sadd(index_key, key)
+        pipe.expire(index_key, ttl)
+        pipe.execute()
+
+
+def _index_pop(user_id):
+    """Remove the user's index and return the token hashes it held."""
+    index_key = f'{USER_INDEX_KEY_PREFIX}:{user_id}'
+    client = redis_client()
+    if client is None:
+        hashes = cache.get(index_key) or ()
+        cache.delete(index_key)
+        return list(hashes)
+    index_key = cache.make_key(index_key)
+    with client.pipeline() as pipe:
+        pipe.smembers(index_key)
+        pipe.delete(index_key)
+        hashes, _ = pipe.execute()
+    return [key.decode() for key in hashes]
+
+
+# ── Negative cache ────────────────────────────────────────────────────────────
+# Tokens that failed the session lookup (expired, revoked or guessed) are
+# remembered briefly so repeated requests with the same bad cookie — typically
+# scrapers — are rejected without another query against the session table.
+# A token that once failed can never become valid: Better Auth writes the
+# session row before it issues the cookie.
+
+def is_rejected(token: str) -> bool:
+    key = hash_token(token)
+    if _lru_size() and _rejected_local.get(key):
+        return True
+    try:
+        return bool(cache.get(f'{REJECTED_KEY_PREFIX}:{key}'))
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache read failed: {e}")
+        return False
+
+
+def reject(token: str) -> None:
+    ttl = getattr(settings, 'BETTER_AUTH_NEGATIVE_CACHE_TTL', 60)
+    if ttl <= 0:
+        return
+    key = hash_token(token)
+    maxsize = _lru_size()
+    if maxsize:
+        _rejected_local.set(key, True, ttl, maxsize)
+    try:
+        cache.set(f'{REJECTED_KEY_PREFIX}:{key}', 1, ttl)
+    except Exception as e:
+        logger.warning(f"[SessionCache] Cache write failed: {e}")
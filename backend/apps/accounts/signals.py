@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='accounts.User')
+@receiver(post_delete, sender='accounts.User')
+def invalidate_user_sessions(sender, instance, created=False, **kwargs):
+    """
+    Drop cached Better Auth sessions whenever a Django user changes, so a
+    role promotion or profile edit is visible on the very next request.
+    """
+    if created:
+        return
+    from .session_cache import invalidate_user
+    invalidate_user(instance.pk)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProfileView, CustomerAddressViewSet, SavedPaymentMethodViewSet, SyncUserView
+from .views import ProfileView, CustomerAddressViewSet, SavedPaymentMethodViewSet, SyncUserView, SessionInvalidateView
 
 router = DefaultRouter(trailing_slash=True)
 router.register(r'addresses', CustomerAddressViewSet, basename='addresses')
@@ -11,5 +11,7 @@ urlpatterns = [
     path('profile/', ProfileView.as_view(), name='profile'),
     #Internal: Called by Better Auth on signup (no trailing slash to match APPEND_SLASH=False)
     path('sync-user', SyncUserView.as_view(), name='sync-user'),
+    # Internal: Called by Better Auth on logout to drop the cached session
+    path('session/invalidate', SessionInvalidateView.as_view(), name='session-invalidate'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
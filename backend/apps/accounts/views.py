@@ -1,6 +1,8 @@
 from rest_framework import generics, permissions, status, viewsets
 from .serializers import UserSerializer, CustomerAddressSerializer, SavedPaymentMethodSerializer
 from .models import CustomerAddress, SavedPaymentMethod
+from . import session_cache
+from .services import BetterAuthUserService
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -55,11 +57,24 @@ class SyncUserView(APIView):
         requested_role = data.get('role', 'CUSTOMER')
         role = requested_role if requested_role in _REGISTRATION_ROLE_ALLOWLIST else 'CUSTOMER'
 
-        name_parts = name.split(' ', 1)
-        first_name = name_parts[0] if len(name_parts) > 0 else ''
-        last_name = name_parts[1] if len(name_parts) > 1 else ''
-
         try:
+            # Same single-statement upsert as the middleware, keyed by the
+            # Better Auth id. Registration never changes an existing role.
+            if data.get('id'):
+                user, created = BetterAuthUserService.upsert({
+                    'id': data['id'],
+                    'email': email,
+                    'name': name,
+                    'role': role,
+                    'phone_number': phone,
+                }, promote_role=False)
+                logger.info(f'[SyncUser] {"Created" if created else "Found"} Django user: {user.username}')
+                return Response({'status': 'ok', 'created': created}, status=200)
+
+            # Legacy hook payload without the Better Auth id.
+            name_parts = name.split(' ', 1)
+            first_name = name_parts[0] if len(name_parts) > 0 else ''
+            last_name = name_parts[1] if len(name_parts) > 1 else ''
             username = email if email else f'phone_{phone}'
 
             user, created = User.objects.get_or_create(
@@ -89,6 +104,46 @@ class SyncUserView(APIView):
 
 
 
+class SessionInvalidateView(APIView):
+    """
+    Internal server-to-server endpoint.
+    Called by Better Auth's databaseHooks.session.delete.after hook on logout
+    so the Django session cache stops honouring the token immediately rather
+    than at the end of its cache TTL.
+
+    Body: {"token": "<raw session token>"} and/or {"email": "<user email>"}
+    (the latter drops every cached session for that user).
+
+    ✅ SECURITY: Protected by the same shared secret as SyncUserView.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        expected = os.environ.get('INTERNAL_SYNC_SECRET', '')
+        if not expected or expected == 'dev-sync-secret':
+            from django.core.exceptions import ImproperlyConfigured
+            raise ImproperlyConfigured(
+                "INTERNAL_SYNC_SECRET must be set to a strong, unique value. "
+                "Never use the default 'dev-sync-secret' in production."
+            )
+
+        secret = request.headers.get('X-Internal-Secret', '')
+        import hmac as _hmac
+        if not _hmac.compare_digest(secret, expected):
+            logger.warning("[SessionInvalidate] Rejected request with invalid X-Internal-Secret")
+            return Response({'error': 'Forbidden'}, status=403)
+
+        token = request.data.get('token')
+        email = request.data.get('email')
+        if token:
+            session_cache.invalidate_session(token)
+        if email:
+            for user_id in User.objects.filter(email=email).values_list('id', flat=True):
+                session_cache.invalidate_user(user_id)
+
+        return Response({'status': 'ok'}, status=200)
+
+
 class ProfileView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
 
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.carts.services import IDLE_SECONDS, persist_idle
+
+
+class Command(BaseCommand):
+    """
+    Write carts that have been idle in Redis to their Postgres tables (see
+    apps/carts/services.py). Schedule it every few minutes; a no-op without
+    a Redis cache.
+
+    Usage: python manage.py flush_idle_carts [--idle-seconds 900]
+    """
+    help = 'Persist idle Redis carts to Postgres.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--idle-seconds', type=int, default=IDLE_SECONDS,
+                            help='Only carts untouched for this long.')
+
+    def handle(self, *args, **options):
+        written = persist_idle(options['idle_seconds'])
+        self.stdout.write(self.style.SUCCESS(f'Persisted {written} carts.'))
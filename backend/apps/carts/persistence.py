@@ -0,0 +1,128 @@
+"""
+Postgres side of carts: the Cart / CartItem tables of retail_orders and
+food_orders.
+
+Both apps have the same shape: Cart (unique per user and store) and
+CartItem (unique per cart and product / menu item). The helpers here take
+the app's models and work out the item column from the CartItem foreign
+keys, so one implementation serves both. Each is a constant number of
+statements however many lines a cart has.
+"""
+import uuid
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+def _item_field(line_model, item_model):
+    """The CartItem foreign key pointing at `item_model` (product or menu_item)."""
+    for field in line_model._meta.concrete_fields:
+        if field.is_relation and field.related_model is item_model:
+            return field
+    raise LookupError(f'{line_model.__name__} has no foreign key to {item_model.__name__}')
+
+
+def sum_lines(lines):
+    """Sum {'product_id', 'quantity'} lines by item id, dropping malformed ones."""
+    totals = Counter()
+    for line in lines:
+        if not isinstance(line, dict):
+            continue
+        try:
+            item_id = uuid.UUID(str(line.get('product_id')))
+            quantity = int(line.get('quantity', 1))
+        except (TypeError, ValueError):
+            continue
+        if quantity > 0:
+            totals[item_id] += quantity
+    return totals
+
+
+def get_or_create_cart(cart_model, user_id, store_id):
+    """The user's cart at the store, created if missing, in one statement. Returns its id."""
+    qn = connection.ops.quote_name
+    table = qn(cart_model._meta.db_table)
+    now = timezone.now()
+    sql = (
+        f"INSERT INTO {table} (id, user_id, store_id, created_at, updated_at) "
+        f"VALUES (%s, %s, %s, %s, %s) "
+        f"ON CONFLICT (user_id, store_id) DO UPDATE SET updated_at = EXCLUDED.updated_at "
+        f"RETURNING id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [uuid.uuid4(), user_id, store_id, now, now])
+        return cursor.fetchone()[0]
+
+
+def upsert_lines(cart_id, line_model, item_model, quantities, add=True):
+    """
+    Write {item_id: quantity} into the cart with one INSERT ... ON CONFLICT
+    (cart_id, product_id / menu_item_id): added onto existing lines, or
+    replacing their quantity when add=False. Items that no longer exist
+    are skipped.
+    """
+    if not quantities:
+        return
+    qn = connection.ops.quote_name
+    table = qn(line_model._meta.db_table)
+    item_column = qn(_item_field(line_model, item_model).column)
+    item_table = qn(item_model._meta.db_table)
+    now = timezone.now()
+    params = []
+    for item_id, quantity in quantities.items():
+        params += [uuid.uuid4(), cart_id, item_id, quantity, now]
+    row_sql = '(%s::uuid, %s::uuid, %s::uuid, %s::integer, %s::timestamptz)'
+    quantity_sql = 'line.quantity + EXCLUDED.quantity' if add else 'EXCLUDED.quantity'
+    sql = (
+        f"INSERT INTO {table} AS line (id, cart_id, {item_column}, quantity, added_at) "
+        f"SELECT v.* FROM (VALUES {', '.join([row_sql] * len(quantities))}) "
+        f"AS v (id, cart_id, item_id, quantity, added_at) "
+        f"WHERE EXISTS (SELECT 1 FROM {item_table} i WHERE i.id = v.item_id) "
+        f"ON CONFLICT (cart_id, {item_column}) DO UPDATE SET quantity = {quantity_sql}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def load_lines(line_model, item_model, user_id, store_id):
+    """The user's cart at the store as {item_id (str): quantity}."""
+    item_field = _item_field(line_model, item_model)
+    rows = line_model.objects.filter(
+        cart__user_id=user_id, cart__store_id=store_id,
+    ).values_list(item_field.attname, 'quantity')
+    return {str(item_id): quantity for item_id, quantity in rows}
+
+
+def remove_line(line_model, item_model, user_id, store_id, item_id):
+    item_field = _item_field(line_model, item_model)
+    line_model.objects.filter(
+        cart__user_id=user_id, cart__store_id=store_id, **{item_field.attname: item_id},
+    ).delete()
+
+
+def lock_cart(cart_model, user_id, store_id):
+    """Serialize writers of one stored cart until the current transaction ends."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+            [f'{cart_model._meta.db_table}:{user_id}:{store_id}'],
+        )
+
+
+def delete_cart(cart_model, user_id, store_id):
+    cart_model.objects.filter(user_id=user_id, store_id=store_id).delete()
+
+
+@transaction.atomic
+def replace_lines(cart_model, line_model, item_model, user_id, store_id, quantities):
+    """Make the stored cart exactly {item_id: quantity}; an empty cart is deleted."""
+    if not quantities:
+        delete_cart(cart_model, user_id, store_id)
+        return
+    cart_id = get_or_create_cart(cart_model, user_id, store_id)
+    upsert_lines(cart_id, line_model, item_model, quantities, add=False)
+    item_field = _item_field(line_model, item_model)
+    line_model.objects.filter(cart_id=cart_id).exclude(
+        **{f'{item_field.attname}__in': list(quantities)}
+    ).delete()
@@ -0,0 +1,388 @@
+"""
+Shopping carts for retail and food stores, one implementation for both.
+
+Active carts live in Redis, one hash per (kind, user, store) mapping item id
+to quantity. Adding, changing and viewing a warm cart is a couple of Redis
+round-trips; item names, prices and images come from the store's versioned
+cache (core/versioning.py), so none of it touches Postgres.
+
+The Cart / CartItem tables of retail_orders and food_orders stay the
+durable copy and are written lazily:
+
+- on the first touch of a cart that isn't in Redis, its stored lines are
+  loaded once (hydrate),
+- every write marks the cart dirty in a sorted set scored by time;
+  `manage.py flush_idle_carts` (a cron job, see render.yaml) writes carts
+  that have been idle for IDLE_SECONDS to Postgres,
+- checkout (order creation) writes the customer's cart through at once.
+
+A dirty cart has no TTL, so it can neither expire nor be evicted before it
+is written: the Redis runs with maxmemory-policy volatile-lru, which only
+evicts keys that have one. Once persisted, the hash gets a sliding CART_TTL
+again and may be evicted freely; the next touch reloads it. A write applies
+only to a hash that holds the loaded cart (one script checks and writes), so
+an eviction can't leave a dirty hash of just the new lines for persist() to
+save over the stored ones. Writes to the stored cart (persist, clear) hold
+a per-cart Postgres lock, so a flush that read the cart before it was
+cleared can't bring it back.
+
+Without a Redis cache (LocMemCache deployments, local development) the
+same functions read and write Postgres directly.
+"""
+import logging
+import time
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+
+from apps.stores.models import Store
+from core.cache import redis_client
+from core.versioning import cached_for_store, get_store_version
+from . import persistence
+
+logger = logging.getLogger(__name__)
+
+# Sliding lifetime of a persisted (clean) cart in Redis.
+CART_TTL = 60 * 60 * 24 * 7
+
+# Carts untouched for this long are written to Postgres by flush_idle_carts.
+IDLE_SECONDS = 15 * 60
+
+# Lifetime of cached item details; versioned keys go stale on any store change.
+ITEM_DETAILS_TIMEOUT = 60 * 60
+
+DIRTY_KEY = 'carts:dirty'
+
+# Hash field present in every hydrated cart, so an empty cart is not reloaded.
+LOADED_FIELD = '_'
+
+# Fill the hash from Postgres only if nobody loaded it meanwhile; a racing
+# write must not be overwritten by the stored quantities.
+_HYDRATE = """
+if redis.call('hexists', KEYS[1], ARGV[2]) == 0 then
+    redis.call('del', KEYS[1])
+    redis.call('hset', KEYS[1], unpack(ARGV, 2))
+    redis.call('expire', KEYS[1], ARGV[1])
+end
+"""
+
+# Apply (field, quantity) pairs and mark the cart dirty, but only if the hash
+# holds the loaded cart; returns 0 (nothing written) otherwise. 'incr' adds
+# to the quantities, 'set' replaces them (0 removes the line).
+_WRITE = """
+if redis.call('hexists', KEYS[1], ARGV[3]) == 0 then
+    return 0
+end
+for i = 5, #ARGV, 2 do
+    if ARGV[4] == 'incr' then
+        redis.call('hincrby', KEYS[1], ARGV[i], ARGV[i + 1])
+    elseif ARGV[i + 1] == '0' then
+        redis.call('hdel', KEYS[1], ARGV[i])
+    else
+        redis.call('hset', KEYS[1], ARGV[i], ARGV[i + 1])
+    end
+end
+redis.call('persist', KEYS[1])
+redis.call('zadd', KEYS[2], ARGV[2], ARGV[1])
+return 1
+"""
+
+# A loaded hash vanishing between hydrate and write (eviction) is retried
+# this many times before giving up.
+WRITE_ATTEMPTS = 3
+
+# Clear the dirty mark only if the cart wasn't written again since it was
+# read; the now durable hash may then expire.
+_CLEAN_IF_UNCHANGED = """
+if redis.call('zscore', KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call('expire', KEYS[2], ARGV[3])
+    return redis.call('zrem', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+# Read a cart, sliding its TTL unless it is dirty (dirty carts have none).
+_READ = """
+if not redis.call('zscore', KEYS[1], ARGV[1]) then
+    redis.call('expire', KEYS[2], ARGV[2])
+end
+return redis.call('hgetall', KEYS[2])
+"""
+
+
+class CartKind:
+    """The models behind one kind of cart, resolved lazily."""
+
+    def __init__(self, name, label, cart_model, line_model, item_model, available):
+        self.name = name
+        self.label = label
+        self._models = (cart_model, line_model, item_model)
+        self.available = available
+
+    @cached_property
+    def cart_model(self):
+        return apps.get_model(self._models[0])
+
+    @cached_property
+    def line_model(self):
+        return apps.get_model(self._models[1])
+
+    @cached_property
+    def item_model(self):
+        return apps.get_model(self._models[2])
+
+    def items(self, store_id):
+        """The store's items that can be put in a cart."""
+        return self.item_model.objects.filter(store_id=store_id, **self.available)
+
+
+KINDS = {
+    'retail': CartKind(
+        'retail', 'Cart', 'retail_orders.Cart', 'retail_orders.CartItem',
+        'retail_catalog.RetailProduct', {'is_active': True},
+    ),
+    'food': CartKind(
+        'food', 'Food cart', 'food_orders.Cart', 'food_orders.CartItem',
+        'food_menu.MenuItem', {'is_available': True},
+    ),
+}
+
+
+def _redis():
+    """Raw client of the default cache if it is Redis, else None."""
+    return redis_client()
+
+
+def _member(kind, user_id, store_id):
+    return f'{kind.name}:{user_id}:{store_id}'
+
+
+def _cart_key(member):
+    return cache.make_key(f'cart:{member}')
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def store_exists(store_id):
+    return cached_for_store(
+        store_id, 'exists', (), lambda: Store.objects.filter(pk=store_id).exists(),
+    )
+
+
+# ── Item details ─────────────────────────────────────────────────────────────
+
+def _load_details(kind, store_id, ids):
+    storage = kind.item_model._meta.get_field('image').storage
+    rows = kind.items(store_id).filter(pk__in=ids).values_list('id', 'name', 'price', 'image')
+    return {
+        str(pk): {'name': name, 'price': str(price), 'image': storage.url(image) if image else None}
+        for pk, name, price, image in rows
+    }
+
+
+def item_details(kind, store_id, ids):
+    """
+    {item_id: {name, price, image}} for the ids that are available items of
+    the store. Served per item from the store's versioned cache; only misses
+    are read from Postgres (in one query) and cached, unknown ids included.
+    """
+    ids = [str(item_id) for item_id in ids]
+    version = get_store_version(store_id)
+    if version is None:
+        return _load_details(kind, store_id, ids)
+
+    keys = {f'store:{store_id}:v{version}:cart_item:{kind.name}:{item_id}': item_id for item_id in ids}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"[Carts] Item details read failed: {e}")
+        found = {}
+    details = {keys[key]: value for key, value in found.items()}
+    missing = [item_id for item_id in ids if item_id not in details]
+    if missing:
+        loaded = _load_details(kind, store_id, missing)
+        for item_id in missing:
+            details[item_id] = loaded.get(item_id, False)
+        try:
+            cache.set_many(
+                {key: details[item_id] for key, item_id in keys.items() if item_id in missing},
+                timeout=ITEM_DETAILS_TIMEOUT,
+            )
+        except Exception as e:
+            logger.warning(f"[Carts] Item details write failed: {e}")
+    return {item_id: value for item_id, value in details.items() if value}
+
+
+# ── Redis carts ──────────────────────────────────────────────────────────────
+
+def _hydrate(client, kind, user_id, store_id, key):
+    """Make sure the Redis hash holds the cart, loading it from Postgres once."""
+    lines = persistence.load_lines(kind.line_model, kind.item_model, user_id, store_id)
+    args = [CART_TTL, LOADED_FIELD, 1]
+    for item_id, quantity in lines.items():
+        args += [item_id, quantity]
+    client.eval(_HYDRATE, 1, key, *args)
+
+
+def _write(client, kind, user_id, store_id, op, quantities):
+    member = _member(kind, user_id, store_id)
+    key = _cart_key(member)
+    args = [member, _now_ms(), LOADED_FIELD, op]
+    for item_id, quantity in quantities.items():
+        args += [item_id, quantity]
+    for _ in range(WRITE_ATTEMPTS):
+        if client.eval(_WRITE, 2, key, cache.make_key(DIRTY_KEY), *args):
+            return
+        _hydrate(client, kind, user_id, store_id, key)
+    raise RuntimeError(f'Cart {member} was evicted on every write attempt.')
+
+
+def _quantities(raw):
+    return {
+        field.decode(): int(value) for field, value in raw.items() if field.decode() != LOADED_FIELD
+    }
+
+
+def _read(client, member):
+    flat = client.eval(_READ, 2, cache.make_key(DIRTY_KEY), _cart_key(member), member, CART_TTL)
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+def add_items(kind, user_id, store_id, lines):
+    """
+    Add {'product_id', 'quantity'} lines to the cart; quantities of items
+    already in it are summed. Lines for unknown or unavailable items are
+    skipped. Returns the number of lines added.
+    """
+    quantities = persistence.sum_lines(lines)
+    valid = item_details(kind, store_id, quantities)
+    quantities = {str(item_id): quantity for item_id, quantity in quantities.items() if str(item_id) in valid}
+    if not quantities:
+        return 0
+
+    client = _redis()
+    if client is None:
+        with transaction.atomic():
+            cart_id = persistence.get_or_create_cart(kind.cart_model, user_id, store_id)
+            persistence.upsert_lines(cart_id, kind.line_model, kind.item_model, quantities)
+        return len(quantities)
+
+    _write(client, kind, user_id, store_id, 'incr', quantities)
+    return len(quantities)
+
+
+def set_quantity(kind, user_id, store_id, item_id, quantity):
+    """Set one line's quantity (0 removes it). False if the item can't be added."""
+    item_id = str(item_id)
+    if quantity > 0 and item_id not in item_details(kind, store_id, [item_id]):
+        return False
+
+    client = _redis()
+    if client is None:
+        if quantity > 0:
+            with transaction.atomic():
+                cart_id = persistence.get_or_create_cart(kind.cart_model, user_id, store_id)
+                persistence.upsert_lines(cart_id, kind.line_model, kind.item_model, {item_id: quantity}, add=False)
+        else:
+            persistence.remove_line(kind.line_model, kind.item_model, user_id, store_id, item_id)
+        return True
+
+    _write(client, kind, user_id, store_id, 'set', {item_id: max(quantity, 0)})
+    return True
+
+
+def get_items(kind, user_id, store_id):
+    """The cart's lines as [{id, name, price, quantity, image}], available items only."""
+    client = _redis()
+    if client is None:
+        quantities = persistence.load_lines(kind.line_model, kind.item_model, user_id, store_id)
+    else:
+        member = _member(kind, user_id, store_id)
+        raw = _read(client, member)
+        if LOADED_FIELD.encode() not in raw:
+            _hydrate(client, kind, user_id, store_id, _cart_key(member))
+            raw = client.hgetall(_cart_key(member))
+        quantities = _quantities(raw)
+
+    details = item_details(kind, store_id, quantities)
+    return [
+        {'id': item_id, 'quantity': quantity, **details[item_id]}
+        for item_id, quantity in quantities.items() if item_id in details
+    ]
+
+
+def clear(kind, user_id, store_id):
+    """Empty the cart everywhere (after a successful payment)."""
+    client = _redis()
+    with transaction.atomic():
+        persistence.lock_cart(kind.cart_model, user_id, store_id)
+        if client is not None:
+            member = _member(kind, user_id, store_id)
+            with client.pipeline() as pipe:
+                pipe.delete(_cart_key(member))
+                pipe.zrem(cache.make_key(DIRTY_KEY), member)
+                pipe.execute()
+        persistence.delete_cart(kind.cart_model, user_id, store_id)
+
+
+def persist(kind, user_id, store_id):
+    """
+    Write the cart's Redis copy to Postgres if it has unsaved changes.
+    Returns True if anything was written.
+    """
+    client = _redis()
+    if client is None:
+        return False
+    member = _member(kind, user_id, store_id)
+    key = _cart_key(member)
+    dirty_key = cache.make_key(DIRTY_KEY)
+    with transaction.atomic():
+        # Read under the lock: a clear() that got there first has removed
+        # the dirty mark, so the cart isn't written back.
+        persistence.lock_cart(kind.cart_model, user_id, store_id)
+        with client.pipeline() as pipe:
+            pipe.zscore(dirty_key, member)
+            pipe.hgetall(key)
+            current, raw = pipe.execute()
+        if current is None:
+            return False
+        # Only a hash holding the loaded cart is the whole cart; anything
+        # else would replace the stored lines with a fragment.
+        loaded = LOADED_FIELD.encode() in raw
+        if loaded:
+            persistence.replace_lines(
+                kind.cart_model, kind.line_model, kind.item_model, user_id, store_id, _quantities(raw),
+            )
+        elif raw:
+            logger.error(f"[Carts] Not persisting {member}: its Redis copy was never loaded.")
+    client.eval(_CLEAN_IF_UNCHANGED, 2, dirty_key, key, member, int(current), CART_TTL)
+    return loaded
+
+
+def persist_idle(idle_seconds=IDLE_SECONDS):
+    """Write every cart idle for `idle_seconds` to Postgres. Returns how many were written."""
+    client = _redis()
+    if client is None:
+        return 0
+    dirty_key = cache.make_key(DIRTY_KEY)
+    written = 0
+    for member in client.zrangebyscore(dirty_key, '-inf', _now_ms() - idle_seconds * 1000):
+        member = member.decode()
+        name, user_id, store_id = member.split(':')
+        kind = KINDS.get(name)
+        if kind is None:
+            client.zrem(dirty_key, member)
+            continue
+        try:
+            written += persist(kind, user_id, uuid.UUID(store_id))
+        except Exception as e:
+            # Stays dirty; retried on the next run.
+            logger.error(f"[Carts] Persisting {member} failed: {e}")
+    return written
@@ -0,0 +1,146 @@
+from unittest import SkipTest, mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.retail_catalog.models import RetailProduct
+from apps.stores.models import Store
+from core.cache import redis_client
+from . import services
+from .views import CartDetailView, CartMergeView
+
+User = get_user_model()
+
+
+class WarmCartTests(TestCase):
+    """Needs the default cache to be a reachable Redis; skipped otherwise."""
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            client = redis_client()
+            if client is None or not client.ping():
+                raise SkipTest('default cache is not Redis')
+        except SkipTest:
+            raise
+        except Exception as e:
+            raise SkipTest(f'Redis unavailable: {e}')
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='cart-owner', role='SELLER')
+        cls.customer = User.objects.create(username='cart-customer')
+        cls.store = Store.objects.create(owner=owner, name='Shop', category='general', latitude=9, longitude=38)
+        cls.products = [
+            RetailProduct.objects.create(store=cls.store, name=f'Product {i}', price=i + 1) for i in range(5)
+        ]
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.kind = services.KINDS['retail']
+        self.member = services._member(self.kind, self.customer.pk, self.store.id)
+        self.addCleanup(self._forget_cart)
+
+    def _forget_cart(self):
+        client = redis_client()
+        client.delete(services._cart_key(self.member))
+        client.zrem(cache.make_key(services.DIRTY_KEY), self.member)
+
+    def _call(self, view, method, data=None):
+        if method == 'get':
+            request = self.factory.get('/', {'store_id': str(self.store.id)})
+        else:
+            request = getattr(self.factory, method)('/', {'store_id': str(self.store.id), **data}, format='json')
+        force_authenticate(request, self.customer)
+        response = view(request)
+        response.render()
+        return response
+
+    def test_warm_cart_makes_no_postgres_queries(self):
+        merge = CartMergeView.as_view(kind='retail')
+        detail = CartDetailView.as_view(kind='retail')
+        lines = [{'product_id': str(product.id), 'quantity': 2} for product in self.products]
+
+        # Cold: loads the stored cart, the store and the item details once.
+        self.assertEqual(self._call(merge, 'post', {'items': lines}).status_code, 200)
+        self.assertEqual(self._call(detail, 'get').status_code, 200)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._call(merge, 'post', {'items': lines[:2]}).status_code, 200)
+            response = self._call(detail, 'patch', {'product_id': str(self.products[4].id), 'quantity': 0})
+            self.assertEqual(response.status_code, 200)
+            response = self._call(detail, 'get')
+
+        quantities = {item['id']: item['quantity'] for item in response.data['items']}
+        self.assertEqual(quantities, {
+            str(self.products[0].id): 4,
+            str(self.products[1].id): 4,
+            str(self.products[2].id): 2,
+            str(self.products[3].id): 2,
+        })
+
+    def test_persist_writes_cart_and_clear_removes_it(self):
+        services.add_items(self.kind, self.customer.pk, self.store.id, [
+            {'product_id': str(self.products[0].id), 'quantity': 3},
+        ])
+        self.assertEqual(redis_client().ttl(services._cart_key(self.member)), -1)
+
+        self.assertTrue(services.persist(self.kind, self.customer.pk, self.store.id))
+        self.assertEqual(
+            services.persistence.load_lines(self.kind.line_model, self.kind.item_model, self.customer.pk, self.store.id),
+            {str(self.products[0].id): 3},
+        )
+        self.assertGreater(redis_client().ttl(services._cart_key(self.member)), 0)
+
+        services.clear(self.kind, self.customer.pk, self.store.id)
+        self.assertFalse(services.persist(self.kind, self.customer.pk, self.store.id))
+        self.assertFalse(self.kind.cart_model.objects.filter(user=self.customer, store=self.store).exists())
+
+    def test_hash_evicted_between_hydrate_and_write_keeps_stored_lines(self):
+        services.add_items(self.kind, self.customer.pk, self.store.id, [
+            {'product_id': str(self.products[0].id), 'quantity': 3},
+        ])
+        services.persist(self.kind, self.customer.pk, self.store.id)
+        key = services._cart_key(self.member)
+        redis_client().delete(key)
+
+        hydrate = services._hydrate
+        calls = []
+
+        def evicting_hydrate(*args):
+            hydrate(*args)
+            calls.append(args)
+            if len(calls) == 1:
+                redis_client().delete(key)
+
+        with mock.patch.object(services, '_hydrate', side_effect=evicting_hydrate):
+            services.add_items(self.kind, self.customer.pk, self.store.id, [
+                {'product_id': str(self.products[1].id), 'quantity': 1},
+            ])
+        self.assertEqual(len(calls), 2)
+
+        self.assertTrue(services.persist(self.kind, self.customer.pk, self.store.id))
+        self.assertEqual(
+            services.persistence.load_lines(self.kind.line_model, self.kind.item_model, self.customer.pk, self.store.id),
+            {str(self.products[0].id): 3, str(self.products[1].id): 1},
+        )
+
+    def test_persist_refuses_a_hash_that_was_never_loaded(self):
+        services.add_items(self.kind, self.customer.pk, self.store.id, [
+            {'product_id': str(self.products[0].id), 'quantity': 3},
+        ])
+        services.persist(self.kind, self.customer.pk, self.store.id)
+        client = redis_client()
+        client.delete(services._cart_key(self.member))
+        client.hset(services._cart_key(self.member), str(self.products[1].id), 1)
+        client.zadd(cache.make_key(services.DIRTY_KEY), {self.member: services._now_ms()})
+
+        with self.assertLogs('apps.carts.services', 'ERROR'):
+            self.assertFalse(services.persist(self.kind, self.customer.pk, self.store.id))
+        self.assertEqual(
+            services.persistence.load_lines(self.kind.line_model, self.kind.item_model, self.customer.pk, self.store.id),
+            {str(self.products[0].id): 3},
+        )
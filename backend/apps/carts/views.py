@@ -0,0 +1,91 @@
+import uuid
+
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import services
+
+
+class CartView(APIView):
+    """Base for the cart endpoints; `kind` ('retail' or 'food') is set in urls.py."""
+    permission_classes = [IsAuthenticated]
+    kind = None
+
+    def get_kind(self):
+        return services.KINDS[self.kind]
+
+    def get_store_id(self, value):
+        if not value:
+            return None, Response({"error": "store_id is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return uuid.UUID(str(value)), None
+        except ValueError:
+            return None, Response({"error": "Store not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    def format_items(self, request, items):
+        # Shape expected by the Next.js checkout UI.
+        return [
+            {**item, "image": request.build_absolute_uri(item["image"]) if item["image"] else None}
+            for item in items
+        ]
+
+
+class CartMergeView(CartView):
+    """POST {store_id, items: [{product_id, quantity}]}: add a guest cart to the user's cart."""
+
+    def post(self, request, *args, **kwargs):
+        store_id, error = self.get_store_id(request.data.get('store_id'))
+        if error:
+            return error
+        guest_items = request.data.get('items', [])
+        if not isinstance(guest_items, list):
+            return Response({"error": "items must be a list"}, status=status.HTTP_400_BAD_REQUEST)
+        if not services.store_exists(store_id):
+            return Response({"error": "Store not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        # The frontend sends menu item ids as 'product_id' too.
+        kind = self.get_kind()
+        services.add_items(kind, request.user.pk, store_id, guest_items)
+        return Response({"message": f"{kind.label} merged successfully"}, status=status.HTTP_200_OK)
+
+
+class CartDetailView(CartView):
+    """
+    GET    ?store_id=                             the user's cart at the store
+    PATCH  {store_id, product_id, quantity}       set one line (0 removes it)
+    DELETE ?store_id=                             empty it (after payment)
+    """
+
+    def get(self, request, *args, **kwargs):
+        store_id, error = self.get_store_id(request.query_params.get('store_id'))
+        if error:
+            return error
+        items = services.get_items(self.get_kind(), request.user.pk, store_id)
+        return Response({"items": self.format_items(request, items)}, status=status.HTTP_200_OK)
+
+    def patch(self, request, *args, **kwargs):
+        store_id, error = self.get_store_id(request.data.get('store_id'))
+        if error:
+            return error
+        try:
+            item_id = uuid.UUID(str(request.data.get('product_id')))
+            quantity = int(request.data.get('quantity'))
+        except (TypeError, ValueError):
+            return Response({"error": "product_id and quantity are required"}, status=status.HTTP_400_BAD_REQUEST)
+        if quantity < 0:
+            return Response({"error": "quantity must not be negative"}, status=status.HTTP_400_BAD_REQUEST)
+
+        kind = self.get_kind()
+        if not services.set_quantity(kind, request.user.pk, store_id, item_id, quantity):
+            return Response({"error": "Item not available in this store"}, status=status.HTTP_404_NOT_FOUND)
+        items = services.get_items(kind, request.user.pk, store_id)
+        return Response({"items": self.format_items(request, items)}, status=status.HTTP_200_OK)
+
+    def delete(self, request, *args, **kwargs):
+        store_id, error = self.get_store_id(request.query_params.get('store_id'))
+        if error:
+            return error
+        services.clear(self.get_kind(), request.user.pk, store_id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FoodMenuConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.food_menu'
+
+    def ready(self):
+        import apps.food_menu.signals  # noqa: F401
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food_menu', '0007_search_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='menuitem',
+            name='menu_item_store_available_idx',
+        ),
+        migrations.AddIndex(
+            model_name='foodfavorite',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='food_fav_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='menuitem',
+            index=models.Index(fields=['store', 'is_available', 'created_at', 'id'], name='menu_item_store_created_idx'),
+        ),
+    ]
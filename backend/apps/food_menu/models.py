@@ -1,4 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from apps.search.normalize import search_keys
 from apps.stores.models import Store
 from django.contrib.auth import get_user_model
 import uuid
@@ -36,13 +39,30 @@ class MenuItem(models.Model):
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Full-text document over name (A) and description (B), maintained by a
+    # database trigger (migration 0005); see apps/search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Folded/transliterated spellings of the name (apps/search/normalize.py),
+    # indexed through search_vector. Maintained in save(); bulk writes that
+    # change name must set it too.
+    search_keys = models.TextField(blank=True, default='', editable=False)
 
     class Meta:
       
         indexes = [
-            models.Index(fields=['store', 'is_available'], name='menu_item_store_available_idx'),
+            # Storefront menu list, keyset-paged on (created_at, id).
+            models.Index(fields=['store', 'is_available', 'created_at', 'id'], name='menu_item_store_created_idx'),
+            GinIndex(fields=['search_vector'], name='menu_item_search_vector_idx'),
+            GinIndex(fields=['name'], name='menu_item_name_trgm_idx', opclasses=['gin_trgm_ops']),
         ]
 
+    def save(self, *args, **kwargs):
+        self.search_keys = search_keys(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'search_keys'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -79,6 +99,9 @@ class FoodFavorite(models.Model):
 
     class Meta:
         unique_together = ('user', 'menu_item')
+        indexes = [
+            models.Index(fields=['user', 'created_at', 'id'], name='food_fav_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.email} -> {self.menu_item.name}"
\ No newline at end of file
@@ -46,4 +46,16 @@ class FoodFavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = FoodFavorite
         fields = ['id', 'menu_item', 'menu_item_details', 'created_at']
-        read_only_fields = ['id', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at']
+
+
+class MenuItemChangeSerializer(serializers.Serializer):
+    """One row of a bulk price / availability update (BulkStoreUpdateMixin)."""
+    id = serializers.UUIDField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    is_available = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) < 2:
+            raise serializers.ValidationError('Set at least one of price, is_available.')
+        return attrs
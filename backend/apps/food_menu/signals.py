@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.versioning import bump_store_version_on_commit
+
+
+@receiver(post_save, sender='food_menu.MenuCategory')
+@receiver(post_delete, sender='food_menu.MenuCategory')
+@receiver(post_save, sender='food_menu.MenuItem')
+@receiver(post_delete, sender='food_menu.MenuItem')
+def bump_store_version_on_menu_change(sender, instance, **kwargs):
+    """Menu changes invalidate the store's ETags (see core/versioning.py)."""
+    bump_store_version_on_commit(instance.store_id)
+
+
+@receiver(post_save, sender='food_menu.MenuItemOption')
+@receiver(post_delete, sender='food_menu.MenuItemOption')
+@receiver(post_save, sender='food_menu.MenuItemExtra')
+@receiver(post_delete, sender='food_menu.MenuItemExtra')
+def bump_store_version_on_item_detail_change(sender, instance, **kwargs):
+    from .models import MenuItem
+    store_id = MenuItem.objects.filter(pk=instance.menu_item_id).values_list('store_id', flat=True).first()
+    bump_store_version_on_commit(store_id)
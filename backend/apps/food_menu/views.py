@@ -2,8 +2,13 @@ from rest_framework import viewsets, permissions
 from rest_framework.exceptions import ValidationError
 from django.shortcuts import get_object_or_404
 from .models import MenuCategory, MenuItem, MenuItemOption, MenuItemExtra, FoodFavorite
-from .serializers import MenuCategorySerializer, MenuItemSerializer, MenuItemOptionSerializer, MenuItemExtraSerializer, FoodFavoriteSerializer
+from .serializers import (
+    MenuCategorySerializer, MenuItemSerializer, MenuItemChangeSerializer,
+    MenuItemOptionSerializer, MenuItemExtraSerializer, FoodFavoriteSerializer,
+)
 from apps.stores.models import Store
+from core.mixins import BulkStoreUpdateMixin, LazyAuthenticationMixin, StoreCachedListMixin
+from core.pagination import CreatedAtCursorPagination
 
 
 class IsStoreOwnerOrReadOnly(permissions.BasePermission):
@@ -23,7 +28,7 @@ class IsStoreOwnerOrReadOnly(permissions.BasePermission):
         return False
 
 
-class MenuCategoryViewSet(viewsets.ModelViewSet):
+class MenuCategoryViewSet(LazyAuthenticationMixin, StoreCachedListMixin, viewsets.ModelViewSet):
     serializer_class = MenuCategorySerializer
     permission_classes = [IsStoreOwnerOrReadOnly]
 
@@ -45,9 +50,13 @@ class MenuCategoryViewSet(viewsets.ModelViewSet):
         serializer.save(store=store)
 
 
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(LazyAuthenticationMixin, StoreCachedListMixin, BulkStoreUpdateMixin, viewsets.ModelViewSet):
     serializer_class = MenuItemSerializer
+    bulk_change_serializer_class = MenuItemChangeSerializer
     permission_classes = [IsStoreOwnerOrReadOnly]
+    # Menu items read in the order they were added.
+    pagination_class = CreatedAtCursorPagination
+    cursor_ordering = 'created_at'
 
     def get_queryset(self):
         store_id = self.request.query_params.get('store_id')
@@ -102,6 +111,7 @@ class MenuItemExtraViewSet(viewsets.ModelViewSet):
 
 class FoodFavoriteViewSet(viewsets.ModelViewSet):
     serializer_class = FoodFavoriteSerializer
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
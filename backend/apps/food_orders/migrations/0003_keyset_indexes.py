@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('food_orders', '0002_cart_cartitem'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='foodorder',
+            index=models.Index(fields=['customer', 'created_at', 'id'], name='food_order_cust_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='foodorder',
+            index=models.Index(fields=['store', 'created_at', 'id'], name='food_order_store_created_idx'),
+        ),
+    ]
@@ -1,12 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CartDetailView, FoodOrderViewSet, CartMergeView
+from apps.carts.views import CartDetailView, CartMergeView
+from .views import FoodOrderViewSet
 
 router = DefaultRouter(trailing_slash=True)
 router.register(r'', FoodOrderViewSet, basename='food-orders')
 
 urlpatterns = [
-    path('cart/merge/', CartMergeView.as_view(), name='food-cart-merge'),
-    path('cart/', CartDetailView.as_view(), name='cart-detail'),
+    path('cart/merge/', CartMergeView.as_view(kind='food'), name='food-cart-merge'),
+    path('cart/', CartDetailView.as_view(kind='food'), name='cart-detail'),
     path('', include(router.urls))
-]
\ No newline at end of file
+]
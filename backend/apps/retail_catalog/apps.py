@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RetailCatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.retail_catalog'
+
+    def ready(self):
+        import apps.retail_catalog.signals  # noqa: F401
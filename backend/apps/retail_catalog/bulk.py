@@ -0,0 +1,283 @@
+"""
+Bulk product import / export for one store.
+
+Import reads a CSV or JSON-lines upload row by row (never the whole file in
+memory), validates each row, and upserts in batches. A row with an `id`
+updates that product (its SKU may change); otherwise a known SKU updates the
+product that has it, and anything else is created. The store's ids and SKUs
+are loaded once up front, so the unique_sku_per_store check and the
+create-vs-update decision need no per-row queries. Each batch is one
+bulk_create plus one SELECT and one bulk_update. Invalid rows are skipped and
+reported with their line number; the valid rows are written in one
+transaction.
+
+Bulk writes skip save() and signals, so search_keys and updated_at are set
+here and the store's cache version is bumped once at the end.
+
+Export streams the same columns back out, id included, so an export can be
+edited and re-imported without duplicating products that have no SKU.
+"""
+import codecs
+import csv
+import json
+import uuid
+from decimal import Decimal
+
+from django import forms
+from django.db import transaction
+from django.utils import timezone
+
+from apps.search.normalize import search_keys
+from core.versioning import bump_store_version_on_commit
+from .models import RetailCategory, RetailProduct
+
+COLUMNS = ('id', 'sku', 'name', 'description', 'price', 'stock_quantity', 'weight_kg', 'is_active', 'category')
+
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+
+# The report lists at most this many row errors (the count is always exact).
+MAX_REPORTED_ERRORS = 500
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ProductRowForm(forms.Form):
+    id = forms.UUIDField(required=False)
+    sku = forms.CharField(max_length=100, required=False)
+    # name and price are required for new products only (see _clean).
+    name = forms.CharField(max_length=255, required=False)
+    description = forms.CharField(required=False, strip=False)
+    price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False)
+    stock_quantity = forms.IntegerField(min_value=0, required=False)
+    weight_kg = forms.DecimalField(max_digits=6, decimal_places=2, min_value=Decimal('0'), required=False)
+    is_active = forms.NullBooleanField(required=False)
+    category = forms.CharField(required=False)
+
+
+# ── Reading ──────────────────────────────────────────────────────────────────
+
+def _text_lines(upload):
+    # UploadedFile iterates over byte lines chunk by chunk; decode lazily.
+    return codecs.iterdecode(upload, 'utf-8-sig')
+
+
+def _csv_rows(upload):
+    reader = csv.DictReader(_text_lines(upload))
+    if not reader.fieldnames or not {'id', 'sku', 'name'} & set(reader.fieldnames):
+        raise ImportFormatError("CSV header must include 'id', 'sku' or 'name'.")
+    for row in reader:
+        yield reader.line_num, {key: value for key, value in row.items() if key in COLUMNS}
+
+
+def _jsonl_rows(upload):
+    for line_no, line in enumerate(_text_lines(upload), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_no, None
+            continue
+        yield line_no, row if isinstance(row, dict) else None
+
+
+def read_rows(upload):
+    """Yield (line_number, row dict or None if unparseable) from an upload."""
+    name = (upload.name or '').lower()
+    if name.endswith('.csv'):
+        return _csv_rows(upload)
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return _jsonl_rows(upload)
+    raise ImportFormatError('Upload a .csv or .jsonl file.')
+
+
+# ── Import ───────────────────────────────────────────────────────────────────
+
+class ProductImporter:
+    def __init__(self, store, dry_run=False):
+        self.store = store
+        self.dry_run = dry_run
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+        # Every product id and SKU the store has, plus those created earlier
+        # in this file.
+        self.known_ids = set()
+        self.known_skus = {}
+        for product_id, sku in RetailProduct.objects.filter(store=store).values_list('id', 'sku'):
+            self.known_ids.add(product_id)
+            if sku is not None:
+                self.known_skus[sku] = product_id
+        self.seen_ids = {}
+        self.seen_skus = {}
+        self.categories = {}
+        for category_id, slug, name in RetailCategory.objects.filter(store=store).values_list('id', 'slug', 'name'):
+            self.categories[slug.lower()] = category_id
+            self.categories.setdefault(name.lower(), category_id)
+
+    def _error(self, line_no, sku, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': line_no, 'sku': sku, 'errors': errors})
+
+    def _clean(self, line_no, row):
+        if row is None:
+            self._error(line_no, None, {'row': ['Not a valid JSON object.']})
+            return None
+        form = ProductRowForm(row)
+        if not form.is_valid():
+            self._error(line_no, row.get('sku'), {f: list(e) for f, e in form.errors.items()})
+            return None
+        data = form.cleaned_data
+        sku = data['sku'] or None
+        product_id = data['id']
+        if product_id is not None:
+            if product_id not in self.known_ids:
+                self._error(line_no, sku, {'id': ['No product with this id in this store.']})
+                return None
+            if self.known_skus.get(sku, product_id) != product_id:
+                self._error(line_no, sku, {'sku': ['Already used by another product in this store.']})
+                return None
+        if sku is not None:
+            if sku in self.seen_skus:
+                self._error(line_no, sku, {'sku': [f'Duplicate SKU, first used on row {self.seen_skus[sku]}.']})
+                return None
+            if product_id is None:
+                product_id = self.known_skus.get(sku)
+            self.seen_skus[sku] = line_no
+        if product_id is not None:
+            if product_id in self.seen_ids:
+                field = 'id' if data['id'] else 'sku'
+                self._error(line_no, sku, {field: [f'Same product as row {self.seen_ids[product_id]}.']})
+                return None
+            self.seen_ids[product_id] = line_no
+
+        if product_id is None:
+            missing = {
+                field: ['Required for new products.']
+                for field in ('name', 'price') if data[field] in (None, '')
+            }
+            if missing:
+                self._error(line_no, sku, missing)
+                return None
+
+        # Only columns present in the row (and not blank) are written, so a
+        # partial file updates just those fields of existing products.
+        values = {
+            field: data[field] for field in COLUMNS
+            if field in row and field not in ('id', 'sku', 'category') and data[field] not in (None, '')
+        }
+        if sku is not None:
+            values['sku'] = sku
+        if 'description' in row:
+            values['description'] = data['description'] or ''
+        if data['category']:
+            category_id = self.categories.get(data['category'].strip().lower())
+            if category_id is None:
+                self._error(line_no, sku, {'category': [f"No category '{data['category']}' in this store."]})
+                return None
+            values['category_id'] = category_id
+        return product_id, values
+
+    def _write(self, batch):
+        now = timezone.now()
+        to_create = []
+        updates = {}
+        for product_id, values in batch:
+            if product_id is not None:
+                updates[product_id] = values
+                continue
+            product = RetailProduct(store=self.store, **values)
+            product.search_keys = search_keys(product.name)
+            to_create.append(product)
+
+        if to_create:
+            RetailProduct.objects.bulk_create(to_create, batch_size=IMPORT_BATCH_SIZE)
+            for product in to_create:
+                self.known_ids.add(product.pk)
+                if product.sku is not None:
+                    self.known_skus[product.sku] = product.pk
+            self.created += len(to_create)
+
+        if updates:
+            fields = {'updated_at', 'search_keys'}
+            products = list(RetailProduct.objects.filter(store=self.store, pk__in=list(updates)))
+            for product in products:
+                values = updates[product.pk]
+                for field, value in values.items():
+                    setattr(product, field, value)
+                fields.update(values)
+                product.search_keys = search_keys(product.name)
+                product.updated_at = now
+            RetailProduct.objects.bulk_update(products, sorted(fields), batch_size=IMPORT_BATCH_SIZE)
+            self.updated += len(products)
+
+    def run(self, rows):
+        """Validate and upsert all rows; returns the report."""
+        with transaction.atomic():
+            batch = []
+            for line_no, row in rows:
+                cleaned = self._clean(line_no, row)
+                if cleaned is None:
+                    continue
+                batch.append(cleaned)
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    self._write(batch)
+                    batch = []
+            if batch:
+                self._write(batch)
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif self.created or self.updated:
+                bump_store_version_on_commit(self.store.id)
+        return self.report()
+
+    def report(self):
+        return {
+            'dry_run': self.dry_run,
+            'created': self.created,
+            'updated': self.updated,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+
+# ── Export ───────────────────────────────────────────────────────────────────
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def _export_rows(store):
+    queryset = (
+        RetailProduct.objects.filter(store=store)
+        .order_by('created_at', 'id')
+        .values_list(*COLUMNS[:-1], 'category__slug')
+    )
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _plain(value):
+    return str(value) if isinstance(value, (Decimal, uuid.UUID)) else value
+
+
+def export_csv(store):
+    """Yield the store's products as CSV lines, header first."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMNS)
+    for row in _export_rows(store):
+        yield writer.writerow(['' if value is None else value for value in row])
+
+
+def export_jsonl(store):
+    """Yield the store's products as JSON lines."""
+    for row in _export_rows(store):
+        yield json.dumps(dict(zip(COLUMNS, map(_plain, row))), ensure_ascii=False) + '\n'
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:56
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('retail_catalog', '0005_search_vector'),
+        ('stores', '0012_name_trgm'),  # creates the pg_trgm extension
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='retailproduct',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='retail_prod_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
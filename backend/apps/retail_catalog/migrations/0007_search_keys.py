@@ -0,0 +1,180 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:59
+
+import re
+import unicodedata
+
+from django.db import migrations, models
+
+
+# Frozen copy of apps.search.normalize.search_keys (and its helpers) as of
+# this migration, so later tuning of the normalizer does not change what
+# the backfill writes.
+
+# Ethiopic syllables come in rows of 8: a consonant in seven vowel orders
+# plus a labialized form. Row start → Latin consonant.
+_CONSONANTS = {
+    0x1200: 'h', 0x1208: 'l', 0x1210: 'h', 0x1218: 'm', 0x1220: 's', 0x1228: 'r',
+    0x1230: 's', 0x1238: 'sh', 0x1240: 'q', 0x1248: 'qw', 0x1250: 'q', 0x1258: 'qw',
+    0x1260: 'b', 0x1268: 'v', 0x1270: 't', 0x1278: 'ch', 0x1280: 'h', 0x1288: 'hw',
+    0x1290: 'n', 0x1298: 'ny', 0x12A0: '', 0x12A8: 'k', 0x12B0: 'kw', 0x12B8: 'h',
+    0x12C0: 'hw', 0x12C8: 'w', 0x12D0: '', 0x12D8: 'z', 0x12E0: 'zh', 0x12E8: 'y',
+    0x12F0: 'd', 0x12F8: 'd', 0x1300: 'j', 0x1308: 'g', 0x1310: 'gw', 0x1318: 'g',
+    0x1320: 't', 0x1328: 'ch', 0x1330: 'p', 0x1338: 'ts', 0x1340: 'ts', 0x1348: 'f',
+    0x1350: 'p',
+}
+
+# Vowel of each order. The 6th order is a bare consonant (or a short,
+# unwritten vowel); the 8th is labialized.
+_VOWELS = ('e', 'u', 'i', 'a', 'e', '', 'o', 'wa')
+
+# Vowel carriers (አ, ዐ rows) as commonly romanized: አዲስ → adis, እንጀራ → injera.
+_CARRIER_VOWELS = ('a', 'u', 'i', 'a', 'e', 'i', 'o', 'wa')
+
+# Rows that are pronounced alike in Amharic, folded onto one spelling.
+_FOLD_ROWS = {0x1210: 0x1200, 0x1280: 0x1200, 0x1220: 0x1230, 0x12D0: 0x12A0, 0x1340: 0x1338}
+
+# Ethiopic wordspace, full stop, comma, etc.
+_ETHIOPIC_PUNCTUATION = re.compile('[፠-፨]')
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+# Keys shorter than this match too much to be useful.
+MIN_KEY_LENGTH = 2
+
+
+def _row(ch):
+    code = ord(ch)
+    base = code - code % 8
+    return base, code - base
+
+
+def fold_ethiopic(text):
+    """Fold homophone Ge'ez letters onto one row (ሐ/ኀ → ሀ, ሠ → ሰ, ዐ → አ, ፀ → ጸ)."""
+    out = []
+    for ch in text:
+        base, order = _row(ch)
+        target = _FOLD_ROWS.get(base)
+        out.append(chr(target + order) if target is not None else ch)
+    return _ETHIOPIC_PUNCTUATION.sub(' ', ''.join(out))
+
+
+def transliterate(text):
+    """Romanize Ge'ez syllables (ቡና → buna); other characters pass through."""
+    out = []
+    for ch in text:
+        base, order = _row(ch)
+        consonant = _CONSONANTS.get(base)
+        if consonant is None:
+            out.append(ch)
+        elif consonant == '':
+            out.append(_CARRIER_VOWELS[order])
+        else:
+            out.append(consonant + _VOWELS[order])
+    return ''.join(out)
+
+
+def _strip_accents(text):
+    return ''.join(
+        ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch)
+    )
+
+
+def phonetic_key(word):
+    """
+    Latin word → first letter plus consonant skeleton, with spelling variants
+    merged: doubled letters, q/c → k, ph → f. buna, bunna → bn; kitfo → ktf.
+    """
+    word = re.sub(r'[^a-z]', '', _strip_accents(word.lower()))
+    if not word:
+        return ''
+    word = re.sub(r'(.)\1+', r'\1', word)
+    word = word.replace('ph', 'f').replace('q', 'k')
+    word = re.sub(r'c(?!h)', 'k', word)
+    word = re.sub(r'(.)\1+', r'\1', word)
+    return word[0] + re.sub(r'[aeiouy]', '', word[1:])
+
+
+def _variants(word):
+    """Spellings of one lower-cased word: (folded, transliterated, key)."""
+    folded = fold_ethiopic(word).strip()
+    latin = transliterate(folded)
+    return folded, latin, phonetic_key(latin)
+
+
+def search_keys(*texts):
+    """Space-separated extra index terms for one or more name strings."""
+    keys = []
+    for text in texts:
+        for word in _WORD_RE.findall((text or '').lower()):
+            folded, latin, key = _variants(word)
+            for term in (folded, latin):
+                if term != word:
+                    keys.append(term)
+            if len(key) >= MIN_KEY_LENGTH:
+                keys.append(key)
+    return ' '.join(dict.fromkeys(keys))
+
+
+# Add search_keys (weight D) to the search_vector trigger from 0005_search_vector.
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION retail_catalog_retailproduct_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.search_keys, '')), 'D');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS retail_catalog_retailproduct_search_vector_trigger ON retail_catalog_retailproduct;
+CREATE TRIGGER retail_catalog_retailproduct_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description, search_keys ON retail_catalog_retailproduct
+    FOR EACH ROW EXECUTE FUNCTION retail_catalog_retailproduct_search_vector_update();
+"""
+
+REVERSE_SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION retail_catalog_retailproduct_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS retail_catalog_retailproduct_search_vector_trigger ON retail_catalog_retailproduct;
+CREATE TRIGGER retail_catalog_retailproduct_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON retail_catalog_retailproduct
+    FOR EACH ROW EXECUTE FUNCTION retail_catalog_retailproduct_search_vector_update();
+"""
+
+
+def populate_search_keys(apps, schema_editor):
+    # Writing search_keys fires the trigger, which rebuilds search_vector.
+    RetailProduct = apps.get_model('retail_catalog', 'RetailProduct')
+    batch = []
+    for obj in RetailProduct.objects.only('id', 'name').iterator(chunk_size=1000):
+        obj.search_keys = search_keys(obj.name)
+        batch.append(obj)
+        if len(batch) >= 1000:
+            RetailProduct.objects.bulk_update(batch, ['search_keys'])
+            batch = []
+    RetailProduct.objects.bulk_update(batch, ['search_keys'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('retail_catalog', '0006_name_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='retailproduct',
+            name='search_keys',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, REVERSE_SEARCH_VECTOR_SQL),
+        migrations.RunPython(populate_search_keys, migrations.RunPython.noop),
+    ]
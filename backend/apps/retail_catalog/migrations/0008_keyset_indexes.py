@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('retail_catalog', '0007_search_keys'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='retailproduct',
+            name='retail_prod_store_active_idx',
+        ),
+        migrations.AddIndex(
+            model_name='retailfavorite',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='retail_fav_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='retailproduct',
+            index=models.Index(fields=['store', 'is_active', 'created_at', 'id'], name='retail_prod_store_created_idx'),
+        ),
+    ]
@@ -22,6 +22,19 @@ class RetailProductSerializer(serializers.ModelSerializer):
             return None
         return value
 
+
+class RetailProductChangeSerializer(serializers.Serializer):
+    """One row of a bulk price / stock / visibility update (BulkStoreUpdateMixin)."""
+    id = serializers.UUIDField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    stock_quantity = serializers.IntegerField(min_value=0, max_value=2147483647, required=False)
+    is_active = serializers.BooleanField(required=False)
+
+    def validate(self, attrs):
+        if len(attrs) < 2:
+            raise serializers.ValidationError('Set at least one of price, stock_quantity, is_active.')
+        return attrs
+
 from .models import RetailFavorite
 
 class RetailFavoriteSerializer(serializers.ModelSerializer):
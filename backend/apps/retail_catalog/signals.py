@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.versioning import bump_store_version_on_commit
+
+
+@receiver(post_save, sender='retail_catalog.RetailCategory')
+@receiver(post_delete, sender='retail_catalog.RetailCategory')
+@receiver(post_save, sender='retail_catalog.RetailProduct')
+@receiver(post_delete, sender='retail_catalog.RetailProduct')
+def bump_store_version_on_catalog_change(sender, instance, **kwargs):
+    """Catalog changes invalidate the store's ETags (see core/versioning.py)."""
+    bump_store_version_on_commit(instance.store_id)
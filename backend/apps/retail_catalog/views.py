@@ -1,12 +1,21 @@
+import csv
+
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.db import IntegrityError
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.text import slugify
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
+from . import bulk
 from .models import RetailCategory, RetailProduct, RetailFavorite
-from .serializers import RetailCategorySerializer, RetailProductSerializer, RetailFavoriteSerializer
+from .serializers import (
+    RetailCategorySerializer, RetailProductSerializer, RetailProductChangeSerializer, RetailFavoriteSerializer,
+)
 from apps.stores.models import Store
+from core.mixins import BulkStoreUpdateMixin, LazyAuthenticationMixin, StoreCachedListMixin
+from core.pagination import CreatedAtCursorPagination
 
 
 class IsStoreOwnerOrReadOnly(permissions.BasePermission):
@@ -21,7 +30,7 @@ class IsStoreOwnerOrReadOnly(permissions.BasePermission):
         return obj.store.owner == request.user
 
 
-class RetailCategoryViewSet(viewsets.ModelViewSet):
+class RetailCategoryViewSet(LazyAuthenticationMixin, StoreCachedListMixin, viewsets.ModelViewSet):
     serializer_class = RetailCategorySerializer
     permission_classes = [IsStoreOwnerOrReadOnly]
 
@@ -54,16 +63,11 @@ class RetailCategoryViewSet(viewsets.ModelViewSet):
         serializer.save(store=store, slug=slug)
 
 
-@method_decorator(
-    # ✅ PERFORMANCE: Cache product list for 10 minutes. Products change rarely.
-    # Cache is keyed by URL so ?store_id= still returns store-specific results.
-    # Invalidate manually via Django cache API when a product is updated.
-    cache_page(60 * 10),
-    name='list'
-)
-class RetailProductViewSet(viewsets.ModelViewSet):
+class RetailProductViewSet(LazyAuthenticationMixin, StoreCachedListMixin, BulkStoreUpdateMixin, viewsets.ModelViewSet):
     serializer_class = RetailProductSerializer
+    bulk_change_serializer_class = RetailProductChangeSerializer
     permission_classes = [IsStoreOwnerOrReadOnly]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         store_id = self.request.query_params.get('store_id')
@@ -73,13 +77,13 @@ class RetailProductViewSet(viewsets.ModelViewSet):
         if store_id and self.request.method in permissions.SAFE_METHODS:
             return RetailProduct.objects.filter(
                 store_id=store_id, is_active=True
-            ).select_related('store', 'category').order_by('-id')
+            ).select_related('store', 'category').order_by('-created_at', '-id')
 
         # Seller write requests: MUST own the store — no cross-store reads.
         if self.request.user.is_authenticated:
             return RetailProduct.objects.filter(
                 store__owner=self.request.user
-            ).select_related('store', 'category').order_by('-id')
+            ).select_related('store', 'category').order_by('-created_at', '-id')
 
         return RetailProduct.objects.none()
 
@@ -91,10 +95,45 @@ class RetailProductViewSet(viewsets.ModelViewSet):
         store = get_object_or_404(Store, id=store_id, owner=self.request.user)
         serializer.save(store=store)
 
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Upsert many products from an uploaded .csv or .jsonl `file`, matched
+        on id, else SKU, within the store. ?dry_run=true validates without
+        writing.
+        Returns counts and a per-row error report (see bulk.py).
+        """
+        store = self.get_owned_store(request)
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': 'Upload a .csv or .jsonl file.'})
+        dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+        try:
+            report = bulk.ProductImporter(store, dry_run=dry_run).run(bulk.read_rows(upload))
+        except (bulk.ImportFormatError, UnicodeDecodeError, csv.Error) as e:
+            raise ValidationError({'file': str(e)})
+        except IntegrityError:
+            # A product with one of these SKUs was created concurrently.
+            return Response({"error": "The catalog changed during the import. Please retry."}, status=409)
+        return Response(report)
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def bulk_export(self, request):
+        """Stream all of the store's products as CSV (default) or ?output=jsonl."""
+        store = self.get_owned_store(request)
+        if request.query_params.get('output') == 'jsonl':
+            stream, content_type, ext = bulk.export_jsonl(store), 'application/x-ndjson', 'jsonl'
+        else:
+            stream, content_type, ext = bulk.export_csv(store), 'text/csv; charset=utf-8', 'csv'
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{store.slug}-products.{ext}"'
+        return response
+
 
 class RetailFavoriteViewSet(viewsets.ModelViewSet):
     serializer_class = RetailFavoriteSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_queryset(self):
         return RetailFavorite.objects.filter(user=self.request.user).order_by('-created_at')
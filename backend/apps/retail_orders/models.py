@@ -29,6 +29,14 @@ class RetailOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Order history (customer) and order inbox (store), keyset-paged on
+        # (created_at, id).
+        indexes = [
+            models.Index(fields=['customer', 'created_at', 'id'], name='retail_order_cust_created_idx'),
+            models.Index(fields=['store', 'created_at', 'id'], name='retail_order_store_created_idx'),
+        ]
+
     def __str__(self):
         return f"Retail Order {self.id} - {self.store.name}"
 
@@ -1,13 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RetailOrderViewSet, CartMergeView, CartDetailView
+from apps.carts.views import CartMergeView, CartDetailView
+from .views import RetailOrderViewSet
 
 router = DefaultRouter(trailing_slash=True)
 router.register(r'', RetailOrderViewSet, basename='retail-orders')
 
 urlpatterns = [
     # Explicit paths must go before the router include
-    path('cart/merge/', CartMergeView.as_view(), name='cart-merge'),
-    path('cart/', CartDetailView.as_view(), name='cart-detail'),
+    path('cart/merge/', CartMergeView.as_view(kind='retail'), name='cart-merge'),
+    path('cart/', CartDetailView.as_view(kind='retail'), name='cart-detail'),
     path('', include(router.urls))
-]
\ No newline at end of file
+]
@@ -1,21 +1,18 @@
-from rest_framework import viewsets, status
-from rest_framework.views import APIView
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db import transaction
+from core.pagination import CreatedAtCursorPagination
 
-# Import your Cart models (adjust names if they differ in your models.py)
-from .models import RetailOrder, Cart, CartItem 
+from .models import RetailOrder
 from .serializers import RetailOrderSerializer
 
-# External app imports for the merge logic
-from apps.retail_catalog.models import RetailProduct
-from apps.stores.models import Store
+from apps.carts import services as carts
 
 class RetailOrderViewSet(viewsets.ModelViewSet):
     serializer_class = RetailOrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
 
     def get_permissions(self):
         """
@@ -40,6 +37,11 @@ class RetailOrderViewSet(viewsets.ModelViewSet):
             return RetailOrder.objects.filter(store__owner=user).order_by('-created_at')
         return RetailOrder.objects.filter(customer=user).order_by('-created_at')
 
+    def perform_create(self, serializer):
+        order = serializer.save()
+        # Checkout: write the customer's live cart at this store through to Postgres.
+        carts.persist(carts.KINDS['retail'], self.request.user.pk, order.store_id)
+
     @action(detail=False, methods=['get'])
     def track(self, request):
         order_id = request.query_params.get('id', '').replace('ORD-', '').strip()
@@ -53,89 +55,3 @@ class RetailOrderViewSet(viewsets.ModelViewSet):
             
         serializer = self.get_serializer(order)
         return Response(serializer.data)
-
-class CartMergeView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    @transaction.atomic
-    def post(self, request, *args, **kwargs):
-        store_id = request.data.get('store_id')
-        guest_items = request.data.get('items', []) 
-
-        if not store_id:
-            return Response({"error": "store_id is required"}, status=status.HTTP_400_BAD_REQUEST)
-
-        try:
-            store = Store.objects.get(id=store_id)
-        except Store.DoesNotExist:
-            return Response({"error": "Store not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        # 1. Get or create the official database cart for this user at this store
-        cart, created = Cart.objects.get_or_create(user=request.user, store=store)
-
-        # 2. Loop through the guest items and merge them
-        for item in guest_items:
-            product_id = item.get('product_id')
-            quantity = int(item.get('quantity', 1))
-
-            try:
-                # Ensure the product actually belongs to this store
-                product = RetailProduct.objects.get(id=product_id, store=store)
-                
-                # Check if item is already in the DB cart
-                cart_item, item_created = CartItem.objects.get_or_create(
-                    cart=cart, 
-                    product=product,
-                    defaults={'quantity': quantity}
-                )
-
-                # If it already existed, COMBINE the quantities
-                if not item_created:
-                    cart_item.quantity += quantity
-                    cart_item.save()
-
-            except RetailProduct.DoesNotExist:
-                continue # Skip invalid products quietly
-
-        return Response({"message": "Cart merged successfully"}, status=status.HTTP_200_OK)
-
-
-class CartDetailView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def get(self, request, *args, **kwargs):
-        store_id = request.query_params.get('store_id')
-        if not store_id:
-            return Response({"error": "store_id is required"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # ✅ PERFORMANCE FIX (Issue #19): prefetch_related eliminates N+1 queries.
-        # Without this, each cart item triggers a separate DB query for the product.
-        cart = Cart.objects.filter(
-            user=request.user, store_id=store_id
-        ).prefetch_related('items__product').first()
-
-        if not cart:
-            return Response({"items": []}, status=status.HTTP_200_OK)
-
-        # Format the items for the Next.js checkout UI
-        formatted_items = []
-        for item in cart.items.all():
-            # Handle the difference between Retail (product) and Food (menu_item)
-            product_obj = getattr(item, 'product', None) or getattr(item, 'menu_item', None)
-            
-            if product_obj:
-                formatted_items.append({
-                    "id": str(product_obj.id),
-                    "name": product_obj.name,
-                    "price": str(product_obj.price),
-                    "quantity": item.quantity,
-                    "image": request.build_absolute_uri(product_obj.image.url) if product_obj.image else None,
-                })
-
-        return Response({"items": formatted_items}, status=status.HTTP_200_OK)
-        
-    def delete(self, request, *args, **kwargs):
-        # We will call this right after a successful payment to empty the cart!
-        store_id = request.query_params.get('store_id')
-        Cart.objects.filter(user=request.user, store_id=store_id).delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
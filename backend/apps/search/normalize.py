@@ -0,0 +1,139 @@
+"""
+Normalization for Amharic / Ge'ez-script and transliterated names.
+
+The same name reaches us as "ቡና", "buna" or "bunna", and Ge'ez has several
+letters for one sound (ሀ/ሐ/ኀ, ሰ/ሠ, አ/ዐ, ጸ/ፀ). search_keys() turns a name
+into extra index terms, stored in each model's `search_keys` column and
+folded into its search_vector (weight D):
+
+- the script-folded spelling of Ge'ez words (ሐበሻ → ሀበሻ),
+- their Latin transliteration (ቡና → buna),
+- a phonetic key for every word, in either script (buna, bunna, ቡና → bn).
+
+query_alternatives() applies the same steps to a query term, so the
+spellings above meet on a shared term through the GIN index. Latin keys
+also cover databases whose collation is C: Postgres' parser drops
+non-ASCII words there, so the Ge'ez spellings alone would not be indexed.
+
+The phonetic key is deliberately lossy (first letter plus the consonant
+skeleton, with common spelling variants merged). It only widens recall;
+ranking still favours the real name terms, which carry more weight.
+"""
+import re
+import unicodedata
+
+# Ethiopic syllables come in rows of 8: a consonant in seven vowel orders
+# plus a labialized form. Row start → Latin consonant.
+_CONSONANTS = {
+    0x1200: 'h', 0x1208: 'l', 0x1210: 'h', 0x1218: 'm', 0x1220: 's', 0x1228: 'r',
+    0x1230: 's', 0x1238: 'sh', 0x1240: 'q', 0x1248: 'qw', 0x1250: 'q', 0x1258: 'qw',
+    0x1260: 'b', 0x1268: 'v', 0x1270: 't', 0x1278: 'ch', 0x1280: 'h', 0x1288: 'hw',
+    0x1290: 'n', 0x1298: 'ny', 0x12A0: '', 0x12A8: 'k', 0x12B0: 'kw', 0x12B8: 'h',
+    0x12C0: 'hw', 0x12C8: 'w', 0x12D0: '', 0x12D8: 'z', 0x12E0: 'zh', 0x12E8: 'y',
+    0x12F0: 'd', 0x12F8: 'd', 0x1300: 'j', 0x1308: 'g', 0x1310: 'gw', 0x1318: 'g',
+    0x1320: 't', 0x1328: 'ch', 0x1330: 'p', 0x1338: 'ts', 0x1340: 'ts', 0x1348: 'f',
+    0x1350: 'p',
+}
+
+# Vowel of each order. The 6th order is a bare consonant (or a short,
+# unwritten vowel); the 8th is labialized.
+_VOWELS = ('e', 'u', 'i', 'a', 'e', '', 'o', 'wa')
+
+# Vowel carriers (አ, ዐ rows) as commonly romanized: አዲስ → adis, እንጀራ → injera.
+_CARRIER_VOWELS = ('a', 'u', 'i', 'a', 'e', 'i', 'o', 'wa')
+
+# Rows that are pronounced alike in Amharic, folded onto one spelling.
+_FOLD_ROWS = {0x1210: 0x1200, 0x1280: 0x1200, 0x1220: 0x1230, 0x12D0: 0x12A0, 0x1340: 0x1338}
+
+# Ethiopic wordspace, full stop, comma, etc.
+_ETHIOPIC_PUNCTUATION = re.compile('[፠-፨]')
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+# Keys shorter than this match too much to be useful.
+MIN_KEY_LENGTH = 2
+
+
+def _row(ch):
+    code = ord(ch)
+    base = code - code % 8
+    return base, code - base
+
+
+def fold_ethiopic(text):
+    """Fold homophone Ge'ez letters onto one row (ሐ/ኀ → ሀ, ሠ → ሰ, ዐ → አ, ፀ → ጸ)."""
+    out = []
+    for ch in text:
+        base, order = _row(ch)
+        target = _FOLD_ROWS.get(base)
+        out.append(chr(target + order) if target is not None else ch)
+    return _ETHIOPIC_PUNCTUATION.sub(' ', ''.join(out))
+
+
+def transliterate(text):
+    """Romanize Ge'ez syllables (ቡና → buna); other characters pass through."""
+    out = []
+    for ch in text:
+        base, order = _row(ch)
+        consonant = _CONSONANTS.get(base)
+        if consonant is None:
+            out.append(ch)
+        elif consonant == '':
+            out.append(_CARRIER_VOWELS[order])
+        else:
+            out.append(consonant + _VOWELS[order])
+    return ''.join(out)
+
+
+def _strip_accents(text):
+    return ''.join(
+        ch for ch in unicodedata.normalize('NFKD', text) if not unicodedata.combining(ch)
+    )
+
+
+def phonetic_key(word):
+    """
+    Latin word → first letter plus consonant skeleton, with spelling variants
+    merged: doubled letters, q/c → k, ph → f. buna, bunna → bn; kitfo → ktf.
+    """
+    word = re.sub(r'[^a-z]', '', _strip_accents(word.lower()))
+    if not word:
+        return ''
+    word = re.sub(r'(.)\1+', r'\1', word)
+    word = word.replace('ph', 'f').replace('q', 'k')
+    word = re.sub(r'c(?!h)', 'k', word)
+    word = re.sub(r'(.)\1+', r'\1', word)
+    return word[0] + re.sub(r'[aeiouy]', '', word[1:])
+
+
+def _variants(word):
+    """Spellings of one lower-cased word: (folded, transliterated, key)."""
+    folded = fold_ethiopic(word).strip()
+    latin = transliterate(folded)
+    return folded, latin, phonetic_key(latin)
+
+
+def search_keys(*texts):
+    """Space-separated extra index terms for one or more name strings."""
+    keys = []
+    for text in texts:
+        for word in _WORD_RE.findall((text or '').lower()):
+            folded, latin, key = _variants(word)
+            for term in (folded, latin):
+                if term != word:
+                    keys.append(term)
+            if len(key) >= MIN_KEY_LENGTH:
+                keys.append(key)
+    return ' '.join(dict.fromkeys(keys))
+
+
+def query_alternatives(term):
+    """
+    Spellings a lower-cased query term may be indexed under, as
+    (prefix_terms, exact_terms): the term and its folded/romanized forms
+    match as prefixes; the phonetic key only exactly.
+    """
+    folded, latin, key = _variants(term)
+    prefixes = list(dict.fromkeys(t for t in (term, folded, latin) if t))
+    exact = [key] if len(key) >= MIN_KEY_LENGTH and key not in prefixes else []
+    return prefixes, exact
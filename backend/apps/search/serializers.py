@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+from apps.food_menu.models import MenuItem
+from apps.retail_catalog.models import RetailProduct
+from apps.stores.models import Store
+
+
+class SearchHitMixin(serializers.Serializer):
+    """Fields every search hit carries: its rank and, on ?lat/lon searches, distance."""
+    rank = serializers.FloatField(read_only=True)
+    distance = serializers.SerializerMethodField()
+
+    def get_distance(self, obj):
+        distance = getattr(obj, 'distance', None)
+        return round(distance, 3) if distance is not None else None
+
+
+class StoreHitSerializer(SearchHitMixin, serializers.ModelSerializer):
+    is_open = serializers.BooleanField(source='open_now', read_only=True)
+
+    class Meta:
+        model = Store
+        fields = [
+            'id', 'name', 'slug', 'store_type', 'category', 'logo',
+            'latitude', 'longitude', 'is_open', 'rank', 'distance',
+        ]
+
+
+class StoreItemHitMixin(SearchHitMixin):
+    store_id = serializers.UUIDField(source='store.id', read_only=True)
+    store_name = serializers.CharField(source='store.name', read_only=True)
+    store_slug = serializers.CharField(source='store.slug', read_only=True)
+    is_open = serializers.BooleanField(source='open_now', read_only=True)
+
+
+class ProductHitSerializer(StoreItemHitMixin, serializers.ModelSerializer):
+    class Meta:
+        model = RetailProduct
+        fields = [
+            'id', 'name', 'price', 'image',
+            'store_id', 'store_name', 'store_slug', 'is_open', 'rank', 'distance',
+        ]
+
+
+class MenuItemHitSerializer(StoreItemHitMixin, serializers.ModelSerializer):
+    class Meta:
+        model = MenuItem
+        fields = [
+            'id', 'name', 'price', 'image',
+            'store_id', 'store_name', 'store_slug', 'is_open', 'rank', 'distance',
+        ]
@@ -0,0 +1,118 @@
+"""
+Full-text search over stores, retail products and menu items.
+
+Each searchable table carries a `search_vector` tsvector column kept current
+by a database trigger and indexed with GIN (see the search_vector migrations
+in stores, retail_catalog and food_menu). A query is turned into a prefix
+tsquery ("macch" matches "macchiato"), matched with @@ on that index and
+ranked with ts_rank, so results are found without scanning any table.
+Each term also matches its Ge'ez-folded, romanized and phonetic spellings
+(normalize.py), so "ቡና" and "buna" find the same rows.
+
+All three searches accept the same filters:
+- store_type  'RETAIL' or 'FOOD'
+- near        (lat, lon, radius_km): only stores in range, via the same
+              grid-cell lookup as discovery; results carry `distance`
+- only_open   only stores open right now (StoreOpeningHours)
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F
+
+from apps.food_menu.models import MenuItem
+from apps.retail_catalog.models import RetailProduct
+from apps.stores.models import Store
+from apps.stores.services import (
+    LocationService, haversine_expression, open_now_expression, with_open_now,
+)
+from .normalize import query_alternatives
+
+# Must match the configuration used by the search_vector triggers.
+SEARCH_CONFIG = 'simple'
+
+# Longer queries are truncated; every term must match.
+MAX_QUERY_TERMS = 8
+
+# Terms shorter than this match whole words only, not as prefixes, so a
+# single letter doesn't expand to half the index.
+MIN_PREFIX_LENGTH = 2
+
+_TERM_RE = re.compile(r'[^\W_]+')
+
+
+def _term_query(term):
+    # Any spelling of the term may match: as typed, Ge'ez-folded, romanized,
+    # or its phonetic key (see normalize.py).
+    prefixes, exact = query_alternatives(term)
+    options = [
+        f'{option}:*' if len(option) >= MIN_PREFIX_LENGTH else option for option in prefixes
+    ] + exact
+    return options[0] if len(options) == 1 else '(' + ' | '.join(options) + ')'
+
+
+def parse_query(text):
+    """Build a SearchQuery from free text, or None if it has no searchable terms."""
+    terms = _TERM_RE.findall((text or '').lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    tsquery = ' & '.join(_term_query(term) for term in terms)
+    return SearchQuery(tsquery, search_type='raw', config=SEARCH_CONFIG)
+
+
+def _store_types(store_type):
+    if store_type:
+        return [store_type.upper()]
+    return [choice for choice, _ in Store.STORE_TYPE_CHOICES]
+
+
+def _candidate_stores(store_type=None, near=None, only_open=False):
+    """Active stores passing the filters, as a queryset usable in store__in."""
+    if near is not None:
+        lat, lon, radius_km = near
+        return LocationService.get_nearby_stores(lat, lon, radius_km, store_type, only_open)
+    return with_open_now(
+        Store.objects.filter(is_active=True, store_type__in=_store_types(store_type)),
+        only_open,
+    )
+
+
+def search_stores(query, store_type=None, near=None, only_open=False):
+    """Matching stores, best match first (nearest first among equal ranks)."""
+    queryset = (
+        _candidate_stores(store_type, near, only_open)
+        .filter(search_vector=query)
+        .annotate(rank=SearchRank(F('search_vector'), query))
+        .defer('search_vector')
+    )
+    ordering = ['-rank', 'distance'] if near is not None else ['-rank', 'name']
+    return queryset.order_by(*ordering)
+
+
+def _search_store_items(queryset, query, near, only_open, store_type):
+    queryset = queryset.filter(
+        search_vector=query,
+        store__in=_candidate_stores(store_type, near, only_open).values('pk'),
+    ).annotate(
+        rank=SearchRank(F('search_vector'), query),
+        open_now=open_now_expression(store='store_id'),
+    ).select_related('store').defer('search_vector', 'store__search_vector')
+    if near is not None:
+        lat, lon, _ = near
+        queryset = queryset.annotate(distance=haversine_expression(lat, lon, prefix='store__'))
+        return queryset.order_by('-rank', 'distance')
+    return queryset.order_by('-rank', 'name')
+
+
+def search_products(query, near=None, only_open=False):
+    """Matching active products of retail stores."""
+    return _search_store_items(
+        RetailProduct.objects.filter(is_active=True), query, near, only_open, 'RETAIL'
+    )
+
+
+def search_menu_items(query, near=None, only_open=False):
+    """Matching available menu items of food stores."""
+    return _search_store_items(
+        MenuItem.objects.filter(is_available=True), query, near, only_open, 'FOOD'
+    )
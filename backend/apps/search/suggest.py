@@ -0,0 +1,167 @@
+"""
+Search-box autocomplete (/api/search/suggest).
+
+Names are matched with pg_trgm word similarity (`q <% name`), served by the
+gin_trgm_ops indexes on Store, RetailProduct and MenuItem names. It matches
+the start of any word in a name ("macch" finds "Iced Macchiato") and
+tolerates small typos; names that start with the query rank first.
+
+Each worker keeps the answers for hot prefixes in a bounded LRU. An answer
+is tagged with the content versions (core/versioning.py) of the stores it
+shows and reused while none of them has changed, so a seller's edit
+elsewhere doesn't empty it; with the two-tier cache backend that check is
+normally a local read. A change in some other store can only add a match,
+which shows up once the entry's HOT_PREFIX_TTL runs out.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, IntegerField, Value, When
+
+from apps.food_menu.models import MenuItem
+from apps.retail_catalog.models import RetailProduct
+from apps.stores.models import Store
+from core.versioning import get_store_versions
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Shorter input returns nothing; longer input is truncated.
+MIN_QUERY_LENGTH = 2
+MAX_QUERY_LENGTH = 64
+
+# Candidates fetched per source, as a multiple of the limit, so that
+# per-store deduplication can still fill the list.
+CANDIDATE_FACTOR = 4
+
+# Distinct (prefix, type, limit) answers kept per worker, and for how long
+# (seconds) an answer may miss new matches from stores it doesn't show.
+HOT_PREFIX_ENTRIES = 4096
+HOT_PREFIX_TTL = 60
+
+_KIND_ORDER = {'store': 0, 'menu_item': 1, 'product': 2}
+
+
+class _HotPrefixes:
+    """
+    Thread-safe LRU of suggestion lists with expiry, each tagged with the
+    {store_id: version} of the stores it shows.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """(versions, suggestions) for a live entry, else None."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, versions, suggestions = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return versions, suggestions
+
+    def put(self, key, versions, suggestions):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, versions, suggestions)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+hot_prefixes = _HotPrefixes(HOT_PREFIX_ENTRIES, HOT_PREFIX_TTL)
+
+
+def normalize_prefix(text):
+    return ' '.join((text or '').lower().split())[:MAX_QUERY_LENGTH]
+
+
+def _ranked(queryset, prefix):
+    return queryset.filter(name__trigram_word_similar=prefix).annotate(
+        similarity=TrigramWordSimilarity(prefix, 'name'),
+        starts=Case(
+            When(name__istartswith=prefix, then=Value(1)),
+            default=Value(0), output_field=IntegerField(),
+        ),
+    ).order_by('-starts', '-similarity', 'name')
+
+
+def _candidates(prefix, store_type, limit):
+    n = limit * CANDIDATE_FACTOR
+    store_types = [store_type] if store_type else [choice for choice, _ in Store.STORE_TYPE_CHOICES]
+    rows = [
+        {**row, 'kind': 'store', 'store_id': row['id'], 'store_slug': row['slug'], 'store_name': row['name']}
+        for row in _ranked(Store.objects.filter(is_active=True, store_type__in=store_types), prefix)
+        .values('id', 'name', 'slug', 'similarity', 'starts')[:n]
+    ]
+    item_fields = ('id', 'name', 'store_id', 'store__slug', 'store__name', 'similarity', 'starts')
+    sources = []
+    if store_type in (None, 'FOOD'):
+        sources.append(('menu_item', MenuItem.objects.filter(is_available=True)))
+    if store_type in (None, 'RETAIL'):
+        sources.append(('product', RetailProduct.objects.filter(is_active=True)))
+    for kind, queryset in sources:
+        for row in _ranked(queryset.filter(store__is_active=True), prefix).values(*item_fields)[:n]:
+            row['kind'] = kind
+            row['store_slug'] = row.pop('store__slug')
+            row['store_name'] = row.pop('store__name')
+            rows.append(row)
+    return rows
+
+
+def _select(rows, limit):
+    """Best matches first; each store contributes itself and at most one item."""
+    rows.sort(key=lambda row: (-row['starts'], -row['similarity'], _KIND_ORDER[row['kind']], row['name']))
+    seen = set()
+    suggestions = []
+    for row in rows:
+        key = (row['kind'] == 'store', row['store_id'])
+        if key in seen:
+            continue
+        seen.add(key)
+        suggestions.append({
+            'text': row['name'],
+            'kind': row['kind'],
+            'id': row['id'],
+            'store_id': row['store_id'],
+            'store_slug': row['store_slug'],
+            'store_name': row['store_name'],
+        })
+        if len(suggestions) >= limit:
+            break
+    return suggestions
+
+
+def suggest(text, store_type=None, limit=DEFAULT_LIMIT):
+    """
+    Return up to `limit` suggestions for what the user has typed so far.
+    The returned list may be shared with other requests; don't mutate it.
+    """
+    prefix = normalize_prefix(text)
+    if len(prefix) < MIN_QUERY_LENGTH:
+        return []
+
+    key = (prefix, store_type, limit)
+    cached = hot_prefixes.get(key)
+    if cached is not None:
+        versions, suggestions = cached
+        if get_store_versions(versions) == versions:
+            return suggestions
+
+    suggestions = _select(_candidates(prefix, store_type, limit), limit)
+    versions = get_store_versions({suggestion['store_id'] for suggestion in suggestions})
+    if versions is not None:
+        hot_prefixes.put(key, versions, suggestions)
+    return suggestions
@@ -0,0 +1,106 @@
+import importlib
+
+from django.test import SimpleTestCase
+
+from .normalize import fold_ethiopic, phonetic_key, query_alternatives, search_keys, transliterate
+
+# (name, search_keys(name)). Also the inputs the frozen migration copies are
+# checked against, so extend it when the rules change.
+SEARCH_KEYS = [
+    # Transliteration and phonetic key of Ge'ez words.
+    ('ቡና', 'buna bn'),
+    ('ሰላም', 'selam slm'),
+    ('ሽሮ', 'shro shr'),
+    ('ክትፎ', 'ktfo ktf'),
+    ('ጥብስ', 'tbs'),
+    # Vowel carriers romanize as commonly written.
+    ('አዲስ', 'adis ads'),
+    ('እንጀራ', 'injera injr'),
+    # Homophone rows fold onto one spelling (ሐ/ኀ → ሀ, ሠ → ሰ, ዐ → አ, ፀ → ጸ).
+    ('ሀበሻ', 'hebesha hbsh'),
+    ('ሐበሻ', 'ሀበሻ hebesha hbsh'),
+    ('ኀበሻ', 'ሀበሻ hebesha hbsh'),
+    ('ሠላም', 'ሰላም selam slm'),
+    ('ዐዲስ', 'አዲስ adis ads'),
+    ('ፀሐይ', 'ጸሀይ tsehey tsh'),
+    ('ጸሐይ', 'ጸሀይ tsehey tsh'),
+    # Ethiopic punctuation separates words.
+    ('ቡና።ሻይ', 'buna bn shay sh'),
+    # Latin names get only their phonetic key; spelling variants merge.
+    ('Buna', 'bn'),
+    ('bunna', 'bn'),
+    ('Kitfo', 'ktf'),
+    ('Café Phoenix', 'kf fnx'),
+    ('Quick Cuts', 'kk kts'),
+    ('Addis Ababa', 'ads abb'),
+    # Mixed scripts, underscores and digits.
+    ('Shop_2 ቡና', 'shp buna bn'),
+    # Too short to key, or empty.
+    ('x', ''),
+    ('', ''),
+    (None, ''),
+]
+
+FROZEN_COPIES = [
+    'apps.stores.migrations.0013_search_keys',
+    'apps.retail_catalog.migrations.0007_search_keys',
+    'apps.food_menu.migrations.0007_search_keys',
+]
+
+
+class SearchKeysTests(SimpleTestCase):
+    def test_search_keys(self):
+        for name, expected in SEARCH_KEYS:
+            with self.subTest(name=name):
+                self.assertEqual(search_keys(name), expected)
+
+    def test_search_keys_dedupes_across_texts(self):
+        self.assertEqual(search_keys('ቡና', 'Bunna', 'buna'), 'buna bn')
+
+    def test_fold_ethiopic(self):
+        cases = [
+            ('ሐ', 'ሀ'), ('ሑ', 'ሁ'), ('ኀ', 'ሀ'), ('ሠ', 'ሰ'), ('ሧ', 'ሷ'), ('ዐ', 'አ'), ('ፀ', 'ጸ'),
+            ('ሀ', 'ሀ'), ('ቡና', 'ቡና'), ('abc', 'abc'), ('ቡና፡ሻይ', 'ቡና ሻይ'),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(fold_ethiopic(text), expected)
+
+    def test_transliterate(self):
+        cases = [
+            ('ቡና', 'buna'), ('ቀ', 'qe'), ('ቆ', 'qo'), ('ቧ', 'bwa'), ('ጨ', 'che'),
+            ('አ', 'a'), ('ኢ', 'i'), ('እ', 'i'), ('ኦ', 'o'), ('ቡና 2', 'buna 2'),
+        ]
+        for text, expected in cases:
+            with self.subTest(text=text):
+                self.assertEqual(transliterate(text), expected)
+
+    def test_phonetic_key(self):
+        cases = [
+            ('buna', 'bn'), ('bunna', 'bn'), ('BUNA', 'bn'), ('kitfo', 'ktf'), ('qitfo', 'ktf'),
+            ('cafe', 'kf'), ('café', 'kf'), ('chai', 'ch'), ('phoenix', 'fnx'), ('injera', 'injr'),
+            ('123', ''), ('', ''),
+        ]
+        for word, expected in cases:
+            with self.subTest(word=word):
+                self.assertEqual(phonetic_key(word), expected)
+
+    def test_query_alternatives(self):
+        cases = [
+            ('ሐበሻ', (['ሐበሻ', 'ሀበሻ', 'hebesha'], ['hbsh'])),
+            ('ቡና', (['ቡና', 'buna'], ['bn'])),
+            ('buna', (['buna'], ['bn'])),
+            ('ab', (['ab'], [])),
+        ]
+        for term, expected in cases:
+            with self.subTest(term=term):
+                self.assertEqual(query_alternatives(term), expected)
+
+    def test_migration_copies_match_live_rules(self):
+        # The migrations backfilled search_keys with frozen copies of these
+        # rules; the live copy must keep producing what they wrote.
+        for module_name in FROZEN_COPIES:
+            frozen = importlib.import_module(module_name)
+            for name, _ in SEARCH_KEYS:
+                with self.subTest(migration=module_name, name=name):
+                    self.assertEqual(frozen.search_keys(name), search_keys(name))
@@ -0,0 +1,87 @@
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.mixins import LazyAuthenticationMixin
+from apps.stores.services import wants_open_now
+from .serializers import MenuItemHitSerializer, ProductHitSerializer, StoreHitSerializer
+from .services import parse_query, search_menu_items, search_products, search_stores
+from . import suggest
+
+
+class SearchView(LazyAuthenticationMixin, APIView):
+    """
+    GET /api/search/?q=macchiato
+
+    Ranked full-text matches, grouped as stores / products / menu_items.
+
+    ?type=RETAIL|FOOD   only that kind of store (and its products or menu items)
+    ?lat=&lon=&radius=  only stores within radius km (default 15); hits get `distance`
+    ?open_now=true      only stores open right now
+    ?limit=             hits per group (default 10, max MAX_LIMIT)
+    """
+    permission_classes = [AllowAny]
+
+    DEFAULT_LIMIT = 10
+    MAX_LIMIT = 50
+    DEFAULT_RADIUS_KM = 15.0
+
+    def get(self, request):
+        params = request.query_params
+        query = parse_query(params.get('q'))
+        if query is None:
+            return Response({"error": "A search query (?q=) is required."}, status=400)
+
+        store_type = (params.get('type') or '').upper() or None
+        if store_type not in (None, 'RETAIL', 'FOOD'):
+            return Response({"error": "type must be RETAIL or FOOD."}, status=400)
+
+        near = None
+        lat = params.get('lat')
+        lon = params.get('lon') or params.get('lng')
+        try:
+            if lat and lon:
+                near = (float(lat), float(lon), float(params.get('radius', self.DEFAULT_RADIUS_KM)))
+            limit = min(max(int(params.get('limit', self.DEFAULT_LIMIT)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "Invalid coordinate or limit format."}, status=400)
+
+        only_open = wants_open_now(request)
+        context = {'request': request}
+        data = {"query": params.get('q'), "stores": [], "products": [], "menu_items": []}
+
+        stores = search_stores(query, store_type, near, only_open)[:limit]
+        data["stores"] = StoreHitSerializer(stores, many=True, context=context).data
+        if store_type in (None, 'RETAIL'):
+            products = search_products(query, near, only_open)[:limit]
+            data["products"] = ProductHitSerializer(products, many=True, context=context).data
+        if store_type in (None, 'FOOD'):
+            items = search_menu_items(query, near, only_open)[:limit]
+            data["menu_items"] = MenuItemHitSerializer(items, many=True, context=context).data
+        return Response(data)
+
+
+class SuggestView(LazyAuthenticationMixin, APIView):
+    """
+    GET /api/search/suggest?q=mac
+
+    Per-keystroke autocomplete over store, product and menu item names.
+    Each store contributes itself and at most one item.
+
+    ?type=RETAIL|FOOD   only that kind of store (and its products or menu items)
+    ?limit=             number of suggestions (default 8, max 20)
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        params = request.query_params
+        store_type = (params.get('type') or '').upper() or None
+        if store_type not in (None, 'RETAIL', 'FOOD'):
+            return Response({"error": "type must be RETAIL or FOOD."}, status=400)
+        try:
+            limit = min(max(int(params.get('limit', suggest.DEFAULT_LIMIT)), 1), suggest.MAX_LIMIT)
+        except ValueError:
+            return Response({"error": "Invalid limit."}, status=400)
+
+        q = params.get('q', '')
+        return Response({"query": q, "suggestions": suggest.suggest(q, store_type, limit)})
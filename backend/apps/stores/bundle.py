@@ -0,0 +1,80 @@
+"""
+Storefront bundle: everything a storefront's first paint needs in one payload.
+
+FOOD stores get menu categories and available items (with options and
+extras); RETAIL stores get categories and active products. The payload is
+rendered to JSON once per store content version and cached as bytes in the
+store's cache namespace (core/versioning.py), so a warm request costs one
+indexed lookup and a cache read.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from core.versioning import cached_for_store
+from .models import Store
+from .serializers import StoreDiscoverySerializer
+from .services import with_open_now
+
+# Keys are versioned, so stale bundles are never read; the TTL only frees memory.
+BUNDLE_CACHE_TTL = 60 * 60
+
+
+def _food_sections(store, context):
+    from apps.food_menu.models import MenuCategory, MenuItem
+    from apps.food_menu.serializers import MenuCategorySerializer, MenuItemSerializer
+
+    categories = MenuCategory.objects.filter(store=store).order_by('order')
+    items = (
+        MenuItem.objects.filter(store=store, is_available=True)
+        .select_related('category')
+        .prefetch_related('options', 'extras')
+        .order_by('category__order', 'name')
+    )
+    for item in items:
+        item.store = store  # serializer reads store.id/name/slug; avoid a join
+    return {
+        'categories': MenuCategorySerializer(categories, many=True, context=context).data,
+        'items': MenuItemSerializer(items, many=True, context=context).data,
+    }
+
+
+def _retail_sections(store, context):
+    from apps.retail_catalog.models import RetailCategory, RetailProduct
+    from apps.retail_catalog.serializers import RetailCategorySerializer, RetailProductSerializer
+
+    categories = RetailCategory.objects.filter(store=store).order_by('name')
+    products = (
+        RetailProduct.objects.filter(store=store, is_active=True)
+        .select_related('category')
+        .order_by('-created_at', '-id')
+    )
+    for product in products:
+        product.store = store
+    return {
+        'categories': RetailCategorySerializer(categories, many=True, context=context).data,
+        'products': RetailProductSerializer(products, many=True, context=context).data,
+    }
+
+
+def build_bundle(store_id, request):
+    """Serialize the bundle for a store: 3 queries for retail, 5 for food."""
+    store = with_open_now(Store.objects.select_related('theme_config')).get(pk=store_id)
+    context = {'request': request}
+    data = {'store': StoreDiscoverySerializer(store, context=context).data}
+    if store.store_type == 'FOOD':
+        data.update(_food_sections(store, context))
+    else:
+        data.update(_retail_sections(store, context))
+    return data
+
+
+def bundle_bytes(store_id, open_now, request):
+    """
+    Return the rendered bundle as JSON bytes, cached in the store's versioned
+    namespace. The key also covers is_open and the request host, since
+    absolute media URLs depend on it.
+    """
+    return cached_for_store(
+        store_id, 'bundle', (bool(open_now), request.build_absolute_uri('/')),
+        lambda: JSONRenderer().render(build_bundle(store_id, request)),
+        timeout=BUNDLE_CACHE_TTL,
+    )
@@ -0,0 +1,90 @@
+"""
+Uniform lat/lon grid used as the spatial access path for store discovery.
+
+Every Store carries the integer id of the grid cell it sits in (Store.geo_cell),
+indexed together with is_active and store_type. A nearby query enumerates the
+handful of cells covering the search box and filters with `geo_cell IN (...)`,
+which is an index lookup whose cost depends on the area searched, not on the
+total number of stores.
+"""
+import math
+
+# 0.05° ≈ 5.5 km of latitude. A 15 km radius is covered by ~7×7 cells.
+GRID_CELL_DEG = 0.05
+
+# Columns per grid row; must exceed 360 / GRID_CELL_DEG.
+_ROW_STRIDE = 10_000
+
+# Above this many cells the IN list stops being cheaper than a range scan.
+MAX_COVERING_CELLS = 400
+
+KM_PER_DEG_LAT = 111.0
+
+
+def _row(lat):
+    return int(math.floor((float(lat) + 90.0) / GRID_CELL_DEG))
+
+
+def _col(lon):
+    return int(math.floor((float(lon) + 180.0) / GRID_CELL_DEG))
+
+
+def grid_cell(lat, lon):
+    """Return the grid cell id for a coordinate, or None if either is missing."""
+    if lat is None or lon is None:
+        return None
+    return _row(lat) * _ROW_STRIDE + _col(lon)
+
+
+def bounding_box(lat, lon, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_km."""
+    lat = float(lat)
+    lon = float(lon)
+    delta_lat = radius_km / KM_PER_DEG_LAT
+    cos_lat = math.cos(math.radians(lat))
+    delta_lon = radius_km / (KM_PER_DEG_LAT * cos_lat) if cos_lat > 1e-9 else 180.0
+    return lat - delta_lat, lat + delta_lat, lon - delta_lon, lon + delta_lon
+
+
+def cells_for_box(min_lat, max_lat, min_lon, max_lon):
+    """
+    Return the list of cell ids covering a lat/lon box, or None when the box
+    spans more than MAX_COVERING_CELLS (callers fall back to a range filter).
+    """
+    min_lat, max_lat = max(min_lat, -90.0), min(max_lat, 89.999999)
+    min_lon, max_lon = max(min_lon, -180.0), min(max_lon, 179.999999)
+    rows = range(_row(min_lat), _row(max_lat) + 1)
+    cols = range(_col(min_lon), _col(max_lon) + 1)
+    if len(rows) * len(cols) > MAX_COVERING_CELLS:
+        return None
+    return [r * _ROW_STRIDE + c for r in rows for c in cols]
+
+
+def covering_cells(lat, lon, radius_km):
+    """Return the cell ids covering a circle of radius_km (see cells_for_box)."""
+    return cells_for_box(*bounding_box(lat, lon, radius_km))
+
+
+# ── Viewport clustering ──────────────────────────────────────────────────────
+# At or above this zoom level the viewport endpoint returns individual pins.
+CLUSTER_MAX_ZOOM = 14
+
+# Cluster cell edge, in 256 px map tiles: 0.25 → roughly one cluster per
+# 64×64 px on screen at every zoom level.
+CLUSTER_CELL_TILES = 0.25
+
+
+def cluster_cell_deg(zoom):
+    """Edge length, in degrees, of the clustering grid at a web-map zoom level."""
+    return 360.0 / (2 ** max(0, min(int(zoom), 22))) * CLUSTER_CELL_TILES
+
+
+def parse_bbox(value):
+    """
+    Parse 'min_lon,min_lat,max_lon,max_lat' (west,south,east,north) into
+    (min_lat, max_lat, min_lon, max_lon). Raises ValueError if malformed.
+    """
+    min_lon, min_lat, max_lon, max_lat = (float(part) for part in value.split(','))
+    if not (-90 <= min_lat <= max_lat <= 90 and -180 <= min_lon <= max_lon <= 180):
+        raise ValueError('bbox out of range')
+    return min_lat, max_lat, min_lon, max_lon
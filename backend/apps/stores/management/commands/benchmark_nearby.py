@@ -0,0 +1,116 @@
+import math
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from apps.stores.geo import grid_cell
+from apps.stores.models import Store
+from apps.stores.services import LocationService
+
+User = get_user_model()
+
+# Synthetic stores are centred on Addis Ababa.
+CENTER_LAT = 9.03
+CENTER_LON = 38.74
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    """
+    Benchmark LocationService.get_nearby_stores against growing store counts.
+
+    For each size, synthetic stores are spread at a constant density (the
+    populated square grows with N), so every query returns a similar number
+    of stores. With the geo_cell index the latency should stay flat from 1k
+    to 1M stores; a scan-based plan grows linearly with N.
+
+    Everything runs inside a transaction that is rolled back at the end —
+    no benchmark rows are left behind. Point it at a scratch database anyway:
+    1M rows takes a while to insert.
+
+    Usage: python manage.py benchmark_nearby --sizes 1000 10000 100000 1000000
+    """
+    help = 'Measure nearby-store query latency as the number of stores grows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1_000, 10_000, 100_000, 1_000_000])
+        parser.add_argument('--radius', type=float, default=15.0, help='Search radius in km.')
+        parser.add_argument('--queries', type=int, default=50, help='Queries per size.')
+        parser.add_argument('--density', type=float, default=2.0, help='Stores per km².')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                owner = User.objects.create(
+                    username=f'benchmark-{uuid.uuid4().hex[:8]}', role='SELLER'
+                )
+                self.stdout.write(f"{'stores':>10} {'p50 ms':>8} {'p95 ms':>8} {'avg hits':>9}")
+                for size in sorted(options['sizes']):
+                    Store.objects.filter(owner=owner).delete()
+                    half_side_km = math.sqrt(size / options['density']) / 2
+                    self._populate(owner, size, half_side_km, rng)
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'ANALYZE {Store._meta.db_table}')
+                    timings, hits = self._measure(options, half_side_km, rng)
+                    self.stdout.write(
+                        f'{size:>10} {statistics.median(timings):>8.2f} '
+                        f'{_percentile(timings, 95):>8.2f} {statistics.mean(hits):>9.1f}'
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Done (benchmark data rolled back).'))
+
+    def _populate(self, owner, size, half_side_km, rng, batch_size=5_000):
+        delta_lat = half_side_km / 111.0
+        delta_lon = half_side_km / (111.0 * math.cos(math.radians(CENTER_LAT)))
+        batch = []
+        for i in range(size):
+            lat = round(CENTER_LAT + rng.uniform(-delta_lat, delta_lat), 6)
+            lon = round(CENTER_LON + rng.uniform(-delta_lon, delta_lon), 6)
+            batch.append(Store(
+                owner=owner,
+                name=f'Bench {i}',
+                slug=f'bench-{owner.pk.hex[:8]}-{size}-{i}',
+                category='Benchmark',
+                store_type=rng.choice(('RETAIL', 'FOOD')),
+                latitude=lat,
+                longitude=lon,
+                # bulk_create bypasses Store.save(), so set the cell here.
+                geo_cell=grid_cell(lat, lon),
+            ))
+            if len(batch) >= batch_size:
+                Store.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Store.objects.bulk_create(batch)
+
+    def _measure(self, options, half_side_km, rng):
+        # Query points stay at least one radius inside the populated square so
+        # every size sees the same density around the query.
+        inner_km = max(half_side_km - options['radius'], 0)
+        timings, hits = [], []
+        for _ in range(options['queries']):
+            lat = CENTER_LAT + rng.uniform(-inner_km, inner_km) / 111.0
+            lon = CENTER_LON + rng.uniform(-inner_km, inner_km) / (111.0 * math.cos(math.radians(CENTER_LAT)))
+            start = time.perf_counter()
+            stores = list(LocationService.get_nearby_stores(lat, lon, radius_km=options['radius']))
+            timings.append((time.perf_counter() - start) * 1000)
+            hits.append(len(stores))
+        return timings, hits
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:39
+
+import math
+
+from django.db import migrations, models
+
+
+# Frozen copy of apps.stores.geo.grid_cell as of this migration, so later
+# changes to the grid don't change what the backfill writes.
+GRID_CELL_DEG = 0.05
+_ROW_STRIDE = 10_000
+BACKFILL_BATCH_SIZE = 1000
+
+
+def grid_cell(lat, lon):
+    if lat is None or lon is None:
+        return None
+    row = int(math.floor((float(lat) + 90.0) / GRID_CELL_DEG))
+    col = int(math.floor((float(lon) + 180.0) / GRID_CELL_DEG))
+    return row * _ROW_STRIDE + col
+
+
+def populate_geo_cell(apps, schema_editor):
+    Store = apps.get_model('stores', 'Store')
+    stores = (
+        Store.objects.filter(latitude__isnull=False, longitude__isnull=False)
+        .only('id', 'latitude', 'longitude')
+    )
+    batch = []
+    for store in stores.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        store.geo_cell = grid_cell(store.latitude, store.longitude)
+        batch.append(store)
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Store.objects.bulk_update(batch, ['geo_cell'])
+            batch = []
+    if batch:
+        Store.objects.bulk_update(batch, ['geo_cell'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0008_add_working_hours_to_storetheme'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='geo_cell',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['is_active', 'store_type', 'geo_cell'], name='store_active_type_cell_idx'),
+        ),
+        migrations.RunPython(populate_geo_cell, migrations.RunPython.noop),
+    ]
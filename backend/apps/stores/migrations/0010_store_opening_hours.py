@@ -0,0 +1,65 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of apps.stores.models.schedule_rows as of this migration, so
+# later changes to the model helper don't change what the backfill does.
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MINUTES_PER_DAY = 24 * 60
+
+
+def schedule_rows(working_days, opening_time, closing_time):
+    if not opening_time or not closing_time or not working_days:
+        return []
+    opens = opening_time.hour * 60 + opening_time.minute
+    closes = closing_time.hour * 60 + closing_time.minute
+    rows = []
+    for day in working_days:
+        if day not in WEEKDAYS:
+            continue
+        weekday = WEEKDAYS.index(day)
+        if closes < opens:
+            rows.append((weekday, opens, MINUTES_PER_DAY - 1))
+            rows.append(((weekday + 1) % 7, 0, closes))
+        else:
+            rows.append((weekday, opens, closes))
+    return rows
+
+
+def populate_opening_hours(apps, schema_editor):
+    StoreTheme = apps.get_model('stores', 'StoreTheme')
+    StoreOpeningHours = apps.get_model('stores', 'StoreOpeningHours')
+    rows = []
+    themes = StoreTheme.objects.only('store_id', 'working_days', 'opening_time', 'closing_time')
+    for theme in themes.iterator(chunk_size=1000):
+        for weekday, opens, closes in schedule_rows(theme.working_days, theme.opening_time, theme.closing_time):
+            rows.append(StoreOpeningHours(
+                store_id=theme.store_id, weekday=weekday, open_minute=opens, close_minute=closes,
+            ))
+    StoreOpeningHours.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0009_store_geo_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoreOpeningHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField()),
+                ('open_minute', models.PositiveSmallIntegerField()),
+                ('close_minute', models.PositiveSmallIntegerField()),
+                ('store', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_hours', to='stores.store')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['store', 'weekday', 'open_minute', 'close_minute'], name='store_hours_lookup_idx')],
+            },
+        ),
+        migrations.RunPython(populate_opening_hours, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:54
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# Keep search_vector in step with the text columns inside Postgres, so every
+# write path (save(), queryset.update(), bulk imports, raw SQL) is covered.
+# The 'simple' configuration lowercases without stemming or stop words, which
+# suits mixed English/Amharic names. Existing rows are backfilled by touching
+# the first column, which fires the trigger.
+SEARCH_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION stores_store_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.category, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER stores_store_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, category, description ON stores_store
+    FOR EACH ROW EXECUTE FUNCTION stores_store_search_vector_update();
+
+UPDATE stores_store SET name = name;
+"""
+
+DROP_SEARCH_VECTOR_SQL = """
+DROP TRIGGER IF EXISTS stores_store_search_vector_trigger ON stores_store;
+DROP FUNCTION IF EXISTS stores_store_search_vector_update();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0010_store_opening_hours'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='store',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(SEARCH_VECTOR_SQL, DROP_SEARCH_VECTOR_SQL),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='store_search_vector_idx'),
+        ),
+    ]
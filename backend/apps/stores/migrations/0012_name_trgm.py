@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 07:56
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0011_search_vector'),
+    ]
+
+    operations = [
+        # pg_trgm is a trusted extension (PG 13+), so the app's DB owner can create it.
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='store',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='store_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
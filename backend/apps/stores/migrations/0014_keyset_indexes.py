@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('stores', '0013_search_keys'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='store',
+            index=models.Index(fields=['is_active', 'created_at', 'id'], name='store_active_created_idx'),
+        ),
+    ]
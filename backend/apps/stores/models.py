@@ -1,4 +1,6 @@
 import uuid
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models, IntegrityError, transaction
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -8,6 +10,10 @@ from django.core.validators import (
     MinValueValidator, MaxValueValidator, validate_image_file_extension
 )
 
+from apps.search.normalize import search_keys
+
+from .geo import grid_cell
+
 User = get_user_model()
 
 
@@ -17,6 +23,53 @@ def _validate_image_size(value):
     if value.size > limit_mb * 1024 * 1024:
         raise ValidationError(f'Image file too large. Maximum size is {limit_mb}MB.')
 
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_of_day(value):
+    return value.hour * 60 + value.minute
+
+
+def schedule_rows(working_days, opening_time, closing_time):
+    """
+    Expand StoreTheme business hours into (weekday, open_minute, close_minute)
+    ranges, both ends inclusive, weekday 0 = Monday. An overnight range
+    (closing < opening) is split: the part after midnight belongs to the
+    following day.
+    """
+    if not opening_time or not closing_time or not working_days:
+        return []
+    opens, closes = _minute_of_day(opening_time), _minute_of_day(closing_time)
+    rows = []
+    for day in working_days:
+        if day not in WEEKDAYS:
+            continue
+        weekday = WEEKDAYS.index(day)
+        if closes < opens:
+            rows.append((weekday, opens, MINUTES_PER_DAY - 1))
+            rows.append(((weekday + 1) % 7, 0, closes))
+        else:
+            rows.append((weekday, opens, closes))
+    return rows
+
+
+def is_open_at(working_days, opening_time, closing_time, now=None) -> bool:
+    """
+    True if a store with these business hours is open at `now` (local time,
+    defaults to the current time). Same rules as the StoreOpeningHours table:
+    an overnight range's hours after midnight count for the following day.
+    """
+    from django.utils import timezone
+    now = timezone.localtime(now or timezone.now())
+    weekday, minute = now.weekday(), _minute_of_day(now)
+    return any(
+        day == weekday and opens <= minute <= closes
+        for day, opens, closes in schedule_rows(working_days, opening_time, closing_time)
+    )
+
+
 class Store(models.Model):
     STORE_TYPE_CHOICES = [
         ('RETAIL', 'Retail Shop (Fashion, Tech, etc.)'),
@@ -62,6 +115,16 @@ class Store(models.Model):
         validators=[MinValueValidator(-180), MaxValueValidator(180)]
     )
     city = models.CharField(max_length=100, default='Addis Ababa')
+    # Spatial access path: id of the uniform grid cell containing (latitude,
+    # longitude). Maintained in save(); see apps/stores/geo.py.
+    geo_cell = models.IntegerField(null=True, blank=True, editable=False)
+    # Full-text document over name (A), category (B) and description (C).
+    # Maintained by a database trigger (migration 0011), so bulk writes and
+    # queryset.update() keep it current too; see apps/search.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Folded/transliterated spellings of the name (apps/search/normalize.py),
+    # indexed through search_vector. Maintained in save().
+    search_keys = models.TextField(blank=True, default='', editable=False)
     
     # Subscriptions & Billing
     SUBSCRIPTION_CHOICES = [
@@ -83,28 +146,49 @@ class Store(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Nearby/discovery lookups: WHERE is_active AND store_type IN (...) AND geo_cell IN (...)
+            models.Index(fields=['is_active', 'store_type', 'geo_cell'], name='store_active_type_cell_idx'),
+            # Discovery list, keyset-paged on (created_at, id); see core/pagination.py.
+            models.Index(fields=['is_active', 'created_at', 'id'], name='store_active_created_idx'),
+            GinIndex(fields=['search_vector'], name='store_search_vector_idx'),
+            # Autocomplete (apps/search/suggest.py): trigram word similarity on name.
+            GinIndex(fields=['name'], name='store_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember where the store was when loaded, so a move can invalidate
+        # the map tile it left as well as the one it entered.
+        instance._loaded_coords = (
+            instance.__dict__.get('latitude'), instance.__dict__.get('longitude')
+        )
+        return instance
+
     @property
     def is_open(self) -> bool:
         """Compute open/closed from the StoreTheme opening/closing time fields."""
         try:
             theme = self.theme_config
-            if not theme.opening_time or not theme.closing_time or not theme.working_days:
-                return False
-            from django.utils import timezone
-            now = timezone.localtime(timezone.now())
-            day_abbr = now.strftime('%a')  # 'Mon', 'Tue', ...
-            if day_abbr not in theme.working_days:
-                return False
-            t = now.time()
-            if theme.closing_time < theme.opening_time:  # overnight
-                return t >= theme.opening_time or t <= theme.closing_time
-            return theme.opening_time <= t <= theme.closing_time
+            return is_open_at(theme.working_days, theme.opening_time, theme.closing_time)
         except Exception:
             return False
 
 
 
     def save(self, *args, **kwargs):
+        # Keep the grid cell in sync with the coordinates. Note that
+        # queryset.update(latitude=...) bypasses this and must set geo_cell too.
+        self.geo_cell = grid_cell(self.latitude, self.longitude)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and ({'latitude', 'longitude'} & set(update_fields)):
+            kwargs['update_fields'] = set(update_fields) | {'geo_cell'}
+        self.search_keys = search_keys(self.name)
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | {'search_keys'}
+
         if not self.slug:
             # ✅ FIX (Issue #11): Replaced the race-condition while-loop with a
             # transaction.atomic() + IntegrityError retry pattern.
@@ -172,3 +256,32 @@ class StoreTheme(models.Model):
 
     def __str__(self):
         return f"{self.store.name} Theme"
+
+
+class StoreOpeningHours(models.Model):
+    """
+    Opening hours normalized from StoreTheme (working_days, opening_time,
+    closing_time) into one row per open range per weekday, so "open now" is
+    an indexed lookup instead of Python per store. Rebuilt by a StoreTheme
+    post_save signal; see schedule_rows() for how overnight ranges are split.
+    """
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name='opening_hours')
+    weekday = models.PositiveSmallIntegerField()  # 0 = Monday
+    open_minute = models.PositiveSmallIntegerField()
+    close_minute = models.PositiveSmallIntegerField()  # inclusive
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['store', 'weekday', 'open_minute', 'close_minute'], name='store_hours_lookup_idx'),
+        ]
+
+    @classmethod
+    def rebuild_for(cls, store_id, working_days, opening_time, closing_time):
+        cls.objects.filter(store_id=store_id).delete()
+        cls.objects.bulk_create([
+            cls(store_id=store_id, weekday=weekday, open_minute=opens, close_minute=closes)
+            for weekday, opens, closes in schedule_rows(working_days, opening_time, closing_time)
+        ])
+
+    def __str__(self):
+        return f"{self.store_id} {WEEKDAYS[self.weekday]} {self.open_minute}-{self.close_minute}"
@@ -23,7 +23,9 @@ class StoreThemeMixin(serializers.Serializer):
     is_open = serializers.SerializerMethodField()
 
     def get_is_open(self, obj):
-        return obj.is_open
+        # Querysets annotated with services.with_open_now() answer this in SQL.
+        open_now = getattr(obj, 'open_now', None)
+        return obj.is_open if open_now is None else open_now
     
     announcement_is_active = serializers.BooleanField(source='theme_config.announcement_is_active', required=False)
     announcement_text = serializers.CharField(source='theme_config.announcement_text', required=False, allow_blank=True)
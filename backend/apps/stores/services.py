@@ -1,56 +1,195 @@
-import math
-from django.db.models import F, ExpressionWrapper, FloatField
-from django.db.models.functions import ACos, Cos, Radians, Sin
-from .models import Store
+from django.core.files.storage import default_storage
+from django.db.models import Avg, Count, Exists, F, ExpressionWrapper, FloatField, OuterRef
+from django.utils import timezone
+from django.db.models.functions import ACos, Cos, Floor, Radians, Sin
+from .geo import bounding_box, cells_for_box, cluster_cell_deg, covering_cells
+from .models import Store, StoreOpeningHours
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_expression(lat, lon, prefix=''):
+    """
+    Great-circle distance (km) from (lat, lon) to each row's coordinates.
+    prefix points at a related store's coordinates, e.g. 'store__'.
+    """
+    latitude, longitude = F(f'{prefix}latitude'), F(f'{prefix}longitude')
+    return ExpressionWrapper(
+        EARTH_RADIUS_KM * ACos(
+            Cos(Radians(lat)) * Cos(Radians(latitude)) *
+            Cos(Radians(longitude) - Radians(lon)) +
+            Sin(Radians(lat)) * Sin(Radians(latitude))
+        ),
+        output_field=FloatField()
+    )
+
+
+def open_now_expression(now=None, store='pk'):
+    """
+    EXISTS over StoreOpeningHours: true when the outer store has a range
+    covering the current local weekday and minute. Evaluated in SQL.
+    store names the outer column holding the store id ('store_id' for
+    products and menu items).
+    """
+    now = timezone.localtime(now or timezone.now())
+    minute = now.hour * 60 + now.minute
+    return Exists(StoreOpeningHours.objects.filter(
+        store=OuterRef(store),
+        weekday=now.weekday(),
+        open_minute__lte=minute,
+        close_minute__gte=minute,
+    ))
+
+
+def with_open_now(queryset, only_open=False):
+    """
+    Annotate `open_now` on a Store queryset (read by the serializers instead
+    of Store.is_open) and, with only_open, keep just the stores open now.
+    """
+    if 'open_now' not in queryset.query.annotations:
+        queryset = queryset.annotate(open_now=open_now_expression())
+    if only_open:
+        queryset = queryset.filter(open_now=True)
+    return queryset
+
+
+def wants_open_now(request):
+    return request.query_params.get('open_now', '').lower() in ('1', 'true', 'yes')
+
+
+# ── Map pins ─────────────────────────────────────────────────────────────────
+# Fields sent for an individual map pin (plus is_open, and distance on nearby).
+PIN_FIELDS = ('id', 'slug', 'name', 'store_type', 'latitude', 'longitude', 'logo')
+
+
+def pin_values(queryset, *extra):
+    """Project a Store queryset to the columns needed for pins (no model instances)."""
+    return with_open_now(queryset).values(*PIN_FIELDS, 'open_now', *extra)
+
+
+def to_pin(row):
+    """Turn a pin_values() row into a pin dict."""
+    row['latitude'] = float(row['latitude']) if row['latitude'] is not None else None
+    row['longitude'] = float(row['longitude']) if row['longitude'] is not None else None
+    row['logo'] = default_storage.url(row['logo']) if row['logo'] else None
+    row['is_open'] = row.pop('open_now')
+    return row
+
+
+def card_to_pin(card):
+    """Project a full discovery card (memory/tile engines) down to a pin."""
+    pin = {field: card.get(field) for field in PIN_FIELDS}
+    for field in ('latitude', 'longitude'):
+        if pin[field] is not None:
+            pin[field] = float(pin[field])
+    pin['is_open'] = card.get('is_open', False)
+    if 'distance' in card:
+        pin['distance'] = card['distance']
+    return pin
+
+
+def to_columns(rows):
+    """
+    Columnar encoding: {"field": [value, ...], ...} instead of a list of
+    objects. Keys are sent once, which roughly halves pin payloads.
+    """
+    fields = list(rows[0]) if rows else list(PIN_FIELDS) + ['is_open']
+    return {field: [row.get(field) for row in rows] for field in fields}
+
 
 class LocationService:
     @staticmethod
-    def get_nearby_stores(user_lat, user_lon, radius_km=10.0, store_type=None):
+    def get_nearby_stores(user_lat, user_lon, radius_km=10.0, store_type=None, only_open=False):
         """
         Find stores within radius_km of the given coordinates.
 
-        ✅ PERFORMANCE FIX: Apply a lat/lon bounding box BEFORE the expensive
-        Haversine annotation. The trig functions (ACos, Cos, Sin) previously ran
-        against the ENTIRE Store table on every map request — O(N) CPU cost.
-        The bounding box is a simple range filter that uses column indexes and
-        reduces the candidate set to a small geographic area, typically cutting
-        CPU cost by 90-99% at scale.
+        ✅ PERFORMANCE FIX: Spatial index lookup BEFORE the expensive Haversine
+        annotation. Each store carries the id of the uniform grid cell it sits
+        in (Store.geo_cell, see geo.py). We enumerate the few cells covering
+        the search circle and filter with `geo_cell IN (...)`, which is served
+        by the (is_active, store_type, geo_cell) index. The candidate set — and
+        the query cost — depends on the area searched, not on the total number
+        of stores.
+
+        store_type is always constrained (to every type when not given) so the
+        leading columns of the composite index are usable.
 
-        The bounding box is a square approximation (slightly larger than the
-        exact circle) so no valid stores near the edge are excluded before the
-        precise Haversine filter is applied.
+        The cells plus a lat/lon bounding box are a square approximation,
+        slightly larger than the exact circle, so no valid stores near the edge
+        are excluded before the precise Haversine filter is applied.
+
+        Rows carry an `open_now` annotation; only_open filters on it in SQL.
         """
-        earth_radius = 6371.0
         lat = float(user_lat)
         lon = float(user_lon)
 
-        # 1. Cheap bounding box filter (uses index on latitude/longitude columns)
-        #    1 degree latitude ≈ 111 km everywhere.
-        #    1 degree longitude ≈ 111 km * cos(lat) (shrinks toward poles).
-        delta_lat = radius_km / 111.0
-        delta_lon = radius_km / (111.0 * math.cos(math.radians(lat))) if math.cos(math.radians(lat)) != 0 else 180.0
-
-        # 2. Expensive Haversine annotation — now only runs on the bounding box subset.
-        distance_expr = ExpressionWrapper(
-            earth_radius * ACos(
-                Cos(Radians(lat)) * Cos(Radians(F('latitude'))) *
-                Cos(Radians(F('longitude')) - Radians(lon)) +
-                Sin(Radians(lat)) * Sin(Radians(F('latitude')))
-            ),
-            output_field=FloatField()
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+        store_types = (
+            [store_type.upper()] if store_type
+            else [choice for choice, _ in Store.STORE_TYPE_CHOICES]
         )
 
         queryset = Store.objects.filter(
             is_active=True,
-            latitude__isnull=False,
-            longitude__isnull=False,
-            latitude__range=(lat - delta_lat, lat + delta_lat),
-            longitude__range=(lon - delta_lon, lon + delta_lon),
-        ).annotate(
-            distance=distance_expr
+            store_type__in=store_types,
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon),
+        )
+
+        # 1. Grid cells covering the circle (index lookup). Very large radii
+        #    fall back to the plain bounding-box range filter above.
+        cells = covering_cells(lat, lon, radius_km)
+        if cells is not None:
+            queryset = queryset.filter(geo_cell__in=cells)
+
+        # 2. Exact Haversine filter — only runs on the candidate cells.
+        queryset = queryset.annotate(
+            distance=haversine_expression(lat, lon)
         ).filter(distance__lte=radius_km).order_by('distance')
+        return with_open_now(queryset, only_open)
 
-        if store_type:
-            queryset = queryset.filter(store_type=store_type.upper())
+    @staticmethod
+    def get_stores_in_box(min_lat, max_lat, min_lon, max_lon, store_type=None, only_open=False):
+        """
+        Active stores inside a lat/lon rectangle (a map viewport).
+        Uses the same grid-cell index as get_nearby_stores when the box is
+        small enough; otherwise a plain range filter.
+        """
+        store_types = (
+            [store_type.upper()] if store_type
+            else [choice for choice, _ in Store.STORE_TYPE_CHOICES]
+        )
+        queryset = Store.objects.filter(
+            is_active=True,
+            store_type__in=store_types,
+            latitude__range=(min_lat, max_lat),
+            longitude__range=(min_lon, max_lon),
+        )
+        cells = cells_for_box(min_lat, max_lat, min_lon, max_lon)
+        if cells is not None:
+            queryset = queryset.filter(geo_cell__in=cells)
+        if only_open:
+            queryset = queryset.filter(open_now_expression())
+        return queryset
 
-        return queryset
\ No newline at end of file
+    @staticmethod
+    def cluster_stores(queryset, zoom):
+        """
+        Aggregate stores into grid clusters sized for the zoom level, in SQL:
+        one row per occupied cell with its store count and centroid.
+        """
+        size = cluster_cell_deg(zoom)
+        return list(
+            queryset.annotate(
+                cluster_row=Floor(ExpressionWrapper(F('latitude') / size, output_field=FloatField())),
+                cluster_col=Floor(ExpressionWrapper(F('longitude') / size, output_field=FloatField())),
+            )
+            .values('cluster_row', 'cluster_col')
+            .annotate(
+                count=Count('id'),
+                latitude=Avg('latitude', output_field=FloatField()),
+                longitude=Avg('longitude', output_field=FloatField()),
+            )
+            .values('count', 'latitude', 'longitude')
+            .order_by()
+        )
@@ -1,6 +1,9 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from core.versioning import bump_store_version_on_commit
+
 
 @receiver(post_save, sender='stores.Store')
 def create_store_theme(sender, instance, created, **kwargs):
@@ -12,3 +15,74 @@ def create_store_theme(sender, instance, created, **kwargs):
     if created:
         from .models import StoreTheme
         StoreTheme.objects.get_or_create(store=instance)
+
+
+@receiver(post_save, sender='stores.StoreTheme')
+def sync_opening_hours(sender, instance, **kwargs):
+    """Rebuild the store's StoreOpeningHours rows from the theme's business hours."""
+    from .models import StoreOpeningHours
+    StoreOpeningHours.rebuild_for(
+        instance.store_id, instance.working_days, instance.opening_time, instance.closing_time
+    )
+
+
+@receiver(post_save, sender='stores.Store')
+def refresh_spatial_index_on_store_save(sender, instance, **kwargs):
+    """Keep the in-memory discovery index (STORE_DISCOVERY_ENGINE='memory') fresh."""
+    from .spatial_index import apply_change, memory_engine_enabled
+    if memory_engine_enabled():
+        transaction.on_commit(lambda: apply_change(store=instance))
+
+
+@receiver(post_delete, sender='stores.Store')
+def refresh_spatial_index_on_store_delete(sender, instance, **kwargs):
+    from .spatial_index import apply_change, memory_engine_enabled
+    if memory_engine_enabled():
+        store_id = instance.pk
+        transaction.on_commit(lambda: apply_change(deleted_id=store_id))
+
+
+@receiver(post_save, sender='stores.StoreTheme')
+def refresh_spatial_index_on_theme_save(sender, instance, **kwargs):
+    # Discovery cards embed theme fields (colours, hours), so re-index the store.
+    from .spatial_index import apply_change, memory_engine_enabled
+    if memory_engine_enabled():
+        transaction.on_commit(lambda: apply_change(store=instance.store))
+
+
+@receiver(post_save, sender='stores.Store')
+def invalidate_map_tiles_on_store_save(sender, instance, **kwargs):
+    """Drop cached map tiles (STORE_DISCOVERY_ENGINE='tiles') the store is or was in."""
+    from .tiles import invalidate, tiles_engine_enabled
+    if tiles_engine_enabled():
+        coords = [(instance.latitude, instance.longitude), getattr(instance, '_loaded_coords', (None, None))]
+        instance._loaded_coords = (instance.latitude, instance.longitude)
+        transaction.on_commit(lambda: invalidate(*coords))
+
+
+@receiver(post_delete, sender='stores.Store')
+def invalidate_map_tiles_on_store_delete(sender, instance, **kwargs):
+    from .tiles import invalidate, tiles_engine_enabled
+    if tiles_engine_enabled():
+        coords = (instance.latitude, instance.longitude)
+        transaction.on_commit(lambda: invalidate(coords))
+
+
+@receiver(post_save, sender='stores.StoreTheme')
+def invalidate_map_tiles_on_theme_save(sender, instance, **kwargs):
+    from .tiles import invalidate, tiles_engine_enabled
+    if tiles_engine_enabled():
+        coords = (instance.store.latitude, instance.store.longitude)
+        transaction.on_commit(lambda: invalidate(coords))
+
+
+@receiver(post_save, sender='stores.Store')
+@receiver(post_delete, sender='stores.Store')
+def bump_store_version_on_store_change(sender, instance, **kwargs):
+    """Store changes invalidate the store's ETags (see core/versioning.py)."""
+    bump_store_version_on_commit(instance.pk)
+
+
+@receiver(post_save, sender='stores.StoreTheme')
+def bump_store_version_on_theme_change(sender, instance, **kwargs):
+    bump_store_version_on_commit(instance.store_id)
@@ -0,0 +1,314 @@
+import logging
+import math
+import threading
+import uuid
+from array import array
+from datetime import time as dt_time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from core.cache import redis_client
+from .geo import covering_cells, grid_cell
+from .services import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+# Shared change log in Redis. Every committed Store/StoreTheme change takes
+# the next sequence number from VERSION_KEY and records '<seq>:<store id>'
+# in CHANGES_KEY (a sorted set scored by seq, trimmed to CHANGES_KEPT). A
+# worker at version v applies the stores changed in (v, current] and only
+# rebuilds — in the background — when part of that range was trimmed.
+VERSION_KEY = 'stores:spatial_index:version'
+CHANGES_KEY = 'stores:spatial_index:changes'
+CHANGES_KEPT = 10000
+
+_PUBLISH = """
+local seq = redis.call('incr', KEYS[1])
+redis.call('zadd', KEYS[2], seq, seq .. ':' .. ARGV[1])
+redis.call('zremrangebyrank', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+return seq
+"""
+
+
+def memory_engine_enabled() -> bool:
+    return getattr(settings, 'STORE_DISCOVERY_ENGINE', 'db') == 'memory'
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    return value if isinstance(value, dt_time) else dt_time.fromisoformat(value)
+
+
+class StoreSpatialIndex:
+    """
+    Per-worker in-memory spatial index of active stores for `nearby`.
+
+    Storage is array-backed: each store occupies a slot in parallel arrays
+    (lat/lon as C doubles, plus id, store_type and the pre-serialized
+    discovery card), and a uniform grid — the same cells as Store.geo_cell —
+    maps each cell to the slot numbers inside it. A query visits only the
+    covering cells, then runs the exact Haversine check in Python.
+
+    Freed slots (deleted/deactivated stores) are recycled. Changes made by
+    any worker reach the others through the shared change log (see
+    CHANGES_KEY) and are applied store by store.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._catch_up_lock = threading.Lock()
+        self._rebuilding = False
+        self._reset()
+
+    def _reset(self):
+        self._lats = array('d')
+        self._lons = array('d')
+        self._ids = []
+        self._types = []
+        self._cards = []
+        self._hours = []
+        self._cells = {}
+        self._slot_by_id = {}
+        self._free = []
+        self.version = None
+        self.built = False
+
+    # ── Building ────────────────────────────────────────────────────────────
+
+    def rebuild(self):
+        """
+        Load every active, geolocated store from the database into a fresh
+        index, then swap it in; queries keep using the old one meanwhile.
+        """
+        from .models import Store
+        from .serializers import StoreDiscoverySerializer
+
+        stores = (
+            Store.objects.filter(is_active=True, latitude__isnull=False, longitude__isnull=False)
+            .select_related('theme_config')
+        )
+        fresh = StoreSpatialIndex()
+        # Read before loading: changes made meanwhile are applied afterwards.
+        fresh.version = _current_version()
+        for store in stores.iterator(chunk_size=2000):
+            fresh._insert(store, StoreDiscoverySerializer(store).data)
+        with self._lock:
+            for name in ('_lats', '_lons', '_ids', '_types', '_cards', '_hours',
+                         '_cells', '_slot_by_id', '_free', 'version'):
+                setattr(self, name, getattr(fresh, name))
+            self.built = True
+        logger.info(f"[SpatialIndex] Built with {len(self._slot_by_id)} stores (version {self.version}).")
+
+    def ensure_fresh(self):
+        """Build on first use, then apply stores changed by any worker since."""
+        if not self.built:
+            with self._build_lock:
+                if not self.built:
+                    self.rebuild()
+            return
+        # One thread catches up at a time; the others serve what we have.
+        if not self._catch_up_lock.acquire(blocking=False):
+            return
+        try:
+            self._catch_up()
+        except Exception as e:
+            # Keep serving the current index; retried on the next query.
+            logger.warning(f"[SpatialIndex] Catch-up failed: {e}")
+        finally:
+            self._catch_up_lock.release()
+
+    def _catch_up(self):
+        client = redis_client()
+        if client is None:
+            return
+        current = int(client.get(cache.make_key(VERSION_KEY)) or 0)
+        if self.version is not None and current == self.version:
+            return
+        if self.version is None or current < self.version:
+            # Built without the log, or the log was reset (Redis flushed).
+            self._rebuild_in_background()
+            return
+        changes = client.zrangebyscore(cache.make_key(CHANGES_KEY), self.version + 1, current)
+        if len(changes) != current - self.version:
+            # Part of the range was trimmed from the log.
+            self._rebuild_in_background()
+            return
+        self.refresh({change.decode().split(':', 1)[1] for change in changes})
+        self.version = current
+
+    def _rebuild_in_background(self):
+        if self._rebuilding:
+            return
+        self._rebuilding = True
+
+        def run():
+            try:
+                self.rebuild()
+            except Exception as e:
+                logger.error(f"[SpatialIndex] Background rebuild failed: {e}")
+            finally:
+                self._rebuilding = False
+                connection.close()
+
+        threading.Thread(target=run, name='spatial-index-rebuild', daemon=True).start()
+
+    # ── Incremental maintenance ─────────────────────────────────────────────
+
+    def refresh(self, store_ids):
+        """Reload the given stores from the database (one query)."""
+        from .models import Store
+
+        store_ids = {uuid.UUID(str(store_id)) for store_id in store_ids}
+        stores = {
+            store.pk: store
+            for store in Store.objects.filter(pk__in=store_ids).select_related('theme_config')
+        }
+        for store_id in store_ids:
+            if store_id in stores:
+                self.upsert(stores[store_id])
+            else:
+                self.remove(store_id)
+
+    def upsert(self, store):
+        """Insert or refresh one store (removes it if inactive or unlocated)."""
+        from .serializers import StoreDiscoverySerializer
+
+        indexed = store.is_active and store.latitude is not None and store.longitude is not None
+        card = StoreDiscoverySerializer(store).data if indexed else None
+        with self._lock:
+            self._remove(store.pk)
+            if indexed:
+                self._insert(store, card)
+
+    def remove(self, store_id):
+        with self._lock:
+            self._remove(store_id)
+
+    def _insert(self, store, card):
+        lat, lon = float(store.latitude), float(store.longitude)
+        hours = (
+            card.get('working_days') or [],
+            _parse_time(card.get('opening_time')),
+            _parse_time(card.get('closing_time')),
+        )
+        if self._free:
+            slot = self._free.pop()
+            self._lats[slot], self._lons[slot] = lat, lon
+            self._ids[slot], self._types[slot] = store.pk, store.store_type
+            self._cards[slot], self._hours[slot] = card, hours
+        else:
+            slot = len(self._ids)
+            self._lats.append(lat)
+            self._lons.append(lon)
+            self._ids.append(store.pk)
+            self._types.append(store.store_type)
+            self._cards.append(card)
+            self._hours.append(hours)
+        self._cells.setdefault(grid_cell(lat, lon), array('I')).append(slot)
+        self._slot_by_id[store.pk] = slot
+
+    def _remove(self, store_id):
+        slot = self._slot_by_id.pop(store_id, None)
+        if slot is None:
+            return
+        cell = grid_cell(self._lats[slot], self._lons[slot])
+        members = self._cells.get(cell)
+        if members is not None:
+            members.remove(slot)
+            if not members:
+                del self._cells[cell]
+        self._ids[slot] = None
+        self._cards[slot] = None
+        self._free.append(slot)
+
+    # ── Queries ─────────────────────────────────────────────────────────────
+
+    def nearby(self, lat, lon, radius_km, store_type=None):
+        """
+        Return [(distance_km, card), ...] within radius_km, nearest first.
+        Cards are copies with a fresh `is_open`.
+        """
+        from .models import is_open_at
+
+        lat, lon = float(lat), float(lon)
+        wanted_type = store_type.upper() if store_type else None
+        lat_r = math.radians(lat)
+        cos_lat, sin_lat = math.cos(lat_r), math.sin(lat_r)
+
+        with self._lock:
+            cells = covering_cells(lat, lon, radius_km)
+            if cells is None:
+                slots = self._slot_by_id.values()
+            else:
+                slots = [s for c in cells for s in self._cells.get(c, ())]
+
+            hits = []
+            for slot in slots:
+                if wanted_type and self._types[slot] != wanted_type:
+                    continue
+                s_lat = math.radians(self._lats[slot])
+                cos_angle = (
+                    cos_lat * math.cos(s_lat) * math.cos(math.radians(self._lons[slot]) - math.radians(lon))
+                    + sin_lat * math.sin(s_lat)
+                )
+                distance = EARTH_RADIUS_KM * math.acos(max(-1.0, min(1.0, cos_angle)))
+                if distance <= radius_km:
+                    hits.append((distance, self._cards[slot], self._hours[slot]))
+
+        hits.sort(key=lambda hit: hit[0])
+        results = []
+        for distance, card, (working_days, opening, closing) in hits:
+            card = dict(card)
+            card['is_open'] = is_open_at(working_days, opening, closing)
+            card['distance'] = round(distance, 3)
+            results.append((distance, card))
+        return results
+
+
+def _current_version():
+    """The log's latest sequence number; None without a reachable Redis."""
+    try:
+        client = redis_client()
+        if client is None:
+            return None
+        return int(client.get(cache.make_key(VERSION_KEY)) or 0)
+    except Exception as e:
+        logger.warning(f"[SpatialIndex] Version read failed: {e}")
+        return None
+
+
+def publish_change(store_id):
+    """Record a changed store in the shared log; returns its sequence number (None on failure)."""
+    try:
+        client = redis_client()
+        if client is None:
+            return None
+        return client.eval(
+            _PUBLISH, 2, cache.make_key(VERSION_KEY), cache.make_key(CHANGES_KEY), str(store_id), CHANGES_KEPT,
+        )
+    except Exception as e:
+        logger.warning(f"[SpatialIndex] Change publish failed: {e}")
+        return None
+
+
+def apply_change(store=None, deleted_id=None):
+    """
+    Publish a committed Store/StoreTheme change. Every worker, this one
+    included, picks it up from the log on its next query. Without the log
+    (no Redis) only this worker's index can be updated, so it is updated
+    directly.
+    """
+    store_id = deleted_id if deleted_id is not None else store.pk
+    if publish_change(store_id) is not None or not store_index.built:
+        return
+    if deleted_id is not None:
+        store_index.remove(deleted_id)
+    else:
+        store_index.upsert(store)
+
+
+store_index = StoreSpatialIndex()
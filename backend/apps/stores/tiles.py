@@ -0,0 +1,240 @@
+"""
+Tile-quantized cache for map discovery (STORE_DISCOVERY_ENGINE='tiles').
+
+The world is cut into fixed web-map tiles (z/x/y, the same scheme map
+clients use) at TILE_ZOOM. Each tile's active stores are cached as one Redis
+entry; a discovery request is snapped to the tiles covering its search area,
+fetches their generations and then the tiles (two get_many calls), and only
+the missing tiles go to Postgres.
+Distance and is_open are computed per request, so cached entries never go
+stale with the clock — they change only when a Store or StoreTheme inside the
+tile changes (see apps/stores/signals.py).
+
+Each tile has a generation counter that is part of its cache key; a change
+advances it instead of deleting the entry. A fill that read Postgres before
+the change committed therefore stores under the old generation, where no
+reader will look, rather than over the fresh data. Generation keys have no
+TTL: the Redis only evicts keys that have one, so a counter can't vanish and
+send readers back to an old generation whose entry may still be cached.
+"""
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.singleflight import acquire_lease, release_lease, wait_for_many
+from .geo import bounding_box
+from .services import EARTH_RADIUS_KM
+
+logger = logging.getLogger(__name__)
+
+# z=12 tiles are ~9.8 km wide at the equator (~9.6 km in Addis Ababa).
+TILE_ZOOM = 12
+
+# Requests needing more tiles than this bypass the cache (country-wide boxes).
+MAX_TILES_PER_REQUEST = 64
+
+# Tiles are invalidated explicitly; the TTL only bounds memory for idle areas.
+TILE_CACHE_TTL = 60 * 60 * 6
+
+# Cold tiles: how long a fill may hold a tile's lease, and how long other
+# workers wait for it before loading the tile themselves.
+TILE_FILL_LEASE = 5
+TILE_FILL_WAIT = 1.0
+
+_MAX_LAT = 85.05112878
+
+
+def tiles_engine_enabled() -> bool:
+    return getattr(settings, 'STORE_DISCOVERY_ENGINE', 'db') == 'tiles'
+
+
+def tile_for(lat, lon, zoom=TILE_ZOOM):
+    """Return the (x, y) web-map tile containing a coordinate."""
+    lat = max(-_MAX_LAT, min(_MAX_LAT, float(lat)))
+    n = 2 ** zoom
+    x = int((float(lon) + 180.0) / 360.0 * n)
+    lat_r = math.radians(lat)
+    y = int((1.0 - math.asinh(math.tan(lat_r)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def tile_bounds(x, y, zoom=TILE_ZOOM):
+    """Return (min_lat, max_lat, min_lon, max_lon) of a tile."""
+    n = 2 ** zoom
+    min_lon = x / n * 360.0 - 180.0
+    max_lon = (x + 1) / n * 360.0 - 180.0
+    max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return min_lat, max_lat, min_lon, max_lon
+
+
+def tiles_for_box(min_lat, max_lat, min_lon, max_lon, zoom=TILE_ZOOM):
+    """
+    Return the tiles covering a lat/lon box, or None when there are more than
+    MAX_TILES_PER_REQUEST of them.
+    """
+    x0, y0 = tile_for(max_lat, max(min_lon, -180.0), zoom)  # north-west
+    x1, y1 = tile_for(min_lat, min(max_lon, 179.999999), zoom)  # south-east
+    if (x1 - x0 + 1) * (y1 - y0 + 1) > MAX_TILES_PER_REQUEST:
+        return None
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def tile_key(x, y, generation=0, zoom=TILE_ZOOM):
+    return f'stores:tile:{zoom}:{x}:{y}:g{generation}'
+
+
+def generation_key(x, y, zoom=TILE_ZOOM):
+    return f'stores:tile_gen:{zoom}:{x}:{y}'
+
+
+def _entry(store):
+    """Cached form of one store: coordinates, type, hours and discovery card."""
+    from .serializers import StoreDiscoverySerializer
+
+    theme = getattr(store, 'theme_config', None)
+    hours = (
+        (theme.working_days or [], theme.opening_time, theme.closing_time)
+        if theme is not None else ([], None, None)
+    )
+    return (
+        float(store.latitude), float(store.longitude), store.store_type,
+        dict(StoreDiscoverySerializer(store).data), hours,
+    )
+
+
+def _load_from_db(tiles):
+    """Build entries for tiles missing from the cache, in one query."""
+    from .models import Store
+
+    boxes = [tile_bounds(x, y) for x, y in tiles]
+    stores = Store.objects.filter(
+        is_active=True,
+        latitude__range=(min(b[0] for b in boxes), max(b[1] for b in boxes)),
+        longitude__range=(min(b[2] for b in boxes), max(b[3] for b in boxes)),
+    ).select_related('theme_config')
+
+    wanted = set(tiles)
+    loaded = {tile: [] for tile in tiles}
+    for store in stores:
+        tile = tile_for(store.latitude, store.longitude)
+        if tile in wanted:
+            loaded[tile].append(_entry(store))
+    return loaded
+
+
+def get_tiles(tiles):
+    """
+    Return {(x, y): [entry, ...]} from the cache, filling misses from Postgres.
+
+    Misses are coalesced across workers: each missing tile is leased by one
+    worker, which loads all of its leased tiles in a single query; tiles
+    leased elsewhere are awaited briefly, then loaded directly as a fallback.
+    """
+    try:
+        generations = cache.get_many([generation_key(x, y) for x, y in tiles])
+    except Exception as e:
+        logger.warning(f"[TileCache] Read failed: {e}")
+        generations = {}
+    key_for = {(x, y): tile_key(x, y, generations.get(generation_key(x, y), 0)) for x, y in tiles}
+    keys = {key: tile for tile, key in key_for.items()}
+    try:
+        cached = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"[TileCache] Read failed: {e}")
+        cached = {}
+
+    result = {keys[key]: entries for key, entries in cached.items()}
+    missing = [tile for tile in tiles if tile not in result]
+    if not missing:
+        return result
+
+    leases = {}
+    for tile in missing:
+        token = acquire_lease(key_for[tile], lease=TILE_FILL_LEASE)
+        if token is not None:
+            leases[tile] = token
+    try:
+        if leases:
+            result.update(_fill(list(leases), key_for))
+    finally:
+        for tile, token in leases.items():
+            release_lease(key_for[tile], token)
+
+    others = [tile for tile in missing if tile not in leases]
+    if others:
+        found = wait_for_many([key_for[tile] for tile in others], wait=TILE_FILL_WAIT)
+        result.update({keys[key]: entries for key, entries in found.items()})
+        late = [tile for tile in others if tile not in result]
+        if late:
+            result.update(_fill(late, key_for))
+    return result
+
+
+def _fill(tiles, key_for):
+    # key_for holds the generations read before the load: if a change
+    # commits meanwhile, these entries land under a key nobody reads.
+    loaded = _load_from_db(tiles)
+    try:
+        cache.set_many({key_for[tile]: entries for tile, entries in loaded.items()},
+                       timeout=TILE_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"[TileCache] Write failed: {e}")
+    return loaded
+
+
+def nearby(lat, lon, radius_km, store_type=None):
+    """
+    Return [(distance_km, card), ...] within radius_km, nearest first, or
+    None when the area is too large for the tile cache.
+    """
+    from .models import is_open_at
+
+    lat, lon = float(lat), float(lon)
+    tiles = tiles_for_box(*bounding_box(lat, lon, radius_km))
+    if tiles is None:
+        return None
+
+    wanted_type = store_type.upper() if store_type else None
+    lat_r, lon_r = math.radians(lat), math.radians(lon)
+    cos_lat, sin_lat = math.cos(lat_r), math.sin(lat_r)
+
+    hits = []
+    for entries in get_tiles(tiles).values():
+        for s_lat, s_lon, s_type, card, hours in entries:
+            if wanted_type and s_type != wanted_type:
+                continue
+            s_lat_r = math.radians(s_lat)
+            cos_angle = (
+                cos_lat * math.cos(s_lat_r) * math.cos(math.radians(s_lon) - lon_r)
+                + sin_lat * math.sin(s_lat_r)
+            )
+            distance = EARTH_RADIUS_KM * math.acos(max(-1.0, min(1.0, cos_angle)))
+            if distance <= radius_km:
+                hits.append((distance, card, hours))
+
+    hits.sort(key=lambda hit: hit[0])
+    results = []
+    for distance, card, (working_days, opening, closing) in hits:
+        card = dict(card)
+        card['is_open'] = is_open_at(working_days, opening, closing)
+        card['distance'] = round(distance, 3)
+        results.append((distance, card))
+    return results
+
+
+def invalidate(*coords):
+    """Advance the generation of the tiles containing the given (lat, lon) pairs."""
+    keys = {
+        generation_key(*tile_for(lat, lon))
+        for lat, lon in coords
+        if lat is not None and lon is not None
+    }
+    for key in keys:
+        try:
+            cache.add(key, 0, timeout=None)
+            cache.incr(key)
+        except Exception as e:
+            logger.warning(f"[TileCache] Invalidation failed for {key}: {e}")
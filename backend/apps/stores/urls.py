@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import StoreManagementViewSet, StoreDiscoveryViewSet
+from .views import StoreManagementViewSet, StoreDiscoveryViewSet, StorefrontBundleView
 
 router = DefaultRouter(trailing_slash=True)
 router.register(r'manage', StoreManagementViewSet, basename='store-manage')
@@ -9,5 +9,6 @@ router.register(r'manage', StoreManagementViewSet, basename='store-manage')
 router.register(r'discovery', StoreDiscoveryViewSet, basename='store-discovery')
 
 urlpatterns = [
+    path('storefront/<slug:slug>/bundle', StorefrontBundleView.as_view(), name='storefront-bundle'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
@@ -1,13 +1,23 @@
+from django.http import HttpResponse
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django.views.decorators.vary import vary_on_headers
+from core.mixins import LazyAuthenticationMixin
+from core.pagination import CreatedAtCursorPagination, DistanceCursorPagination
 from core.permissions import IsSeller, IsStoreOwner
+from core.versioning import cached_for_store, conditional_response
+from .bundle import bundle_bytes
 from .serializers import StoreManagementSerializer, StoreDiscoverySerializer
-from .services import LocationService
+from .geo import CLUSTER_MAX_ZOOM, parse_bbox
+from .services import (
+    LocationService, card_to_pin, pin_values, to_columns, to_pin, wants_open_now, with_open_now,
+)
+from .spatial_index import memory_engine_enabled, store_index
+from . import tiles
 from .models import Store
 import logging
 
@@ -16,10 +26,12 @@ logger = logging.getLogger(__name__)
 
 # ── Store Discovery (Public, Read-Only) ───────────────────────────────────────
 
-class StoreDiscoveryViewSet(viewsets.ReadOnlyModelViewSet):
+class StoreDiscoveryViewSet(LazyAuthenticationMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = StoreDiscoverySerializer
     permission_classes = [AllowAny]
     lookup_field = 'slug'
+    pagination_class = CreatedAtCursorPagination
+    cursor_ordering = 'created_at'
 
     def get_queryset(self):
         # ✅ FIX: Explicit ordering and select_related for the new theme config
@@ -28,42 +40,215 @@ class StoreDiscoveryViewSet(viewsets.ReadOnlyModelViewSet):
         store_type = self.request.query_params.get('type')
         if store_type:
             queryset = queryset.filter(store_type=store_type.upper())
-        return queryset
+        # is_open is computed in SQL; ?open_now=true filters on it there too.
+        return with_open_now(queryset, wants_open_now(self.request))
+
+    def list(self, request, *args, **kwargs):
+        if not self._wants_pins(request):
+            return super().list(request, *args, **kwargs)
+        # created_at is the page cursor's key; it isn't part of the pin.
+        queryset = pin_values(self.filter_queryset(self.get_queryset()), 'created_at')
+        page = self.paginate_queryset(queryset)
+        pins = []
+        for row in (page if page is not None else queryset):
+            pin = to_pin(row)
+            del pin['created_at']
+            pins.append(pin)
+        data = self._pins_data(request, pins)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
 
     @action(detail=False, methods=['get'])
     def by_slug(self, request):
         slug = request.query_params.get('slug')
         if not slug:
             return Response({"error": "Store slug is required."}, status=400)
-        try:
-            store = Store.objects.select_related('theme_config').get(slug=slug, is_active=True)
-            serializer = self.get_serializer(store)
-            return Response(serializer.data)
-        except Store.DoesNotExist:
+        # One indexed lookup for the validators; the ETag also covers is_open,
+        # which changes with the clock rather than with the store's content.
+        found = (
+            with_open_now(Store.objects.filter(slug=slug, is_active=True))
+            .values_list('id', 'open_now').first()
+        )
+        if found is None:
             return Response({"error": "Store not found."}, status=404)
+        store_id, open_now = found
+
+        def serialize():
+            store = with_open_now(Store.objects.select_related('theme_config')).get(pk=store_id)
+            return self.get_serializer(store).data
+
+        def build():
+            return Response(cached_for_store(
+                store_id, 'by_slug', (request.build_absolute_uri('/'), open_now), serialize
+            ))
+
+        return conditional_response(request, store_id, build, open_now)
 
     @action(detail=False, methods=['get'])
     def nearby(self, request):
+        """
+        Stores within ?radius= km of ?lat=/?lon=, nearest first, each with its
+        `distance` in km. Paged by DistanceCursorPagination: ?limit= (capped
+        server-side) and the opaque ?cursor= from the previous page's `next`.
+        ?view=pins returns compact map pins instead of full store cards;
+        ?open_now=true keeps only stores open right now.
+        """
         lat = request.query_params.get('lat')
         lon = request.query_params.get('lon') or request.query_params.get('lng')
-        radius = float(request.query_params.get('radius', 15))
         store_type = request.query_params.get('type')
 
         if not lat or not lon:
             return Response({"error": "Latitude and longitude are required."}, status=400)
 
+        only_open = wants_open_now(request)
+        paginator = DistanceCursorPagination()
         try:
+            radius = float(request.query_params.get('radius', 15))
+
+            hits = None
+            if memory_engine_enabled():
+                # Answer entirely from this worker's in-memory spatial index.
+                store_index.ensure_fresh()
+                hits = store_index.nearby(lat, lon, radius, store_type)
+            elif tiles.tiles_engine_enabled():
+                # Assemble from cached per-tile store lists (None if the area
+                # spans too many tiles; fall through to Postgres).
+                hits = tiles.nearby(lat, lon, radius, store_type)
+
+            if hits is not None:
+                if only_open:
+                    hits = [(distance, card) for distance, card in hits if card['is_open']]
+                page = paginator.paginate_list(
+                    [(distance, card['id'], card) for distance, card in hits], request
+                )
+                if self._wants_pins(request):
+                    return paginator.get_paginated_response(
+                        self._pins_data(request, [card_to_pin(card) for card in page])
+                    )
+                data = []
+                for card in page:
+                    self._absolutize_media(request, card)
+                    data.append(card)
+                return paginator.get_paginated_response(data)
+
             stores = LocationService.get_nearby_stores(
                 user_lat=lat,
                 user_lon=lon,
-                radius_km=float(radius),
-                store_type=store_type
+                radius_km=radius,
+                store_type=store_type,
+                only_open=only_open,
             )
-            serializer = self.get_serializer(stores, many=True)
-            return Response(serializer.data)
+            if self._wants_pins(request):
+                page = paginator.paginate_queryset(pin_values(stores, 'distance'), request, view=self)
+                pins = []
+                for row in page:
+                    pin = to_pin(row)
+                    pin['distance'] = round(pin['distance'], 3)
+                    pins.append(pin)
+                return paginator.get_paginated_response(self._pins_data(request, pins))
+
+            page = paginator.paginate_queryset(stores, request, view=self)
+            data = self.get_serializer(page, many=True).data
+            for item, store in zip(data, page):
+                item['distance'] = round(store.distance, 3)
+            return paginator.get_paginated_response(data)
         except ValueError:
             return Response({"error": "Invalid coordinate format."}, status=400)
 
+    # Hard cap on pins per viewport response; a denser viewport is truncated
+    # and the client should zoom in (or re-request at a lower zoom).
+    MAX_VIEWPORT_PINS = 500
+
+    @action(detail=False, methods=['get'])
+    def viewport(self, request):
+        """
+        Stores inside the visible map area.
+
+        ?bbox=min_lon,min_lat,max_lon,max_lat and ?zoom= (web-map zoom level).
+        Below CLUSTER_MAX_ZOOM the response is server-side clusters
+        ({count, latitude, longitude} per occupied grid cell); at or above it,
+        individual pins, capped at MAX_VIEWPORT_PINS. ?open_now=true applies
+        to both.
+        """
+        store_type = request.query_params.get('type')
+        try:
+            bbox = parse_bbox(request.query_params.get('bbox', ''))
+            zoom = int(request.query_params.get('zoom', CLUSTER_MAX_ZOOM))
+        except ValueError:
+            return Response({"error": "bbox (min_lon,min_lat,max_lon,max_lat) and zoom are required."}, status=400)
+
+        stores = LocationService.get_stores_in_box(
+            *bbox, store_type=store_type, only_open=wants_open_now(request)
+        )
+
+        if zoom < CLUSTER_MAX_ZOOM:
+            return Response({
+                "mode": "clusters",
+                "zoom": zoom,
+                "clusters": LocationService.cluster_stores(stores, zoom),
+            })
+
+        rows = list(pin_values(stores)[:self.MAX_VIEWPORT_PINS + 1])
+        truncated = len(rows) > self.MAX_VIEWPORT_PINS
+        pins = [to_pin(row) for row in rows[:self.MAX_VIEWPORT_PINS]]
+        return Response({
+            "mode": "pins",
+            "zoom": zoom,
+            "truncated": truncated,
+            "pins": self._pins_data(request, pins),
+        })
+
+    @staticmethod
+    def _wants_pins(request):
+        return request.query_params.get('view') == 'pins'
+
+    def _pins_data(self, request, pins):
+        """
+        Pins as a list of objects, or with ?layout=columns as parallel arrays
+        ({"id": [...], "name": [...], ...}).
+        """
+        for pin in pins:
+            self._absolutize_media(request, pin)
+        if request.query_params.get('layout') == 'columns':
+            return to_columns(pins)
+        return pins
+
+    @staticmethod
+    def _absolutize_media(request, card):
+        # Index cards are serialized without a request, so media URLs are
+        # relative; make them absolute like the serializer would.
+        for field in ('logo', 'banner'):
+            url = card.get(field)
+            if url and not url.startswith(('http://', 'https://')):
+                card[field] = request.build_absolute_uri(url)
+        return card
+
+
+# ── Storefront Bundle (Public) ───────────────────────────────────────────────
+
+class StorefrontBundleView(LazyAuthenticationMixin, APIView):
+    """
+    GET storefront/<slug>/bundle — store + theme + categories + items (with
+    options/extras) for FOOD, or + products for RETAIL, in one response.
+    Served from a pre-rendered blob per store version, with an ETag.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, slug):
+        found = (
+            with_open_now(Store.objects.filter(slug=slug, is_active=True))
+            .values_list('id', 'open_now').first()
+        )
+        if found is None:
+            return Response({"error": "Store not found."}, status=404)
+        store_id, open_now = found
+
+        def build():
+            return HttpResponse(bundle_bytes(store_id, open_now, request), content_type='application/json')
+
+        return conditional_response(request, store_id, build, open_now)
+
 
 # ── Store Management (Seller-Only) ────────────────────────────────────────────
 
@@ -93,10 +278,16 @@ class StoreManagementViewSet(viewsets.ModelViewSet):
             try:
                 from django.db import connection
                 with connection.cursor() as cursor:
-                    cursor.execute(
-                        'UPDATE "user" SET role = %s WHERE email = %s',
-                        ['SELLER', user.email]
-                    )
+                    if user.better_auth_id:
+                        cursor.execute(
+                            'UPDATE "user" SET role = %s WHERE id = %s',
+                            ['SELLER', user.better_auth_id]
+                        )
+                    else:
+                        cursor.execute(
+                            'UPDATE "user" SET role = %s WHERE email = %s',
+                            ['SELLER', user.email]
+                        )
                     logger.info(f"[StoreManagement] Synced SELLER role to Better Auth table for {user.email}.")
             except Exception as e:
                 logger.error(f"[StoreManagement] Failed to sync role to Better Auth table: {e}")
@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    """
+    Delete change-feed tombstones older than --days and raise each store's
+    floor past them; clients whose version is below the floor get a full
+    snapshot on their next sync. Also drops the log of deleted stores.
+
+    Usage: python manage.py prune_sync_tombstones [--days 90]
+    """
+    help = 'Prune old delta-sync tombstones and the change log of deleted stores.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Keep tombstones newer than this.')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH pruned AS (
+                    DELETE FROM sync_syncchange
+                    WHERE deleted AND changed_at < %s
+                    RETURNING store_id, seq
+                )
+                UPDATE sync_synccounter c SET floor = GREATEST(c.floor, p.seq)
+                FROM (SELECT store_id, max(seq) AS seq FROM pruned GROUP BY store_id) p
+                WHERE c.store_id = p.store_id
+                """,
+                [cutoff],
+            )
+            self.stdout.write(f'Raised the floor of {cursor.rowcount} stores.')
+
+            cursor.execute(
+                "DELETE FROM sync_syncchange ch WHERE NOT EXISTS "
+                "(SELECT 1 FROM stores_store s WHERE s.id = ch.store_id)"
+            )
+            orphans = cursor.rowcount
+            cursor.execute(
+                "DELETE FROM sync_synccounter c WHERE NOT EXISTS "
+                "(SELECT 1 FROM stores_store s WHERE s.id = c.store_id)"
+            )
+        self.stdout.write(self.style.SUCCESS(f'Done; removed {orphans} changes of deleted stores.'))
@@ -0,0 +1,123 @@
+# Generated by Django 4.2.30 on 2026-10-18 08:07
+
+from django.db import migrations, models
+
+
+# Tables whose rows the change feed covers: (kind, table, how the row reaches
+# its store). Options and extras have no store_id and go through their item.
+SYNCED_TABLES = [
+    ('menu_category', 'food_menu_menucategory', None),
+    ('menu_item', 'food_menu_menuitem', None),
+    ('menu_item_option', 'food_menu_menuitemoption', ('food_menu_menuitem', 'menu_item_id')),
+    ('menu_item_extra', 'food_menu_menuitemextra', ('food_menu_menuitem', 'menu_item_id')),
+    ('retail_category', 'retail_catalog_retailcategory', None),
+    ('retail_product', 'retail_catalog_retailproduct', None),
+]
+
+# Statement-level AFTER triggers with transition tables, so every write path
+# (save(), queryset.update(), bulk_create/bulk_update, raw SQL) is logged
+# and a bulk statement costs one counter bump per store, not one per row.
+# The counter upsert holds the store's counter row lock until commit, so a
+# store's seqs become visible in order: seeing seq N means everything up to
+# N is committed.
+SYNC_FUNCTION_SQL = """
+CREATE OR REPLACE FUNCTION sync_log_changes() RETURNS trigger AS $$
+DECLARE
+    changed_sql text;
+BEGIN
+    IF TG_NARGS > 1 THEN
+        changed_sql := format(
+            'SELECT p.store_id, r.id FROM %I r JOIN %I p ON p.id = r.%I',
+            CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END, TG_ARGV[1], TG_ARGV[2]
+        );
+    ELSE
+        changed_sql := format(
+            'SELECT r.store_id, r.id FROM %I r',
+            CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END
+        );
+    END IF;
+
+    EXECUTE format($sql$
+        WITH changed (store_id, object_id) AS (%s),
+        bumped AS (
+            INSERT INTO sync_synccounter AS c (store_id, seq, floor)
+            SELECT DISTINCT store_id, 1, 0 FROM changed
+            ON CONFLICT (store_id) DO UPDATE SET seq = c.seq + 1
+            RETURNING c.store_id, c.seq
+        )
+        INSERT INTO sync_syncchange (store_id, seq, kind, object_id, deleted, changed_at)
+        SELECT ch.store_id, b.seq, %L, ch.object_id, %L, now()
+        FROM changed ch JOIN bumped b ON b.store_id = ch.store_id
+        ON CONFLICT (store_id, kind, object_id) DO UPDATE
+            SET seq = EXCLUDED.seq, deleted = EXCLUDED.deleted, changed_at = EXCLUDED.changed_at
+    $sql$, changed_sql, TG_ARGV[0], TG_OP = 'DELETE');
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+def _trigger_sql(kind, table, parent):
+    args = f"'{kind}'" + (f", '{parent[0]}', '{parent[1]}'" if parent else '')
+    return "\n".join(
+        f"CREATE TRIGGER {table}_sync_{event.lower()} AFTER {event} ON {table} "
+        f"REFERENCING {transition} TABLE AS {alias} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION sync_log_changes({args});"
+        for event, transition, alias in (
+            ('INSERT', 'NEW', 'new_rows'), ('UPDATE', 'NEW', 'new_rows'), ('DELETE', 'OLD', 'old_rows'),
+        )
+    )
+
+
+def _drop_trigger_sql(table):
+    return "\n".join(
+        f"DROP TRIGGER IF EXISTS {table}_sync_{event} ON {table};" for event in ('insert', 'update', 'delete')
+    )
+
+
+CREATE_SYNC_SQL = SYNC_FUNCTION_SQL + "\n".join(_trigger_sql(*spec) for spec in SYNCED_TABLES)
+
+DROP_SYNC_SQL = "\n".join(_drop_trigger_sql(table) for _, table, _ in SYNCED_TABLES) + """
+DROP FUNCTION IF EXISTS sync_log_changes();
+"""
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('food_menu', '0008_keyset_indexes'),
+        ('retail_catalog', '0008_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncCounter',
+            fields=[
+                ('store_id', models.UUIDField(primary_key=True, serialize=False)),
+                ('seq', models.BigIntegerField(default=0)),
+                ('floor', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('store_id', models.UUIDField()),
+                ('seq', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('menu_category', 'Menu category'), ('menu_item', 'Menu item'), ('menu_item_option', 'Menu item option'), ('menu_item_extra', 'Menu item extra'), ('retail_category', 'Retail category'), ('retail_product', 'Retail product')], max_length=20)),
+                ('object_id', models.UUIDField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['store_id', 'seq'], name='sync_change_store_seq_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='syncchange',
+            constraint=models.UniqueConstraint(fields=('store_id', 'kind', 'object_id'), name='sync_change_object_uniq'),
+        ),
+        migrations.RunSQL(CREATE_SYNC_SQL, DROP_SYNC_SQL),
+    ]
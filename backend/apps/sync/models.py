@@ -0,0 +1,55 @@
+from django.db import models
+
+
+class SyncCounter(models.Model):
+    """
+    A store's catalog change counter. `seq` advances once per write
+    statement that touches the store's menu or catalog; `floor` is the
+    highest seq whose tombstones may have been pruned.
+
+    Rows are written only by the sync_log_changes() trigger (migration 0001),
+    whose row lock on the counter orders a store's changes by commit.
+    """
+    # No foreign keys: the trigger writes here while Django is deleting a
+    # store's rows, after its delete collector has run.
+    store_id = models.UUIDField(primary_key=True)
+    seq = models.BigIntegerField(default=0)
+    floor = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.store_id} @ {self.seq}"
+
+
+class SyncChange(models.Model):
+    """
+    Latest change of one menu/catalog row: one row per object, moved to the
+    store's current seq on every insert, update or delete (`deleted` marks a
+    tombstone). Written only by the sync_log_changes() trigger.
+    """
+    KIND_CHOICES = (
+        ('menu_category', 'Menu category'),
+        ('menu_item', 'Menu item'),
+        ('menu_item_option', 'Menu item option'),
+        ('menu_item_extra', 'Menu item extra'),
+        ('retail_category', 'Retail category'),
+        ('retail_product', 'Retail product'),
+    )
+
+    store_id = models.UUIDField()
+    seq = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['store_id', 'kind', 'object_id'], name='sync_change_object_uniq'),
+        ]
+        indexes = [
+            # The feed: a store's changes after a given seq.
+            models.Index(fields=['store_id', 'seq'], name='sync_change_store_seq_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} @ {self.seq}{' (deleted)' if self.deleted else ''}"
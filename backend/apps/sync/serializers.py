@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from apps.food_menu.models import MenuItem
+from apps.food_menu.serializers import MenuItemExtraSerializer, MenuItemOptionSerializer
+from apps.retail_catalog.models import RetailProduct
+
+# Flat rows: options and extras travel on their own and point at their item,
+# so a changed option doesn't resend the item (and vice versa).
+
+
+class MenuItemSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = MenuItem
+        fields = [
+            'id', 'category', 'name', 'description', 'price', 'image',
+            'preparation_time_minutes', 'is_vegetarian', 'is_vegan', 'is_spicy', 'is_available',
+        ]
+
+
+class MenuItemOptionSyncSerializer(MenuItemOptionSerializer):
+    class Meta(MenuItemOptionSerializer.Meta):
+        fields = MenuItemOptionSerializer.Meta.fields + ['menu_item']
+
+
+class MenuItemExtraSyncSerializer(MenuItemExtraSerializer):
+    class Meta(MenuItemExtraSerializer.Meta):
+        fields = MenuItemExtraSerializer.Meta.fields + ['menu_item']
+
+
+class RetailProductSyncSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RetailProduct
+        fields = [
+            'id', 'category', 'name', 'description', 'price', 'image', 'sku', 'stock_quantity', 'is_active',
+        ]
+
@@ -0,0 +1,103 @@
+"""
+Delta sync of a store's menu or catalog (GET /api/sync/<store_id>/changes).
+
+Database triggers (migration 0001) keep one SyncChange row per menu /
+catalog object, stamped with the store's change counter at its latest
+insert, update or delete. A client that last synced at version N asks for
+`since=N` and receives just the rows whose stamp is above N, plus
+tombstones (ids) for deleted ones, then remembers the returned `version`.
+
+A full snapshot (`reset: true`) is sent when the client has no version yet
+(or 0: rows from before the log existed were never logged), when its
+version predates pruned tombstones (see prune_sync_tombstones), or when it
+is ahead of the server (database restored). The client then replaces its
+copy instead of merging.
+
+Clients apply the upserts first and the deletions second. Items that are
+unavailable or inactive are left out of snapshots but are sent in deltas,
+flagged, so the client can drop them. A delta that sends an item also sends
+all of its options and extras, so an item switched back on arrives complete
+even though its options and extras themselves did not change.
+"""
+from collections import defaultdict
+
+from django.db.models import Q
+
+from apps.food_menu.models import MenuCategory, MenuItem, MenuItemExtra, MenuItemOption
+from apps.food_menu.serializers import MenuCategorySerializer
+from apps.retail_catalog.models import RetailCategory, RetailProduct
+from apps.retail_catalog.serializers import RetailCategorySerializer
+from .models import SyncChange, SyncCounter
+from .serializers import (
+    MenuItemExtraSyncSerializer, MenuItemOptionSyncSerializer, MenuItemSyncSerializer,
+    RetailProductSyncSerializer,
+)
+
+# Per store type: (response key, change kind, store's rows, snapshot filter,
+# serializer, parent: a kind whose changed rows also send their children here).
+FEEDS = {
+    'FOOD': (
+        ('menu_categories', 'menu_category',
+         lambda store: MenuCategory.objects.filter(store=store).order_by('order'), {}, MenuCategorySerializer, None),
+        ('menu_items', 'menu_item',
+         lambda store: MenuItem.objects.filter(store=store).order_by('created_at', 'id'),
+         {'is_available': True}, MenuItemSyncSerializer, None),
+        ('options', 'menu_item_option',
+         lambda store: MenuItemOption.objects.filter(menu_item__store=store),
+         {'menu_item__is_available': True}, MenuItemOptionSyncSerializer, 'menu_item'),
+        ('extras', 'menu_item_extra',
+         lambda store: MenuItemExtra.objects.filter(menu_item__store=store),
+         {'menu_item__is_available': True}, MenuItemExtraSyncSerializer, 'menu_item'),
+    ),
+    'RETAIL': (
+        ('categories', 'retail_category',
+         lambda store: RetailCategory.objects.filter(store=store).order_by('name'), {}, RetailCategorySerializer, None),
+        ('products', 'retail_product',
+         lambda store: RetailProduct.objects.filter(store=store).order_by('created_at', 'id'),
+         {'is_active': True}, RetailProductSyncSerializer, None),
+    ),
+}
+
+
+def current_version(store_id):
+    """(version, floor) of the store's change counter; (0, 0) before any change."""
+    return SyncCounter.objects.filter(store_id=store_id).values_list('seq', 'floor').first() or (0, 0)
+
+
+def changes_since(store, since, context=None):
+    """
+    The store's rows changed after version `since` (None for a snapshot):
+    {version, reset, <group>: [rows], deleted: {<group>: [ids]}}.
+    `since` None or 0 asks for a snapshot.
+    """
+    # Read the counter before the rows: anything committed in between is
+    # sent now and again next time, never skipped.
+    version, floor = current_version(store.pk)
+    reset = not since or since < floor or since > version
+    feeds = FEEDS.get(store.store_type, ())
+    data = {'version': version, 'reset': reset}
+    data.update({key: [] for key, *_ in feeds})
+    data['deleted'] = {}
+    if not reset and since == version:
+        return data
+
+    changes = None if reset else SyncChange.objects.filter(store_id=store.pk, seq__gt=since)
+    for key, kind, rows, snapshot_filter, serializer_class, parent in feeds:
+        queryset = rows(store)
+        if reset:
+            queryset = queryset.filter(**snapshot_filter)
+        else:
+            changed = Q(pk__in=changes.filter(kind=kind, deleted=False).values('object_id'))
+            if parent:
+                changed |= Q(**{f'{parent}__in': changes.filter(kind=parent, deleted=False).values('object_id')})
+            queryset = queryset.filter(changed)
+        data[key] = serializer_class(queryset, many=True, context=context).data
+
+    if not reset:
+        keys = {kind: key for key, kind, *_ in feeds}
+        deleted = defaultdict(list)
+        for kind, object_id in changes.filter(deleted=True).values_list('kind', 'object_id'):
+            if kind in keys:
+                deleted[keys[kind]].append(str(object_id))
+        data['deleted'] = dict(deleted)
+    return data
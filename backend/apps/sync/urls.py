@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import StoreChangesView
+
+urlpatterns = [
+    path('<uuid:store_id>/changes', StoreChangesView.as_view(), name='store-changes'),
+]
@@ -0,0 +1,38 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.stores.models import Store
+from core.mixins import LazyAuthenticationMixin
+from core.versioning import conditional_response
+from .services import changes_since, current_version
+
+
+class StoreChangesView(LazyAuthenticationMixin, APIView):
+    """
+    GET /api/sync/<store_id>/changes?since=<version>
+
+    The store's menu (FOOD) or catalog (RETAIL) rows changed since the
+    client's last `version`, with tombstones for deletions; without ?since=
+    a full snapshot. See services.py for the protocol.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, store_id):
+        since = request.query_params.get('since')
+        try:
+            since = int(since) if since not in (None, '') else None
+        except ValueError:
+            return Response({"error": "since must be a version number."}, status=400)
+        if since is not None and since < 0:
+            return Response({"error": "since must be a version number."}, status=400)
+
+        def build():
+            store = get_object_or_404(Store.objects.only('id', 'store_type'), pk=store_id, is_active=True)
+            return Response(changes_since(store, since, {'request': request}))
+
+        # The store version misses writes that skip signals (queryset.update(),
+        # raw SQL); the trigger-maintained seq sees every one of them.
+        seq, _ = current_version(store_id)
+        return conditional_response(request, store_id, build, seq)
@@ -32,6 +32,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-Party Apps
     'rest_framework',
@@ -46,6 +47,9 @@ INSTALLED_APPS = [
     'apps.food_orders',
     'apps.payments',
     'apps.delivery',
+    'apps.search',
+    'apps.sync',
+    'apps.carts',
 ]
 
 # Order matters here! CORS must be at the top. Subdomain middleware should be near the end.
@@ -138,12 +142,23 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ── Redis Cache Backend ────────────────────────────────────────────────────────
 # Uses Redis DB 1 (separate from Celery which typically uses DB 0)
 # Cache timeout: 5 minutes for most data; overridden per-view where needed.
+# core.cache.TwoTierCache keeps hot keys (store cards, menus, bundles, store
+# versions) in a small per-worker LRU as well, invalidated over Redis pub/sub.
+TWO_TIER_CACHE_OPTIONS = {
+    'LOCAL_MAX_ENTRIES': int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', 2048)),
+    'LOCAL_TTL': int(os.environ.get('CACHE_LOCAL_TTL', 30)),
+    # 'ba_session:': resolved Better Auth sessions (apps/accounts/session_cache.py).
+    'LOCAL_PREFIXES': ['store:', 'store_version:', 'ba_session:'],
+    'INVALIDATION_CHANNEL': 'storeville:cache:invalidate',
+}
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'BACKEND': 'core.cache.TwoTierCache',
         'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/1'),
         'TIMEOUT': 300,  # 5 minutes global default
         'KEY_PREFIX': 'storeville',
+        'OPTIONS': TWO_TIER_CACHE_OPTIONS,
     }
 }
 
@@ -209,9 +224,41 @@ REST_FRAMEWORK = {
     },
 }
 
+# ── Store discovery engine ────────────────────────────────────────────────────
+# 'db'     → nearby queries hit Postgres (grid-cell index + Haversine).
+# 'memory' → each worker answers nearby from an in-process spatial index of
+#            active stores, updated store by store from a change log in Redis
+#            written by Store/StoreTheme signals. Needs a shared (Redis) cache.
+# 'tiles'  → nearby is assembled from per-map-tile store lists cached in Redis
+#            (apps/stores/tiles.py); only tiles touched by a Store/StoreTheme
+#            change are invalidated.
+STORE_DISCOVERY_ENGINE = os.environ.get('STORE_DISCOVERY_ENGINE', 'db')
+
+# ── Store content versions ────────────────────────────────────────────────────
+# Per-store version stamps (core/versioning.py) drive ETag / Last-Modified on
+# storefront reads. They must live in a cache shared by every worker.
+STORE_CONTENT_VERSIONS_ENABLED = True
+
 # better-auth server URL (the Next.js frontend)
 BETTER_AUTH_URL = os.environ.get('BETTER_AUTH_URL', 'http://frontend:3000')
 
+# ── Better Auth session cache ─────────────────────────────────────────────────
+# Resolved session → Django user mappings are cached in Redis (keyed by a hash
+# of the token) until the session's expiresAt or this max TTL, whichever is
+# sooner. Workers also keep them in the two-tier cache's local LRU, which is
+# invalidated in every worker on logout or role change.
+BETTER_AUTH_SESSION_CACHE_TTL = int(os.environ.get('BETTER_AUTH_SESSION_CACHE_TTL', 300))
+# Per-process LRU of rejected tokens in front of Redis.
+BETTER_AUTH_SESSION_LRU_SIZE = int(os.environ.get('BETTER_AUTH_SESSION_LRU_SIZE', 1024))  # 0 disables
+# Tokens that failed the session lookup are rejected from cache for this long.
+BETTER_AUTH_NEGATIVE_CACHE_TTL = int(os.environ.get('BETTER_AUTH_NEGATIVE_CACHE_TTL', 60))
+
+# Shared with the Next.js auth server. Used to verify the HMAC suffix on
+# session cookies locally, before any DB access. MUST match the frontend's
+# BETTER_AUTH_SECRET; verification is skipped when it is unset.
+BETTER_AUTH_SECRET = os.environ.get('BETTER_AUTH_SECRET', '')
+BETTER_AUTH_VERIFY_SIGNATURE = bool(BETTER_AUTH_SECRET) and os.environ.get('BETTER_AUTH_VERIFY_SIGNATURE', 'True') == 'True'
+
 
 # ==============================================================================
 # UNFOLD ADMIN DASHBOARD SETTINGS
@@ -1,3 +1,4 @@
+import logging
 import os
 import dj_database_url
 from .base import *
@@ -18,19 +19,28 @@ _REDIS_URL = os.environ.get('REDIS_URL')
 if _REDIS_URL:
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'BACKEND': 'core.cache.TwoTierCache',
             'LOCATION': _REDIS_URL,
             'TIMEOUT': 300,
             'KEY_PREFIX': 'storeville',
+            'OPTIONS': TWO_TIER_CACHE_OPTIONS,
         }
     }
 else:
+    # Not silent: every worker then has its own cache, so say so at startup.
+    logging.getLogger(__name__).warning(
+        "REDIS_URL is not set: using per-process LocMemCache. Workers will not "
+        "share cached data or invalidations; store content versions are disabled."
+    )
     CACHES = {
         'default': {
             'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
             'LOCATION': 'storeville-cache',
         }
     }
+    # A per-process cache can't carry store versions between workers: one
+    # worker would keep answering 304 after another saw a change.
+    STORE_CONTENT_VERSIONS_ENABLED = False
 
 
 # Configure allowed hosts for deployment
@@ -2,11 +2,16 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from django.core.cache import cache
 from django.http import JsonResponse
 
 def health_check(request):
     """Simple endpoint to verify the server is running."""
-    return JsonResponse({"status": "healthy", "service": "StoreVille API"})
+    payload = {"status": "healthy", "service": "StoreVille API"}
+    # Per-tier hit/miss counters of this worker's two-tier cache, if in use.
+    if hasattr(cache, 'stats'):
+        payload["cache"] = cache.stats()
+    return JsonResponse(payload)
 
 urlpatterns = [
     # System Admin
@@ -22,6 +27,8 @@ urlpatterns = [
     path('api/food/', include('apps.food_menu.urls')),
     path('api/orders/retail/', include('apps.retail_orders.urls')),
     path('api/orders/food/', include('apps.food_orders.urls')),
+    path('api/search/', include('apps.search.urls')),
+    path('api/sync/', include('apps.sync.urls')),
     # path('api/payments/', include('apps.payments.urls')),
     # path('api/delivery/', include('apps.delivery.urls')),
 ]
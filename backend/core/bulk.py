@@ -0,0 +1,63 @@
+"""
+Set-based updates of many rows of one store.
+
+update_store_rows() applies a list of per-row changes in a single statement:
+
+    UPDATE table AS t
+       SET price = COALESCE(v.price, t.price), ..., updated_at = now
+      FROM (VALUES (id, price, ...), ...) AS v (id, price, ...)
+     WHERE t.id = v.id AND t.store_id = <store>
+ RETURNING t.id
+
+Each change sets any subset of the fields; the ones it leaves out arrive as
+NULL and keep their current value, so the fields must be NOT NULL columns.
+The store_id condition keeps ids from other stores from being touched.
+
+Like bulk_update(), this skips save() and signals: callers bump the
+store's content version themselves.
+"""
+from django.db import connection
+from django.utils import timezone
+
+# Upper bound on changes per request / statement.
+MAX_CHANGES = 1000
+
+
+def update_store_rows(model, store_id, changes, fields):
+    """
+    Apply `changes` (dicts with 'id' plus any of `fields`) to the store's
+    rows of `model`. Returns the set of ids that were updated; ids not in
+    the store are skipped.
+    """
+    if not changes:
+        return set()
+    qn = connection.ops.quote_name
+    opts = model._meta
+    table = qn(opts.db_table)
+    columns = [opts.pk] + [opts.get_field(name) for name in fields]
+
+    # Typed placeholders: VALUES rows are otherwise untyped text/unknown.
+    row_sql = '(' + ', '.join(f'%s::{field.db_type(connection)}' for field in columns) + ')'
+    params = [timezone.now()]
+    for change in changes:
+        params.append(columns[0].get_db_prep_value(change['id'], connection))
+        for field in columns[1:]:
+            value = change.get(field.name)
+            params.append(None if value is None else field.get_db_prep_value(value, connection))
+    params.append(store_id)
+
+    assignments = ', '.join(
+        f'{qn(field.column)} = COALESCE(v.{qn(field.column)}, t.{qn(field.column)})'
+        for field in columns[1:]
+    )
+    sql = (
+        f"UPDATE {table} AS t SET {assignments}, {qn(opts.get_field('updated_at').column)} = %s "
+        f"FROM (VALUES {', '.join([row_sql] * len(changes))}) "
+        f"AS v ({', '.join(qn(field.column) for field in columns)}) "
+        f"WHERE t.{qn(opts.pk.column)} = v.{qn(opts.pk.column)} "
+        f"AND t.{qn(opts.get_field('store').column)} = %s "
+        f"RETURNING t.{qn(opts.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {opts.pk.to_python(row[0]) for row in cursor.fetchall()}
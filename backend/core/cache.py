@@ -0,0 +1,354 @@
+"""
+Two-tier cache backend: a bounded per-process LRU in front of Redis.
+
+Keys whose name starts with one of LOCAL_PREFIXES (hot, read-mostly data:
+store cards, menus, bundles, store versions) are also kept in a small
+in-process LRU, so repeated reads skip the Redis round-trip. Every write or
+delete of such a key publishes the key on a Redis pub/sub channel; a
+background thread in each worker drops its local copy as soon as the message
+arrives. While that subscription is down the local tier is bypassed, so a
+worker never serves local data it can't hear invalidations for.
+
+Django builds a cache backend per thread, so the LRU, the counters and the
+listener live in one object per process (per Redis location and channel)
+that every thread's backend shares: one listener thread and one pub/sub
+connection per worker, however many threads serve requests.
+
+Every invalidation also advances a generation counter. A value read from
+Redis is only kept locally if no invalidation arrived while it was being
+read; otherwise a stale read could outlive the message that should have
+dropped it.
+
+Local entries are stored pickled, so callers get a fresh copy on every hit
+exactly as with Redis. Their lifetime is capped by LOCAL_TTL as a backstop.
+
+Configure in CACHES:
+
+    'BACKEND': 'core.cache.TwoTierCache',
+    'OPTIONS': {
+        'LOCAL_MAX_ENTRIES': 2048,
+        'LOCAL_TTL': 30,
+        'LOCAL_PREFIXES': ['store:', 'store_version:'],
+    },
+
+Per-tier hit/miss counters for this process are available from stats().
+redis_client() gives raw access to the Redis behind a cache alias, for
+callers that need commands the cache API lacks (hashes, sets, Lua).
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.redis import RedisCache
+
+logger = logging.getLogger(__name__)
+
+_CLEAR_ALL = '*'
+
+
+def redis_client(alias='default'):
+    """
+    The redis-py client behind a cache alias, or None if it isn't a Redis
+    cache. Resolve through `caches`: `django.core.cache.cache` is a proxy,
+    never an instance of the backend class. Keys must be built with the
+    alias's make_key() to share its namespace.
+    """
+    backend = caches[alias]
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
+
+
+class _LocalTier:
+    """
+    Thread-safe LRU of pickled values with per-entry expiry.
+
+    `generation` advances on every invalidation; set_if() stores a value
+    only if it hasn't moved since the caller started reading.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.generation = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            blob, expires = item
+            if expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return blob
+
+    def set_if(self, key, blob, ttl, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (blob, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class _ProcessTier:
+    """
+    The local tier, its counters and its invalidation listener for one
+    worker process, shared by every thread's TwoTierCache.
+    """
+
+    def __init__(self, max_entries, channel):
+        self.local = _LocalTier(max_entries)
+        self.channel = channel
+        self.subscribed = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = dict.fromkeys(('local_hits', 'local_misses', 'redis_hits', 'redis_misses'), 0)
+
+    def count(self, name, n=1):
+        with self._stats_lock:
+            self._stats[name] += n
+
+    def stats(self):
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def start(self, client_factory):
+        thread = threading.Thread(
+            target=self._listen, args=(client_factory,), name='cache-invalidation', daemon=True,
+        )
+        thread.start()
+
+    def _listen(self, client_factory):
+        backoff = 0.5
+        while True:
+            pubsub = None
+            try:
+                pubsub = client_factory().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Anything cached before we could hear invalidations is suspect.
+                self.local.clear()
+                self.subscribed.set()
+                backoff = 0.5
+                for message in pubsub.listen():
+                    if message.get('type') != 'message':
+                        continue
+                    key = message['data']
+                    if isinstance(key, bytes):
+                        key = key.decode()
+                    if key == _CLEAR_ALL:
+                        self.local.clear()
+                    else:
+                        self.local.delete(key)
+            except Exception as e:
+                logger.warning(f"[TwoTierCache] Invalidation listener error: {e}")
+            finally:
+                self.subscribed.clear()
+                self.local.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 30)
+
+
+# One _ProcessTier per (pid, location, channel). Keyed by pid because
+# gunicorn forks workers after import: a child must not reuse the parent's
+# entry, whose listener thread didn't survive the fork.
+_process_tiers = {}
+_process_tiers_lock = threading.Lock()
+
+
+class TwoTierCache(RedisCache):
+    def __init__(self, server, params):
+        params = dict(params)
+        options = dict(params.get('OPTIONS') or {})
+        self._local_max_entries = int(options.pop('LOCAL_MAX_ENTRIES', 2048))
+        self._local_ttl = float(options.pop('LOCAL_TTL', 30))
+        self._local_prefixes = tuple(options.pop('LOCAL_PREFIXES', ('store:', 'store_version:')))
+        self._channel = options.pop('INVALIDATION_CHANNEL', 'cache:invalidate')
+        params['OPTIONS'] = options
+        super().__init__(server, params)
+        self._location = server
+
+    # ── Local tier plumbing ────────────────────────────────────────────────
+
+    @property
+    def _tier(self):
+        key = (os.getpid(), str(self._location), self._channel)
+        tier = _process_tiers.get(key)
+        if tier is None:
+            with _process_tiers_lock:
+                tier = _process_tiers.get(key)
+                if tier is None:
+                    tier = _process_tiers[key] = _ProcessTier(self._local_max_entries, self._channel)
+                    tier.start(self._cache.get_client)
+        return tier
+
+    @property
+    def _local(self):
+        return self._tier.local
+
+    def _is_local(self, key):
+        return bool(self._local_prefixes) and key.startswith(self._local_prefixes)
+
+    def _local_enabled(self):
+        return self._tier.subscribed.is_set()
+
+    def _count(self, name, n=1):
+        self._tier.count(name, n)
+
+    def _local_ttl_for(self, timeout):
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return self._local_ttl
+        return min(self._local_ttl, timeout)
+
+    def _remember(self, full_key, value, generation, timeout=DEFAULT_TIMEOUT):
+        ttl = self._local_ttl_for(timeout)
+        if ttl > 0:
+            self._local.set_if(full_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), ttl, generation)
+
+    def _invalidate(self, full_keys):
+        """Drop local copies here and broadcast so every other worker does too."""
+        for full_key in full_keys:
+            self._local.delete(full_key)
+        if not full_keys:
+            return
+        try:
+            client = self._cache.get_client(write=True)
+            for full_key in full_keys:
+                client.publish(self._channel, full_key)
+        except Exception as e:
+            # Other workers' copies still expire after LOCAL_TTL.
+            logger.warning(f"[TwoTierCache] Invalidation publish failed: {e}")
+
+    # ── Reads ──────────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        local = self._is_local(key) and self._local_enabled()
+        if local:
+            generation = self._local.generation
+            blob = self._local.get(full_key)
+            if blob is not None:
+                self._count('local_hits')
+                return pickle.loads(blob)
+            self._count('local_misses')
+
+        missing = object()
+        value = self._cache.get(full_key, missing)
+        if value is missing:
+            self._count('redis_misses')
+            return default
+        self._count('redis_hits')
+        if local:
+            self._remember(full_key, value, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        result = {}
+        remote = {}
+        generation = self._local.generation
+        for key in keys:
+            full_key = self.make_and_validate_key(key, version=version)
+            if self._is_local(key) and self._local_enabled():
+                blob = self._local.get(full_key)
+                if blob is not None:
+                    self._count('local_hits')
+                    result[key] = pickle.loads(blob)
+                    continue
+                self._count('local_misses')
+            remote[full_key] = key
+
+        if remote:
+            found = self._cache.get_many(list(remote))
+            self._count('redis_hits', len(found))
+            self._count('redis_misses', len(remote) - len(found))
+            for full_key, value in found.items():
+                key = remote[full_key]
+                result[key] = value
+                if self._is_local(key) and self._local_enabled():
+                    self._remember(full_key, value, generation)
+        return result
+
+    # ── Writes (go to Redis, then invalidate local copies everywhere) ──────
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        super().set(key, value, timeout=timeout, version=version)
+        if self._is_local(key):
+            self._invalidate([self.make_and_validate_key(key, version=version)])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = super().add(key, value, timeout=timeout, version=version)
+        if added and self._is_local(key):
+            self._invalidate([self.make_and_validate_key(key, version=version)])
+        return added
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = super().set_many(data, timeout=timeout, version=version)
+        self._invalidate([
+            self.make_and_validate_key(key, version=version) for key in data if self._is_local(key)
+        ])
+        return failed
+
+    def delete(self, key, version=None):
+        deleted = super().delete(key, version=version)
+        if self._is_local(key):
+            self._invalidate([self.make_and_validate_key(key, version=version)])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        super().delete_many(keys, version=version)
+        self._invalidate([
+            self.make_and_validate_key(key, version=version) for key in keys if self._is_local(key)
+        ])
+
+    def incr(self, key, delta=1, version=None):
+        value = super().incr(key, delta=delta, version=version)
+        if self._is_local(key):
+            self._invalidate([self.make_and_validate_key(key, version=version)])
+        return value
+
+    def clear(self):
+        result = super().clear()
+        self._local.clear()
+        try:
+            self._cache.get_client(write=True).publish(self._channel, _CLEAR_ALL)
+        except Exception as e:
+            logger.warning(f"[TwoTierCache] Invalidation publish failed: {e}")
+        return result
+
+    # ── Introspection ──────────────────────────────────────────────────────
+
+    def stats(self):
+        """Hit/miss counters per tier for this worker process."""
+        tier = self._tier
+        stats = tier.stats()
+        stats['local_entries'] = len(tier.local)
+        stats['local_subscribed'] = tier.subscribed.is_set()
+        return stats
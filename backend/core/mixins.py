@@ -0,0 +1,121 @@
+import uuid
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.shortcuts import get_object_or_404
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotAuthenticated, ValidationError
+from rest_framework.response import Response
+
+from apps.stores.models import Store
+from .bulk import MAX_CHANGES, update_store_rows
+from .versioning import (
+    bump_store_version_on_commit, cached_for_store, conditional_response,
+)
+
+
+class LazyAuthenticationMixin:
+    """
+    Defer DRF authentication until request.user is actually read.
+
+    APIView.initial() normally authenticates eagerly, which runs the Better
+    Auth session lookup even for AllowAny endpoints that never look at the
+    user. With this mixin, authentication only happens when a permission
+    class, get_queryset() or the view itself touches request.user.
+
+    The default anon/user throttles still apply unchanged. They read
+    request.user, but for requests without a session cookie that resolves
+    to AnonymousUser without any lookup, and signed-in users hit the
+    session cache (apps/accounts/session_cache.py).
+    """
+
+    def perform_authentication(self, request):
+        pass
+
+
+class StoreCachedListMixin:
+    """
+    Cache storefront list reads (?store_id=) in the store's versioned cache
+    namespace and serve them with an ETag (see core/versioning.py).
+
+    The cached value is the serialized response data, keyed by the absolute
+    request URL (pagination links are absolute). Any write to the store's
+    catalog bumps its version, so sellers see changes on the next request.
+    """
+    store_cache_timeout = 60 * 60
+
+    def list(self, request, *args, **kwargs):
+        list_response = super().list
+        try:
+            store_id = uuid.UUID(request.query_params.get('store_id') or '')
+        except ValueError:
+            store_id = None
+        if store_id is None:
+            return list_response(request, *args, **kwargs)
+
+        def build():
+            data = cached_for_store(
+                store_id,
+                self.__class__.__name__,
+                (request.build_absolute_uri(),),
+                lambda: list_response(request, *args, **kwargs).data,
+                timeout=self.store_cache_timeout,
+            )
+            return Response(data)
+
+        return conditional_response(request, store_id, build)
+
+
+class OwnedStoreMixin:
+    """get_owned_store(): the ?store_id= (or body store_id) store of the requesting seller."""
+
+    def get_owned_store(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        store_id = request.query_params.get('store_id') or request.data.get('store_id')
+        if not store_id:
+            raise ValidationError({'store_id': 'This field is required.'})
+        try:
+            return get_object_or_404(Store, id=store_id, owner=request.user)
+        except DjangoValidationError:
+            raise ValidationError({'store_id': 'Must be a valid UUID.'})
+
+
+class BulkStoreUpdateMixin(OwnedStoreMixin):
+    """
+    PATCH <list url>/bulk/?store_id=  with {"changes": [{"id": ..., "price": ...}, ...]}
+
+    Applies many per-row changes to the seller's store in one UPDATE
+    statement (core/bulk.py) instead of one fetch, permission check and save
+    per row, then bumps the store's content version once. Each change is
+    validated by `bulk_change_serializer_class`, whose optional fields are
+    the updatable columns.
+
+    Responds with {"updated": n, "not_found": [ids not in this store]}.
+    """
+    bulk_change_serializer_class = None
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_update(self, request):
+        store = self.get_owned_store(request)
+        changes = request.data.get('changes')
+        if not isinstance(changes, list) or not changes:
+            raise ValidationError({'changes': 'Expected a non-empty list of changes.'})
+        if len(changes) > MAX_CHANGES:
+            raise ValidationError({'changes': f'At most {MAX_CHANGES} changes per request.'})
+
+        serializer = self.bulk_change_serializer_class(data=changes, many=True)
+        serializer.is_valid(raise_exception=True)
+        changes = serializer.validated_data
+        ids = [change['id'] for change in changes]
+        if len(set(ids)) != len(ids):
+            raise ValidationError({'changes': 'Each id may appear only once.'})
+
+        fields = [name for name in serializer.child.fields if name != 'id']
+        model = self.get_queryset().model
+        updated = update_store_rows(model, store.id, changes, fields)
+        if updated:
+            bump_store_version_on_commit(store.id)
+        return Response({
+            "updated": len(updated),
+            "not_found": [str(pk) for pk in ids if pk not in updated],
+        })
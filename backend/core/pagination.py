@@ -0,0 +1,197 @@
+import base64
+import uuid
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Shared plumbing for keyset ("seek") pagination: the cursor encodes the
+    sort key of the last row on the page, and the next page is the rows
+    after it. Every page is a bounded, index-friendly query — no OFFSET, no
+    COUNT(*) — so page 1000 costs the same as page 1.
+
+    Page size comes from ?limit= and is capped at max_page_size. Responses
+    are {"next": <url or null>, "results": [...]}.
+
+    Subclasses implement parse_cursor(key, pk), row_key(row) and, for keys
+    whose str() doesn't round-trip, format_key(key).
+    """
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            parts = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('ascii').split('|', 1)
+            return self.parse_cursor(*parts)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, key, pk):
+        raw = f'{self.format_key(key)}|{pk}'.encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def format_key(self, key):
+        return str(key)
+
+    def parse_cursor(self, key, pk):
+        raise NotImplementedError
+
+    def row_key(self, row):
+        raise NotImplementedError
+
+    def _finish(self, request, rows, page_size):
+        # rows holds up to page_size + 1 items; the extra one only tells us
+        # whether there is a next page.
+        self.request = request
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.last = self.row_key(page[-1]) if page else None
+        return page
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(*self.last))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class CreatedAtCursorPagination(KeysetPagination):
+    """
+    Keyset pagination over (created_at, id), for list endpoints.
+
+    Newest first by default; a view sets `cursor_ordering = 'created_at'`
+    for oldest first. The paginator applies the ordering itself, so the
+    view's own order_by() is replaced. Each model paged this way has a
+    composite index ending in (created_at, id) behind its usual filter.
+
+    Works on querysets of models or .values() rows that include
+    'created_at' and 'id'.
+    """
+    page_size = 20
+    ordering = '-created_at'
+
+    def format_key(self, key):
+        return key.isoformat()
+
+    def parse_cursor(self, created_at, pk):
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError('created_at')
+        return created_at, uuid.UUID(pk)
+
+    def row_key(self, row):
+        if isinstance(row, dict):
+            return row['created_at'], row['id']
+        return row.created_at, row.pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        descending = getattr(view, 'cursor_ordering', self.ordering).startswith('-')
+
+        if descending:
+            queryset = queryset.order_by('-created_at', '-pk')
+        else:
+            queryset = queryset.order_by('created_at', 'pk')
+        if cursor is not None:
+            created_at, pk = cursor
+            # The redundant created_at bound gives Postgres an index range;
+            # the OR then only breaks ties within one timestamp.
+            if descending:
+                queryset = queryset.filter(
+                    Q(created_at__lte=created_at),
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk),
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__gte=created_at),
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk),
+                )
+        return self._finish(request, list(queryset[:page_size + 1]), page_size)
+
+
+class DistanceCursorPagination(KeysetPagination):
+    """
+    Keyset pagination over results ordered by (distance, id).
+
+    The cursor is the (distance, id) of the last row on the page, so a dense
+    area can never produce an unbounded response.
+
+    Works on an annotated queryset of models or .values() rows
+    (paginate_queryset), or on an in-memory list of (distance, id, item)
+    tuples already sorted by distance (paginate_list). Both must be ordered
+    by (distance, id).
+    """
+
+    def format_key(self, key):
+        return repr(key)
+
+    def parse_cursor(self, distance, pk):
+        return float(distance), pk
+
+    def row_key(self, row):
+        # Model instances, dicts from .values() (which must include 'id'), or
+        # paginate_list() tuples.
+        if isinstance(row, tuple):
+            return row[0], row[1]
+        if isinstance(row, dict):
+            return row['distance'], row['id']
+        return row.distance, row.pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        queryset = queryset.order_by('distance', 'pk')
+        if cursor is not None:
+            distance, pk = cursor
+            queryset = queryset.filter(Q(distance__gt=distance) | Q(distance=distance, pk__gt=pk))
+        return self._finish(request, list(queryset[:page_size + 1]), page_size)
+
+    def paginate_list(self, rows, request):
+        """Paginate sorted (distance, id, item) tuples; returns the items."""
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+
+        rows = sorted(rows, key=lambda row: (row[0], str(row[1])))
+        if cursor is not None:
+            distance, pk = cursor
+            rows = [row for row in rows if (row[0], str(row[1])) > (distance, pk)]
+        page = self._finish(request, rows, page_size)
+        return [item for _, _, item in page]
@@ -0,0 +1,153 @@
+"""
+Single-flight cache fills.
+
+single_flight(key, compute, timeout) behaves like cache.get_or_set, except
+that when the entry is missing or about to expire only one worker across the
+cluster runs compute(); the others serve the previous value if there is one,
+or wait briefly for the winner to publish.
+
+- Coordination is a lock key taken with SET NX and a short lease, so a
+  crashed worker can't hold it for longer than `lease` seconds. It holds a
+  random token and is released with a compare-and-delete script, so a
+  worker whose lease ran out can't delete the lease another worker took.
+- A reader with nothing to serve waits at most `wait` (half a second by
+  default) for the winner, then computes the value itself: a long wait
+  would tie up a gthread worker for every such request.
+- Entries are refreshed probabilistically before they expire ("XFetch"): the
+  closer to expiry and the slower compute() was last time, the likelier a
+  read volunteers to recompute. Expiry is therefore spread out instead of
+  every worker missing at the same instant.
+- Entries outlive their logical expiry by `stale_grace` seconds so there is
+  something to serve while one worker recomputes.
+
+If the cache is unreachable, compute() is simply called.
+
+acquire_lease / release_lease / wait_for_many expose the same coordination
+for callers that fill many keys in one batch (see apps/stores/tiles.py).
+"""
+import logging
+import math
+import random
+import time
+import uuid
+
+from django.core.cache import cache
+
+from .cache import redis_client
+
+logger = logging.getLogger(__name__)
+
+_POLL_INTERVAL = 0.05
+
+_RELEASE = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _lock_key(key):
+    # Own namespace, so locks never match a two-tier LOCAL_PREFIX (core/cache.py).
+    return f'sf-lock:{key}'
+
+
+def _should_refresh(expires_at, delta, beta):
+    # XFetch: recompute early with probability rising as expiry approaches.
+    return time.time() - delta * beta * math.log(random.random() or 1e-12) >= expires_at
+
+
+def _fill(key, compute, timeout, stale_grace):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    try:
+        cache.set(key, (value, time.time() + timeout, delta), timeout=timeout + stale_grace)
+    except Exception as e:
+        logger.warning(f"[SingleFlight] Write failed for {key}: {e}")
+    return value
+
+
+def acquire_lease(key, lease=10):
+    """
+    Try to become the one worker recomputing `key`. Returns a token to pass
+    to release_lease(), or None if another worker holds the lease. If the
+    cache is unreachable every caller gets a token (no coordination possible).
+    """
+    token = uuid.uuid4().hex
+    try:
+        client = redis_client()
+        if client is None:
+            return token if cache.add(_lock_key(key), token, timeout=lease) else None
+        # Raw SET so the stored value is the bare token _RELEASE compares.
+        return token if client.set(cache.make_key(_lock_key(key)), token, nx=True, ex=lease) else None
+    except Exception as e:
+        logger.warning(f"[SingleFlight] Lock failed for {key}: {e}")
+        return token
+
+
+def release_lease(key, token):
+    try:
+        client = redis_client()
+        if client is None:
+            # Per-process backends (LocMem): no other worker shares the lease.
+            if cache.get(_lock_key(key)) == token:
+                cache.delete(_lock_key(key))
+            return
+        client.eval(_RELEASE, 1, cache.make_key(_lock_key(key)), token)
+    except Exception:
+        pass  # the lease expires on its own
+
+
+def wait_for_many(keys, wait=0.5):
+    """Poll until all keys are cached or `wait` elapses; returns what was found."""
+    found = {}
+    deadline = time.monotonic() + wait
+    while len(found) < len(keys) and time.monotonic() < deadline:
+        time.sleep(_POLL_INTERVAL)
+        try:
+            found.update(cache.get_many([key for key in keys if key not in found]))
+        except Exception:
+            break
+    return found
+
+
+def single_flight(key, compute, timeout=300, lease=10, wait=0.5, stale_grace=60, beta=1.0):
+    """
+    Return the cached value for `key`, computing it with compute() at most
+    once at a time cluster-wide.
+
+    timeout      logical lifetime of a value, in seconds
+    lease        how long the recompute lock is held at most
+    wait         how long a reader with nothing to serve waits for the winner
+    stale_grace  how long past expiry a value may still be served
+    beta         > 1 recomputes earlier, < 1 later
+    """
+    try:
+        entry = cache.get(key)
+    except Exception as e:
+        logger.warning(f"[SingleFlight] Read failed for {key}: {e}")
+        return compute()
+
+    if entry is not None:
+        value, expires_at, delta = entry
+        if not _should_refresh(expires_at, delta, beta):
+            return value
+
+    token = acquire_lease(key, lease)
+    if token is not None:
+        try:
+            return _fill(key, compute, timeout, stale_grace)
+        finally:
+            release_lease(key, token)
+
+    if entry is not None:
+        # Someone else is refreshing; the current value is still good enough.
+        return entry[0]
+
+    entry = wait_for_many([key], wait).get(key)
+    if entry is not None:
+        return entry[0]
+
+    # The winner is slow or died; don't keep the caller waiting any longer.
+    return _fill(key, compute, timeout, stale_grace)
@@ -0,0 +1,188 @@
+import base64
+import datetime
+import uuid
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.db.models import FloatField
+from django.db.models.functions import Cast
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.retail_catalog.models import RetailProduct
+from apps.stores.models import Store
+from .pagination import CreatedAtCursorPagination, DistanceCursorPagination
+
+User = get_user_model()
+
+factory = APIRequestFactory()
+
+
+def _request(**params):
+    return Request(factory.get('/items/', params))
+
+
+def _cursor(paginator):
+    link = paginator.get_next_link()
+    return parse_qs(urlparse(link).query)['cursor'][0] if link else None
+
+
+def _pages(paginate, limit, **params):
+    """Follow next links from the first page; returns the pages."""
+    pages = []
+    cursor = None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor:
+            query['cursor'] = cursor
+        paginator, page = paginate(_request(**query))
+        pages.append(page)
+        cursor = _cursor(paginator)
+        if cursor is None:
+            return pages
+
+
+class View:
+    def __init__(self, cursor_ordering):
+        self.cursor_ordering = cursor_ordering
+
+
+class KeysetPaginationTests(SimpleTestCase):
+    def test_limit_is_capped_and_defaults_to_page_size(self):
+        paginator = CreatedAtCursorPagination()
+        cases = [
+            ({}, 20),
+            ({'limit': '5'}, 5),
+            ({'limit': '100000'}, 200),
+            ({'limit': '0'}, 1),
+            ({'limit': '-3'}, 1),
+            ({'limit': 'many'}, 20),
+        ]
+        for params, expected in cases:
+            with self.subTest(params=params):
+                self.assertEqual(paginator.get_page_size(_request(**params)), expected)
+
+    def test_created_at_cursor_round_trips(self):
+        paginator = CreatedAtCursorPagination()
+        key = (datetime.datetime(2026, 3, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc), uuid.uuid4())
+        cursor = paginator.encode_cursor(*key)
+        self.assertEqual(paginator.decode_cursor(_request(cursor=cursor)), key)
+
+    def test_distance_cursor_round_trips_exactly(self):
+        paginator = DistanceCursorPagination()
+        key = (0.1 + 0.2, str(uuid.uuid4()))
+        cursor = paginator.encode_cursor(*key)
+        self.assertEqual(paginator.decode_cursor(_request(cursor=cursor)), key)
+
+    def test_no_cursor_is_first_page(self):
+        self.assertIsNone(CreatedAtCursorPagination().decode_cursor(_request()))
+
+    def test_invalid_cursor_is_404(self):
+        def encoded(raw):
+            return base64.urlsafe_b64encode(raw.encode()).decode()
+
+        cases = [
+            (CreatedAtCursorPagination, 'not base64!'),
+            (CreatedAtCursorPagination, encoded('no separator')),
+            (CreatedAtCursorPagination, encoded(f'yesterday|{uuid.uuid4()}')),
+            (CreatedAtCursorPagination, encoded('2026-03-01T12:00:00+00:00|not-a-uuid')),
+            (CreatedAtCursorPagination, base64.urlsafe_b64encode('é|x'.encode()).decode()),
+            (DistanceCursorPagination, encoded(f'far|{uuid.uuid4()}')),
+        ]
+        for paginator_class, cursor in cases:
+            with self.subTest(paginator=paginator_class.__name__, cursor=cursor):
+                with self.assertRaises(NotFound):
+                    paginator_class().decode_cursor(_request(cursor=cursor))
+
+    def test_paginate_list_breaks_distance_ties_by_id(self):
+        ids = sorted(str(uuid.uuid4()) for _ in range(7))
+        # Shuffled input with runs of equal distances straddling page ends.
+        rows = [(1.5, ids[i], ids[i]) for i in (4, 1, 3)] + [(0.5, ids[i], ids[i]) for i in (6, 0)]
+        rows += [(2.0, ids[i], ids[i]) for i in (5, 2)]
+
+        def paginate(request):
+            paginator = DistanceCursorPagination()
+            return paginator, paginator.paginate_list(rows, request)
+
+        pages = _pages(paginate, limit=2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        expected = [item for _, _, item in sorted(rows)]
+        self.assertEqual([item for page in pages for item in page], expected)
+
+    def test_paginate_list_last_full_page_has_no_next(self):
+        rows = [(float(i), str(uuid.uuid4()), i) for i in range(4)]
+        paginator = DistanceCursorPagination()
+        self.assertEqual(paginator.paginate_list(rows, _request(limit=4)), [0, 1, 2, 3])
+        self.assertIsNone(paginator.get_next_link())
+
+
+class KeysetQuerysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        owner = User.objects.create(username='paging-owner', role='SELLER')
+        cls.store = Store.objects.create(owner=owner, name='Paging', category='general', latitude=9, longitude=38)
+        RetailProduct.objects.bulk_create([
+            RetailProduct(store=cls.store, name=f'Product {i}', price=1, stock_quantity=i % 3)
+            for i in range(11)
+        ])
+        # Three timestamps shared by several rows each, so pages split ties.
+        base = timezone.now()
+        for i, pk in enumerate(RetailProduct.objects.filter(store=cls.store).values_list('pk', flat=True)):
+            RetailProduct.objects.filter(pk=pk).update(created_at=base - datetime.timedelta(seconds=i % 3))
+
+    def _keys(self, reverse=False):
+        return sorted(RetailProduct.objects.filter(store=self.store).values_list('created_at', 'pk'), reverse=reverse)
+
+    def _created_at_pages(self, cursor_ordering, limit):
+        queryset = RetailProduct.objects.filter(store=self.store).order_by('name')
+
+        def paginate(request):
+            paginator = CreatedAtCursorPagination()
+            return paginator, paginator.paginate_queryset(queryset, request, View(cursor_ordering))
+
+        return _pages(paginate, limit)
+
+    def test_created_at_descending_pages_cover_every_row_once(self):
+        pages = self._created_at_pages('-created_at', limit=4)
+        rows = [(p.created_at, p.pk) for page in pages for p in page]
+        self.assertEqual([len(page) for page in pages], [4, 4, 3])
+        self.assertEqual(rows, self._keys(reverse=True))
+
+    def test_created_at_ascending_pages_cover_every_row_once(self):
+        pages = self._created_at_pages('created_at', limit=2)
+        rows = [(p.created_at, p.pk) for page in pages for p in page]
+        self.assertEqual(len(pages), 6)
+        self.assertEqual(rows, self._keys())
+
+    def test_created_at_pages_values_rows(self):
+        queryset = RetailProduct.objects.filter(store=self.store).values('id', 'name', 'created_at')
+
+        def paginate(request):
+            paginator = CreatedAtCursorPagination()
+            return paginator, paginator.paginate_queryset(queryset, request)
+
+        ids = [row['id'] for page in _pages(paginate, limit=3) for row in page]
+        self.assertEqual(ids, [pk for _, pk in self._keys(reverse=True)])
+
+    def test_paginate_list_matches_paginate_queryset(self):
+        # stock_quantity as the distance: three values, so most rows tie.
+        queryset = RetailProduct.objects.filter(store=self.store).annotate(
+            distance=Cast('stock_quantity', FloatField()),
+        )
+        rows = [(p.distance, p.pk, p.pk) for p in queryset.order_by('?')]
+
+        def paginate_queryset(request):
+            paginator = DistanceCursorPagination()
+            return paginator, [p.pk for p in paginator.paginate_queryset(queryset, request)]
+
+        def paginate_list(request):
+            paginator = DistanceCursorPagination()
+            return paginator, paginator.paginate_list(rows, request)
+
+        from_queryset = _pages(paginate_queryset, limit=3)
+        from_list = _pages(paginate_list, limit=3)
+        self.assertEqual(from_list, from_queryset)
+        self.assertEqual(sum(len(page) for page in from_queryset), 11)
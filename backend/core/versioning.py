@@ -0,0 +1,163 @@
+"""
+Per-store content versions and versioned cache namespaces.
+
+Every store has a version number in the shared cache, bumped (after commit)
+whenever anything a storefront shows changes: the store, its theme, menu
+categories/items/options/extras or retail categories/products. Readers use it
+to build validators (ETag / Last-Modified) without serializing anything, and
+to namespace cached payloads (cached_for_store) so they never need deleting.
+
+Versions are Unix timestamps in seconds that advance by at least one on
+every bump, atomically and never backwards, so they double as Last-Modified.
+A missing key (eviction, Redis flush) is re-seeded with the current time.
+"""
+import hashlib
+import logging
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .singleflight import single_flight
+
+logger = logging.getLogger(__name__)
+
+# Version keys outlive any cached payload; the TTL only stops ids that were
+# looked up once (or never existed) from staying in Redis forever.
+VERSION_TTL = 60 * 60 * 24 * 30
+
+
+def _key(store_id):
+    return f'store_version:{store_id}'
+
+
+def _get_version(key):
+    if not getattr(settings, 'STORE_CONTENT_VERSIONS_ENABLED', True):
+        return None
+    try:
+        version = cache.get(key)
+        if version is None:
+            now = int(time.time())
+            cache.add(key, now, timeout=VERSION_TTL)
+            version = cache.get(key, now)
+        return version
+    except Exception as e:
+        logger.warning(f"[StoreVersion] Read failed for {key}: {e}")
+        return None
+
+
+def get_store_version(store_id):
+    """Return the store's content version, or None if the cache is unavailable."""
+    return _get_version(_key(store_id))
+
+
+def get_store_versions(store_ids):
+    """{store_id: version} for many stores in one cache read; None if the cache is unavailable."""
+    if not getattr(settings, 'STORE_CONTENT_VERSIONS_ENABLED', True):
+        return None
+    keys = {_key(store_id): store_id for store_id in store_ids}
+    try:
+        found = cache.get_many(list(keys))
+    except Exception as e:
+        logger.warning(f"[StoreVersion] Read failed: {e}")
+        return None
+    versions = {}
+    for key, store_id in keys.items():
+        version = found[key] if key in found else _get_version(key)
+        if version is None:
+            return None
+        versions[store_id] = version
+    return versions
+
+
+def bump_store_version(store_id):
+    """Advance the store's version; returns the new version (None on failure)."""
+    return _bump(_key(store_id))
+
+
+def _bump(key):
+    # Only atomic increments touch an existing version: a read-compare-set
+    # could land late and move it backwards, re-issuing an ETag a client
+    # already holds. Catching up with the clock is an increment too; two
+    # bumps racing to do so overshoot a little, which is harmless.
+    now = int(time.time())
+    try:
+        if cache.add(key, now, timeout=VERSION_TTL):
+            return now
+        version = cache.incr(key)
+        if version < now:
+            version = cache.incr(key, now - version)
+        cache.touch(key, VERSION_TTL)
+        return version
+    except ValueError:
+        # Evicted between add() and incr(); re-seed unless someone else did.
+        if cache.add(key, now, timeout=VERSION_TTL):
+            return now
+        return _get_version(key)
+    except Exception as e:
+        logger.warning(f"[StoreVersion] Bump failed for {key}: {e}")
+        return None
+
+
+def bump_store_version_on_commit(store_id):
+    """Bump once the current transaction commits (immediately in autocommit)."""
+    if store_id is not None:
+        transaction.on_commit(lambda: bump_store_version(store_id))
+
+
+def cached_for_store(store_id, name, parts, compute, timeout=60 * 60):
+    """
+    Return compute() through the store's versioned cache namespace.
+
+    Keys embed the store's current version, so a bump makes every entry for
+    the store unreachable at once — no key tracking or deletes — and writes
+    are visible on the next read. Old entries just age out after `timeout`.
+    Without a version (cache down or versions disabled) compute() runs directly.
+    """
+    version = get_store_version(store_id)
+    if version is None:
+        return compute()
+    digest = hashlib.sha256(':'.join(str(part) for part in parts).encode()).hexdigest()[:24]
+    key = f'store:{store_id}:v{version}:{name}:{digest}'
+    # A bump makes every reader of a popular store miss at once; coalesce.
+    return single_flight(key, compute, timeout=timeout)
+
+
+def conditional_response(request, store_id, build, *etag_parts):
+    """
+    Serve a store-scoped GET with a strong ETag and Last-Modified.
+
+    The ETag covers the store's content version, the full request path
+    (query string included) and any extra etag_parts. A matching
+    If-None-Match / If-Modified-Since returns 304 before build() runs;
+    otherwise build() produces the response and the validators are attached.
+    """
+    try:
+        store_id = uuid.UUID(str(store_id))
+    except ValueError:
+        return build()
+    version = get_store_version(store_id)
+    if version is None:
+        return build()
+
+    raw = ':'.join(str(part) for part in (store_id, version, request.get_full_path(), *etag_parts))
+    etag = quote_etag(hashlib.sha256(raw.encode()).hexdigest()[:32])
+    django_request = getattr(request, '_request', request)
+
+    not_modified = get_conditional_response(django_request, etag=etag, last_modified=version)
+    if not_modified is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+    else:
+        response = not_modified
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(version)
+    # Let clients and the Next.js proxy keep a copy but revalidate every time.
+    patch_cache_control(response, no_cache=True)
+    return response
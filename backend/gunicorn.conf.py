@@ -42,5 +42,16 @@ max_requests = 500               # Recycle workers after N requests (prevents me
 max_requests_jitter = 50         # Random jitter so workers don't all restart at once
 preload_app = False              # Disabled: free tier doesn't have enough RAM for safe fork
 
+# ── Worker warm-up ────────────────────────────────────────────────────────────
+def post_worker_init(worker):
+    """Build the in-memory store index before the worker takes traffic."""
+    try:
+        from apps.stores.spatial_index import memory_engine_enabled, store_index
+        if memory_engine_enabled():
+            store_index.rebuild()
+    except Exception as e:
+        # Non-fatal: the index is built lazily on the first nearby request.
+        worker.log.warning(f"Store spatial index warm-up failed: {e}")
+
 # ── Process naming ────────────────────────────────────────────────────────────
 proc_name = "storeville-backend"
@@ -33,6 +33,17 @@ export interface Store {
 
 export const fetchNearbyStores = async (lat: number, lon: number, radius = 50000, mode = 'retail'): Promise<Store[]> => {
   const storeType = mode === 'food' ? 'FOOD' : 'RETAIL';
-  const response = await api.get(`/stores/discovery/nearby/?lat=${lat}&lon=${lon}&radius=${radius}&type=${storeType}`);
-  return response.data;
+  // Nearby is cursor-paginated ({ next, results }) in distance order; each store carries `distance` (km).
+  // Follow `next` so dense areas don't lose stores past the first page. Only its
+  // cursor is reused: the absolute URL points at the backend, not the proxy.
+  const stores: Store[] = [];
+  let cursor: string | null = null;
+  do {
+    const params: Record<string, string | number> = { lat, lon, radius, type: storeType, limit: 200 };
+    if (cursor) params.cursor = cursor;
+    const response = await api.get<{ next: string | null; results: Store[] }>('/stores/discovery/nearby/', { params });
+    stores.push(...response.data.results);
+    cursor = response.data.next ? new URL(response.data.next).searchParams.get('cursor') : null;
+  } while (cursor);
+  return stores;
 }
\ No newline at end of file
@@ -107,6 +107,8 @@ export const auth = betterAuth({
                 'X-Internal-Secret': process.env.INTERNAL_SYNC_SECRET ?? 'dev-sync-secret'
               },
               body: JSON.stringify({
+                // Better Auth id: lets Django upsert on accounts.User.better_auth_id
+                id: user.id,
                 email: user.email,
                 name: user.name,
                 role: (user as any).role ?? 'CUSTOMER',
@@ -119,6 +121,28 @@ export const auth = betterAuth({
           }
         }
       }
+    },
+    // 🌟 SESSION CACHE: Django caches resolved sessions. On logout, tell it to
+    // drop the token right away instead of waiting for the cache TTL.
+    session: {
+      delete: {
+        after: async (session) => {
+          const djangoUrl = process.env.DJANGO_INTERNAL_URL ?? 'http://backend:8000'
+          try {
+            await fetch(`${djangoUrl}/api/accounts/session/invalidate`, {
+              method: 'POST',
+              headers: {
+                'Content-Type': 'application/json',
+                'X-Internal-Secret': process.env.INTERNAL_SYNC_SECRET ?? 'dev-sync-secret'
+              },
+              body: JSON.stringify({ token: session.token }),
+            })
+          } catch (err) {
+            // Non-fatal: the cached entry still expires after BETTER_AUTH_SESSION_CACHE_TTL
+            console.error('[BA Hook] Failed to invalidate Django session cache:', err)
+          }
+        }
+      }
     }
   },
 